@@ -2,11 +2,14 @@ from src.OSCListener import OSCListener
 from src.OSCToSequencer import OSCToSequencerBridge
 from src.tickHook import tickHooker
 from src.sequencer.sequencerControls import SequencerControls, get_actor_by_name
+import os
 import unreal
 
+CONTROL_MAPPING_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "FAD9.json")
+
 def load_in_animation():
     seq = unreal.EditorAssetLibrary.load_asset("/Game/anims/empty.empty")
-    controls = SequencerControls(seq, frame_rate=24)
+    controls = SequencerControls(seq, frame_rate=24, defer_keyframes=True)
     actor = get_actor_by_name("SkeletalMeshActor_6")
     skeletal_mesh = controls.add_possesable_to_sequence(actor)
     anim_asset = unreal.AnimSequence.cast(unreal.load_asset("/Game/anims/Cinematics/2025-05-28/Scene_1_204_Subscenes/Animation/GlassesGuyRecord_Scene_1_204.GlassesGuyRecord_Scene_1_204"))
@@ -17,17 +20,30 @@ def load_in_animation():
     return controls
 
 # Init systems
-osc_listener = OSCListener()
+# OSC from the MIDIToOSC bridge. To read the controller in process instead (needs python-rtmidi in the editor's Python):
+# from src.midiInput import MidiInput
+# input_source = MidiInput(port_name="FAD9")
+# or both, e.g. with a tablet sending OSC next to the controller:
+# from src.inputSource import InputMux
+# input_source = InputMux(MidiInput(port_name="FAD9"), OSCListener(threaded=True))
+input_source = OSCListener(threaded=True)
 sequencer_controls = load_in_animation()
-bridge = OSCToSequencerBridge(osc_listener, sequencer_controls, "C:\\Users\\VICON\\Desktop\\Code\\UnrealSequenceController\\FAD9.json")
+# Edits to the mapping are picked up while running, a mapping that fails validation is logged and ignored
+bridge = OSCToSequencerBridge(input_source, sequencer_controls, CONTROL_MAPPING_PATH, watch_interval=1.0)
+
+# Optional per tick profiling, logs a summary every few seconds. Dump with profiler.dump_json(path) or profiler.dump_csv(path)
+profiler = None
+# from src.profiler import TickProfiler
+# profiler = TickProfiler().attach(input_source, bridge, sequencer_controls)
 
 # Tick function
 def tick_func(delta_seconds):
-    osc_listener.update()
+    input_source.update()
     bridge.update()
+    sequencer_controls.flush_keyframes()
 
 tick = tickHooker()
-tick.hook(tick_func)
+tick.hook(tick_func, on_unhook=input_source.close, profiler=profiler, priority=100)
 
 
-# tick.unhook()  # Uncomment to unhook the tick when done
\ No newline at end of file
+# tick.unhook()  # Uncomment to unhook the tick when done, this also closes the input
\ No newline at end of file
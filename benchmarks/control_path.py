@@ -0,0 +1,249 @@
+"""
+Benchmark of the whole control path against the mock `unreal` module.
+
+Drives OSCListener -> OSCToSequencerBridge -> SequencerControls through
+tickHooker with OSC traffic sent over a local UDP socket, and reports ticks/sec,
+editor API calls per tick and bytes allocated per tick.
+
+Run from the repository root:
+    python -m benchmarks.control_path --ticks 600 --latency-us 20
+
+Traffic is a JSON list with one entry per tick, each a list of [address, value]
+pairs. Without --traffic a sine sweep over every fader in the mapping is used,
+--record writes the traffic that was played so it can be replayed later.
+"""
+import argparse
+import contextlib
+import io
+import json
+import math
+import os
+import socket
+import statistics
+import time
+import tracemalloc
+
+from benchmarks import mock_unreal
+
+unreal = mock_unreal.install()
+
+from pythonosc.osc_message_builder import OscMessageBuilder
+from src.OSCListener import OSCListener
+from src.OSCToSequencer import OSCToSequencerBridge
+from src.tickHook import TickScheduler, tickHooker
+from src.profiler import TickProfiler
+from src.sequencer.sequencerControls import SequencerControls, ctrlRigVals, get_actor_by_name
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_DEFAULT_MAPPING = os.path.join(_REPO_ROOT, "FAD9.json")
+
+# Mapping modus to the control type the mock rig needs for it
+_MODUS_CONTROL_TYPES = {
+    "Float": "Float",
+    "RotatorX": "Rotator",
+    "RotatorY": "Rotator",
+    "RotatorZ": "Rotator",
+}
+
+def fader_sweep(control_mapping, ticks, faders_per_tick=None):
+    """Sine sweep over every keyframed control in the mapping, one value per fader per tick."""
+    faders = [
+        control_id for control_id, mapped in control_mapping.items()
+        if isinstance(mapped, list) or (isinstance(mapped, str) and mapped in {v.value for v in ctrlRigVals})
+    ]
+    if faders_per_tick is not None:
+        faders = faders[:faders_per_tick]
+
+    traffic = []
+    for tick in range(ticks):
+        messages = []
+        for index, control_id in enumerate(faders):
+            phase = (tick + index * 7) / 60.0
+            messages.append([f"/{control_id}", round(0.5 + 0.5 * math.sin(phase * math.tau), 4)])
+        traffic.append(messages)
+    return traffic
+
+def rig_controls(control_mapping):
+    """
+    Control rig controls (name to type) for the mock rig, like the real one: the float finger
+    controls plus the controls the mapping keys with a modus. Action names are not controls.
+    """
+    controls = {ctrl.value: "Float" for ctrl in ctrlRigVals}
+    for mapped in control_mapping.values():
+        if isinstance(mapped, list):
+            controls[mapped[0]] = _MODUS_CONTROL_TYPES.get(mapped[1], "EulerTransform")
+    return controls
+
+def encode_traffic(traffic):
+    encoded = []
+    for messages in traffic:
+        datagrams = []
+        for address, value in messages:
+            builder = OscMessageBuilder(address=address)
+            builder.add_arg(value)
+            datagrams.append(builder.build().dgram)
+        encoded.append(datagrams)
+    return encoded
+
+def build_scene(control_mapping, frame_rate=24, defer_keyframes=True):
+    """Register a sequence, actor, animation and rig in the mock and load them like OSCMain does."""
+    unreal.reset()
+    unreal.register_asset("/Game/anims/empty.empty", unreal.LevelSequence("empty"))
+    unreal.register_asset("/Game/anims/bench.bench", unreal.AnimSequence("bench", play_length=60.0))
+    unreal.register_asset("/Game/rigs/bench_Rig.bench_Rig", unreal.ControlRigBlueprint("bench_Rig", rig_controls(control_mapping)))
+    unreal.add_level_actor(unreal.SkeletalMeshActor("SkeletalMeshActor_6"))
+
+    seq = unreal.EditorAssetLibrary.load_asset("/Game/anims/empty.empty")
+    controls = SequencerControls(seq, frame_rate=frame_rate, defer_keyframes=defer_keyframes)
+    actor = get_actor_by_name("SkeletalMeshActor_6")
+    skeletal_mesh = controls.add_possesable_to_sequence(actor)
+    anim_asset = unreal.AnimSequence.cast(unreal.load_asset("/Game/anims/bench.bench"))
+    _, section = controls.add_animation_to_actor(skeletal_mesh, anim_asset)
+    controls.time_controls.set_sequence_range(section.get_start_frame(), section.get_end_frame())
+    rig_asset = unreal.ControlRigBlueprint.cast(unreal.load_asset("/Game/rigs/bench_Rig.bench_Rig"))
+    controls.add_control_rig_to_actor(skeletal_mesh, rig_asset)
+    return controls
+
+def run(traffic, mapping_path=_DEFAULT_MAPPING, latency=0.0, rate_limit_interval=0.0, threaded=False, defer_keyframes=True, trace_allocations=True, profiler=None):
+    """
+    Play the traffic through the control path, one tick per entry, and return the stats.
+
+    Params:
+    - traffic (list): One list of [address, value] pairs per tick.
+    - latency (float): Simulated cost of every editor API call, in seconds.
+    - trace_allocations (bool): Replay a second time under tracemalloc to measure bytes allocated per tick.
+    - profiler (TickProfiler): Attach to the control path during the timed replay.
+    """
+    with open(mapping_path, "r") as f:
+        control_mapping = json.load(f)
+    datagrams = encode_traffic(traffic)
+
+    # Whatever the loggers still write to the console is kept out of the terminal but not out of the timing
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = _play(datagrams, control_mapping, mapping_path, latency, rate_limit_interval, threaded, defer_keyframes, False, profiler)
+        if trace_allocations:
+            traced = _play(datagrams, control_mapping, mapping_path, latency, rate_limit_interval, threaded, defer_keyframes, True, None)
+            stats["alloc_bytes_per_tick"] = traced["alloc_bytes_per_tick"]
+            stats["alloc_peak_bytes"] = traced["alloc_peak_bytes"]
+    return stats
+
+def _play(datagrams, control_mapping, mapping_path, latency, rate_limit_interval, threaded, defer_keyframes, trace, profiler):
+    mock_unreal.set_latency(0.0)
+    controls = build_scene(control_mapping, defer_keyframes=defer_keyframes)
+    listener = OSCListener(port=0, threaded=threaded)
+    scheduler = TickScheduler()
+    bridge = OSCToSequencerBridge(listener, controls, mapping_path, rate_limit_interval=rate_limit_interval, scheduler=scheduler)
+    target = listener.sock.getsockname()
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+
+    tick_times = []
+    tick_allocs = []
+    api_calls = []
+
+    def tick_func(delta_seconds):
+        listener.update()
+        bridge.update()
+        controls.flush_keyframes()
+
+    hooker = tickHooker(scheduler)
+    if profiler is not None:
+        profiler.attach(listener, bridge, controls)
+    hooker.hook(tick_func, on_unhook=listener.close, profiler=profiler)
+    mock_unreal.set_latency(latency)
+    if trace:
+        tracemalloc.start()
+
+    sent = 0
+    try:
+        for frame, tick_datagrams in enumerate(datagrams):
+            unreal.LevelSequenceEditorBlueprintLibrary._current_time = frame
+            for datagram in tick_datagrams:
+                sender.sendto(datagram, target)
+            sent += len(tick_datagrams)
+            if threaded:
+                # Wait for the receiver thread, so every tick sees the same traffic as unthreaded runs
+                deadline = time.perf_counter() + 1.0
+                while listener.packets_received < sent and time.perf_counter() < deadline:
+                    time.sleep(0)
+
+            mock_unreal.reset_calls()
+            if trace:
+                tracemalloc.reset_peak()
+                before, _ = tracemalloc.get_traced_memory()
+            start = time.perf_counter()
+            unreal.tick()
+            tick_times.append(time.perf_counter() - start)
+            if trace:
+                _, peak = tracemalloc.get_traced_memory()
+                tick_allocs.append(peak - before)
+            api_calls.append(mock_unreal.total_calls())
+    finally:
+        if trace:
+            tracemalloc.stop()
+        mock_unreal.set_latency(0.0)
+        hooker.unhook()
+        sender.close()
+
+    total = sum(tick_times)
+    tick_times.sort()
+    stats = {
+        "ticks": len(tick_times),
+        "messages": sent,
+        "ticks_per_sec": len(tick_times) / total if total else float("inf"),
+        "mean_tick_ms": statistics.fmean(tick_times) * 1000.0,
+        "p95_tick_ms": tick_times[int(len(tick_times) * 0.95) - 1] * 1000.0 if tick_times else 0.0,
+        "api_calls_per_tick": statistics.fmean(api_calls) if api_calls else 0.0,
+        "max_api_calls_per_tick": max(api_calls, default=0),
+    }
+    if trace:
+        stats["alloc_bytes_per_tick"] = statistics.fmean(tick_allocs) if tick_allocs else 0.0
+        stats["alloc_peak_bytes"] = max(tick_allocs, default=0)
+    return stats
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=600, help="Ticks to play when generating traffic")
+    parser.add_argument("--faders", type=int, default=None, help="Limit the generated sweep to this many faders")
+    parser.add_argument("--traffic", help="JSON traffic file to replay instead of the generated sweep")
+    parser.add_argument("--record", help="Write the played traffic to this JSON file")
+    parser.add_argument("--mapping", default=_DEFAULT_MAPPING, help="Control mapping JSON")
+    parser.add_argument("--latency-us", type=float, default=0.0, help="Simulated cost per editor API call in microseconds")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Bridge rate limit interval in seconds")
+    parser.add_argument("--threaded", action="store_true", help="Receive OSC on the listener thread")
+    parser.add_argument("--no-defer", action="store_true", help="Write keyframes immediately instead of once per tick")
+    parser.add_argument("--no-alloc", action="store_true", help="Skip the tracemalloc pass")
+    parser.add_argument("--profile", help="Profile the control path stages and write them to this .json or .csv file")
+    args = parser.parse_args()
+
+    if args.traffic:
+        with open(args.traffic, "r") as f:
+            traffic = json.load(f)
+    else:
+        with open(args.mapping, "r") as f:
+            traffic = fader_sweep(json.load(f), args.ticks, args.faders)
+    if args.record:
+        with open(args.record, "w") as f:
+            json.dump(traffic, f)
+
+    profiler = TickProfiler(capacity=max(1, len(traffic)), summary_interval=None) if args.profile else None
+    stats = run(
+        traffic,
+        mapping_path=args.mapping,
+        latency=args.latency_us / 1_000_000.0,
+        rate_limit_interval=args.rate_limit,
+        threaded=args.threaded,
+        defer_keyframes=not args.no_defer,
+        trace_allocations=not args.no_alloc,
+        profiler=profiler,
+    )
+    for name, value in stats.items():
+        print(f"{name:>24}: {value:.3f}" if isinstance(value, float) else f"{name:>24}: {value}")
+    if profiler is not None:
+        print(profiler.summary_line().replace(" | ", "\n"))
+        if args.profile.endswith(".csv"):
+            profiler.dump_csv(args.profile)
+        else:
+            profiler.dump_json(args.profile)
+
+if __name__ == "__main__":
+    main()
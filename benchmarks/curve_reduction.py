@@ -0,0 +1,81 @@
+"""
+Key counts, error and cost of the curve post-processing before export.
+
+Generates synthetic live fader takes: a key on almost every frame at the bridge's 50 ms
+rate limit, values quantised to 7 bit MIDI steps with a little jitter, holds between
+moves. Each processor setup is run over every control of the take, then the best setup is
+applied through SequencerControls on the mock editor to count the Unreal calls.
+Run from the repository root:
+    python -m benchmarks.curve_reduction --minutes 10 --controls 10
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks import mock_unreal
+from src.sequencer.curveProcessing import CurveProcessor, OneEuroFilter, SavitzkyGolayFilter
+
+def fader_take(minutes, frame_rate, seed):
+    """(frames, values) of one control keyed live, values in 0..100 like the FAD9 faders."""
+    rng = np.random.default_rng(seed)
+    seconds = minutes * 60.0
+    times = np.cumsum(rng.uniform(0.045, 0.055, int(seconds / 0.05)))
+    times = times[times < seconds]
+
+    # Smooth moves between random targets, held for a while in between
+    targets = rng.uniform(0.0, 100.0, int(seconds / 2.0) + 2)
+    segment = times / 2.0
+    index = segment.astype(np.int64)
+    phase = np.clip((segment - index) * 2.0, 0.0, 1.0)
+    eased = phase * phase * (3.0 - 2.0 * phase)
+    curve = targets[index] + (targets[index + 1] - targets[index]) * eased
+
+    values = np.round(curve / 100.0 * 127.0) / 127.0 * 100.0 + rng.normal(0.0, 0.15, len(curve))
+    frames, first = np.unique(np.round(times * frame_rate).astype(np.int64), return_index=True)
+    return frames, values[first]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--controls", type=int, default=10)
+    parser.add_argument("--frame-rate", type=int, default=24)
+    parser.add_argument("--epsilon", type=float, default=0.5, help="Largest value error of the key reduction, faders run 0..100")
+    args = parser.parse_args()
+
+    takes = [fader_take(args.minutes, args.frame_rate, seed) for seed in range(args.controls)]
+    setups = [
+        ("reduce only", CurveProcessor(epsilon=args.epsilon)),
+        ("savitzky-golay", CurveProcessor([SavitzkyGolayFilter(9, 3)], epsilon=args.epsilon)),
+        ("one euro", CurveProcessor([OneEuroFilter(min_cutoff=1.5, beta=0.05)], epsilon=args.epsilon)),
+    ]
+
+    keys = sum(len(frames) for frames, _ in takes)
+    print(f"{args.controls} controls, {args.minutes:g} min at {args.frame_rate} fps, {keys} keys")
+    for name, processor in setups:
+        start = time.perf_counter()
+        stats = [processor.process(frames, values, args.frame_rate)[2] for frames, values in takes]
+        elapsed = time.perf_counter() - start
+        after = sum(s["keys_after"] for s in stats)
+        max_error = max(s["max_error"] for s in stats)
+        print(f"{name:>16}: {keys} -> {after} keys ({after / keys:.1%}), max error {max_error:.3f}, {elapsed * 1000.0:.1f} ms")
+
+    # The same reduction through SequencerControls, counting editor calls
+    unreal = mock_unreal.install()
+    from src.sequencer.sequencerControls import SequencerControls
+    unreal.reset()
+    names = [f"Control{index}" for index in range(args.controls)]
+    rig = unreal.ControlRigBlueprint("bench_rig", {name: "Float" for name in names})
+    actor = unreal.SkeletalMeshActor("SkeletalMeshActor_6")
+    unreal.add_level_actor(actor)
+    controls = SequencerControls(unreal.LevelSequence("bench_sequence"), frame_rate=args.frame_rate)
+    controls.add_control_rig_to_actor(controls.add_possesable_to_sequence(actor), rig)
+    for name, (frames, values) in zip(names, takes):
+        controls.set_channel_keys(name, "Float", frames, values)
+
+    unreal.reset_calls()
+    report = setups[1][1].apply(controls)
+    print(f"{'apply (mock)':>16}: {report['keys_before']} -> {report['keys_after']} keys, {unreal.total_calls()} editor calls, {report['seconds'] * 1000.0:.1f} ms")
+
+if __name__ == "__main__":
+    main()
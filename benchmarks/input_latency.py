@@ -0,0 +1,118 @@
+"""
+Latency from a controller event to the value being in an input's dirty set, per input path.
+
+- osc: the event is encoded as an OSC message (what the MIDIToOSC bridge does per fader move),
+  sent over localhost UDP and decoded by OSCListener, polled or threaded.
+- midi: the raw MIDI bytes go through a LoopbackMidiBackend into MidiInput.
+
+Both spin on update() + consume_changes() until the control shows up, as the tick would. The
+MIDI driver hop is the same for both paths (the external bridge reads the same port), so it is
+left out. With python-rtmidi installed, --rtmidi adds a virtual port opened by RtMidiBackend and
+fed by an rtmidi MidiOut, which does include it. Run from the repository root:
+    python -m benchmarks.input_latency --events 2000
+"""
+import argparse
+import socket
+import statistics
+import time
+
+from pythonosc.osc_message_builder import OscMessageBuilder
+from src.OSCListener import OSCListener
+from src.midiInput import MidiInput, LoopbackMidiBackend, RtMidiBackend, midi_to_control
+
+def fader_events(count):
+    """CC messages sweeping the FAD9 faders (CC 3..10), every event changes its control's value."""
+    events = []
+    for index in range(count):
+        cc = 3 + index % 8
+        events.append([0xB0, cc, (index // 8) % 127 + (index % 2)])
+    return events
+
+def _wait_for(source, control_id, timeout=1.0):
+    deadline = time.perf_counter() + timeout
+    while True:
+        source.update()
+        if control_id in source.consume_changes():
+            return time.perf_counter()
+        if time.perf_counter() > deadline:
+            raise TimeoutError(f"{control_id} never arrived")
+
+def measure_osc(events, threaded):
+    listener = OSCListener(port=0, threaded=threaded)
+    target = listener.sock.getsockname()
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    latencies = []
+    try:
+        for message in events:
+            start = time.perf_counter()
+            control_id, value = midi_to_control(message)
+            builder = OscMessageBuilder(address=f"/{control_id}")
+            builder.add_arg(value)
+            sender.sendto(builder.build().dgram, target)
+            latencies.append(_wait_for(listener, control_id) - start)
+    finally:
+        sender.close()
+        listener.close()
+    return latencies
+
+def measure_midi(events):
+    backend = LoopbackMidiBackend()
+    midi = MidiInput(backend=backend)
+    latencies = []
+    try:
+        for message in events:
+            start = time.perf_counter()
+            backend.send(message)
+            latencies.append(_wait_for(midi, midi_to_control(message)[0]) - start)
+    finally:
+        midi.close()
+    return latencies
+
+def measure_rtmidi(events):
+    import rtmidi
+    midi = MidiInput(backend=RtMidiBackend("input_latency", virtual=True))
+    midi_out = rtmidi.MidiOut()
+    port = next(i for i, name in enumerate(midi_out.get_ports()) if "input_latency" in name)
+    midi_out.open_port(port)
+    latencies = []
+    try:
+        for message in events:
+            start = time.perf_counter()
+            midi_out.send_message(message)
+            latencies.append(_wait_for(midi, midi_to_control(message)[0]) - start)
+    finally:
+        midi_out.close_port()
+        midi.close()
+    return latencies
+
+def summary(latencies):
+    ordered = sorted(latencies)
+    return {
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "p50_us": ordered[len(ordered) // 2] * 1e6,
+        "p99_us": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6,
+        "max_us": ordered[-1] * 1e6,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--rtmidi", action="store_true", help="Also measure a virtual rtmidi port")
+    args = parser.parse_args()
+
+    events = fader_events(args.events)
+    paths = [
+        ("osc polled", lambda: measure_osc(events, threaded=False)),
+        ("osc threaded", lambda: measure_osc(events, threaded=True)),
+        ("midi loopback", lambda: measure_midi(events)),
+    ]
+    if args.rtmidi:
+        paths.append(("midi rtmidi", lambda: measure_rtmidi(events)))
+
+    print(f"{'path':>14} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'max us':>9}")
+    for name, measure in paths:
+        stats = summary(measure())
+        print(f"{name:>14} {stats['mean_us']:>9.1f} {stats['p50_us']:>9.1f} {stats['p99_us']:>9.1f} {stats['max_us']:>9.1f}")
+
+if __name__ == "__main__":
+    main()
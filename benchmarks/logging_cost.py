@@ -0,0 +1,40 @@
+"""
+Per tick cost of console logging on the control path.
+
+Plays the same fader sweep twice, once with every DEBUG message printed like
+the control path used to, and once with the default logging setup, where hot
+path messages cost a level check. Run from the repository root:
+    python -m benchmarks.logging_cost --ticks 600
+"""
+import argparse
+import json
+import logging
+
+from benchmarks import control_path
+from src import logger
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--latency-us", type=float, default=0.0, help="Simulated cost per editor API call in microseconds")
+    args = parser.parse_args()
+
+    with open(control_path._DEFAULT_MAPPING, "r") as f:
+        traffic = control_path.fader_sweep(json.load(f), args.ticks)
+    latency = args.latency_us / 1_000_000.0
+
+    setups = [
+        ("print everything", dict(level=logging.DEBUG, rate_limit_interval=None, ring_capacity=0)),
+        ("default", dict()),
+    ]
+    results = []
+    for name, options in setups:
+        logger.configure(**options)
+        results.append((name, control_path.run(traffic, latency=latency, trace_allocations=False)))
+    logger.configure()
+
+    for name, stats in results:
+        print(f"{name:>18}: {stats['mean_tick_ms']:.3f} ms/tick, {stats['ticks_per_sec']:.1f} ticks/sec")
+
+if __name__ == "__main__":
+    main()
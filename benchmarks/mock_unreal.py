@@ -0,0 +1,756 @@
+"""
+In-memory stand-in for the parts of the `unreal` module this project uses.
+
+Call install() before importing anything from src/, after that `import unreal`
+resolves to this module. Every editor API call is counted in `calls` and can be
+given a simulated latency with set_latency(), so the control path can be
+measured outside the editor.
+"""
+import bisect
+import sys
+import time
+from collections import Counter
+
+calls = Counter()
+_latency = 0.0
+
+def install():
+    """Register this module as `unreal` in sys.modules and return it."""
+    module = sys.modules[__name__]
+    sys.modules["unreal"] = module
+    return module
+
+def set_latency(seconds):
+    """Simulated cost of every counted editor API call, in seconds."""
+    global _latency
+    _latency = seconds
+
+def reset_calls():
+    calls.clear()
+
+def total_calls():
+    return sum(calls.values())
+
+def reset():
+    """Forget all assets, level actors, tick callbacks and editor state."""
+    _assets.clear()
+    _level_actors.clear()
+    _tick_callbacks.clear()
+    _subsystems.clear()
+    LevelSequenceEditorBlueprintLibrary._current_sequence = None
+    LevelSequenceEditorBlueprintLibrary._current_time = 0
+    LevelSequenceEditorBlueprintLibrary._playing = False
+    transactions.clear()
+    calls.clear()
+
+def _api(func):
+    # Count under the qualified name, e.g. "ControlRigSequencerLibrary.set_local_control_rig_float"
+    name = func.__qualname__
+
+    def wrapper(*args, **kwargs):
+        calls[name] += 1
+        if _latency:
+            # Busy wait, sleep() is too coarse for sub-millisecond latencies
+            end = time.perf_counter() + _latency
+            while time.perf_counter() < end:
+                pass
+        return func(*args, **kwargs)
+
+    wrapper.__name__ = func.__name__
+    wrapper.__qualname__ = name
+    wrapper.__doc__ = func.__doc__
+    return wrapper
+
+# Logging
+
+def log(message):
+    print(f"LogPython: {message}")
+
+def log_warning(message):
+    print(f"LogPython: Warning: {message}")
+
+def log_error(message):
+    print(f"LogPython: Error: {message}")
+
+# Undo
+
+transactions = []  # Descriptions of the transactions opened, outermost only, like the undo history
+
+class ScopedEditorTransaction:
+    _depth = 0
+
+    @_api
+    def __init__(self, description):
+        self.description = description
+
+    def __enter__(self):
+        if ScopedEditorTransaction._depth == 0:
+            transactions.append(self.description)
+        ScopedEditorTransaction._depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        ScopedEditorTransaction._depth -= 1
+        return False
+
+# Tick
+
+_tick_callbacks = {}
+_next_tick_handle = 0
+
+@_api
+def register_slate_post_tick_callback(callback):
+    global _next_tick_handle
+    _next_tick_handle += 1
+    _tick_callbacks[_next_tick_handle] = callback
+    return _next_tick_handle
+
+@_api
+def unregister_slate_post_tick_callback(handle):
+    _tick_callbacks.pop(handle, None)
+
+def tick(delta_seconds=1.0 / 60.0):
+    """Run every registered post tick callback once, like one editor frame."""
+    for callback in list(_tick_callbacks.values()):
+        callback(delta_seconds)
+
+# Value types
+
+class FrameNumber:
+    def __init__(self, value=0):
+        self.value = int(value)
+
+    def __eq__(self, other):
+        return isinstance(other, FrameNumber) and other.value == self.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return f"FrameNumber({self.value})"
+
+class FrameTime:
+    def __init__(self, frame_number=None, sub_frame=0.0):
+        self.frame_number = frame_number if frame_number is not None else FrameNumber()
+        self.sub_frame = sub_frame
+
+class Vector:
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x = x
+        self.y = y
+        self.z = z
+
+    def __repr__(self):
+        return f"Vector({self.x}, {self.y}, {self.z})"
+
+class Rotator:
+    def __init__(self, roll=0.0, pitch=0.0, yaw=0.0):
+        self.roll = roll
+        self.pitch = pitch
+        self.yaw = yaw
+
+    def __repr__(self):
+        return f"Rotator({self.roll}, {self.pitch}, {self.yaw})"
+
+class EulerTransform:
+    def __init__(self, location=None, rotation=None, scale=None):
+        self.location = location if location is not None else Vector()
+        self.rotation = rotation if rotation is not None else Rotator()
+        self.scale = scale if scale is not None else Vector(1.0, 1.0, 1.0)
+
+    def __repr__(self):
+        return f"EulerTransform({self.location}, {self.rotation}, {self.scale})"
+
+# Objects and assets
+
+class Object:
+    def __init__(self, name="Object"):
+        self._name = name
+        self._properties = {}
+
+    def get_name(self):
+        return self._name
+
+    def set_editor_property(self, name, value):
+        self._properties[name.lower()] = value
+
+    def get_editor_property(self, name):
+        return self._properties.get(name.lower())
+
+    @classmethod
+    def cast(cls, obj):
+        if not isinstance(obj, cls):
+            raise TypeError(f"Cannot cast {type(obj).__name__} to {cls.__name__}")
+        return obj
+
+class Class:
+    def __init__(self, name):
+        self._name = name
+
+    def get_name(self):
+        return self._name
+
+class Actor(Object):
+    def __init__(self, name="Actor", label=None):
+        super().__init__(name)
+        self._label = label if label is not None else name
+
+    @_api
+    def get_actor_label(self):
+        return self._label
+
+    @_api
+    def get_class(self):
+        return Class(type(self).__name__)
+
+def remove_level_actor(actor):
+    """Delete an actor from the mock level, it is no longer valid afterwards."""
+    _level_actors.remove(actor)
+    actor._valid = False
+
+class SystemLibrary:
+    @staticmethod
+    @_api
+    def is_valid(obj):
+        return obj is not None and getattr(obj, "_valid", True)
+
+class Skeleton(Object):
+    pass
+
+class SkeletalMesh(Object):
+    def __init__(self, name="SkeletalMesh", skeleton=None):
+        super().__init__(name)
+        self.skeleton = skeleton if skeleton is not None else Skeleton(f"{name}_Skeleton")
+
+class SkeletalMeshComponent(Object):
+    def __init__(self, name="SkeletalMeshComponent", skeletal_mesh=None):
+        super().__init__(name)
+        self.skeletal_mesh = skeletal_mesh if skeletal_mesh is not None else SkeletalMesh()
+
+class SkeletalMeshActor(Actor):
+    def __init__(self, name="SkeletalMeshActor", skeletal_mesh=None, label=None):
+        super().__init__(name, label)
+        self.skeletal_mesh_component = SkeletalMeshComponent(f"{name}_Component", skeletal_mesh)
+
+class AnimSequence(Object):
+    def __init__(self, name="AnimSequence", play_length=10.0):
+        super().__init__(name)
+        self._play_length = play_length
+
+    @_api
+    def get_play_length(self):
+        return self._play_length
+
+class ControlRig(Object):
+    def __init__(self, name="ControlRig", controls=None):
+        super().__init__(name)
+        # Control name to control type, "Float", "Rotator" or "EulerTransform"
+        self.controls = dict(controls or {})
+
+class ControlRigClass:
+    def __init__(self, name, controls):
+        self.name = name
+        self.controls = controls
+
+class ControlRigBlueprint(Object):
+    def __init__(self, name="ControlRig", controls=None):
+        super().__init__(name)
+        self._rig_class = ControlRigClass(name, dict(controls or {}))
+
+    @_api
+    def get_control_rig_class(self):
+        return self._rig_class
+
+class AnimSeqExportOption(Object):
+    def __init__(self):
+        super().__init__("AnimSeqExportOption")
+        self.export_morph_targets = False
+
+class AnimSequenceFactory(Object):
+    def __init__(self):
+        super().__init__("AnimSequenceFactory")
+        self.target_skeleton = None
+
+class MovieSceneSkeletalAnimationParams(Object):
+    def __init__(self):
+        super().__init__("MovieSceneSkeletalAnimationParams")
+
+# Channels, sections and tracks
+
+class MovieSceneScriptingFloatChannel:
+    class Key:
+        def __init__(self, frame, value):
+            self._time = FrameTime(FrameNumber(frame))
+            self._value = value
+
+        def get_time(self):
+            return self._time
+
+        def get_value(self):
+            return self._value
+
+        def set_value(self, value):
+            self._value = value
+
+    def __init__(self, channel_name, default=None):
+        self.channel_name = channel_name
+        # Kept in frame order, parallel lists
+        self._frames = []
+        self._keys = []
+        self._default = default
+
+    @_api
+    def has_default(self):
+        return self._default is not None
+
+    @_api
+    def get_default(self):
+        return self._default if self._default is not None else 0.0
+
+    @_api
+    def set_default(self, value):
+        self._default = value
+
+    @_api
+    def get_keys(self):
+        return list(self._keys)
+
+    @_api
+    def add_key(self, time, new_value, sub_frame=0.0, time_unit=None, interpolation=None):
+        return self._set_key(time.value, new_value)
+
+    @_api
+    def remove_key(self, key):
+        index = self._keys.index(key)
+        del self._keys[index]
+        del self._frames[index]
+
+    def _set_key(self, frame, value):
+        index = bisect.bisect_left(self._frames, frame)
+        if index < len(self._frames) and self._frames[index] == frame:
+            key = self._keys[index]
+            key.set_value(value)
+            return key
+        key = self.Key(frame, value)
+        self._frames.insert(index, frame)
+        self._keys.insert(index, key)
+        return key
+
+    def _evaluate(self, frame):
+        # Step evaluation is enough for reading back what was keyed
+        if not self._frames:
+            return 0.0
+        index = bisect.bisect_right(self._frames, frame) - 1
+        return self._keys[max(index, 0)].get_value()
+
+class MovieSceneSection(Object):
+    def __init__(self, name="MovieSceneSection"):
+        super().__init__(name)
+        self._start = 0
+        self._end = 0
+        self._channels = []
+
+    @_api
+    def set_range(self, start_frame, end_frame):
+        self._start = int(start_frame)
+        self._end = int(end_frame)
+
+    @_api
+    def get_start_frame(self):
+        return self._start
+
+    @_api
+    def get_end_frame(self):
+        return self._end
+
+    @_api
+    def get_channels_by_type(self, channel_type):
+        return [channel for channel in self._channels if isinstance(channel, channel_type)]
+
+class MovieSceneTrack(Object):
+    def __init__(self, name=None):
+        super().__init__(name or type(self).__name__)
+        self._sections = []
+
+    @_api
+    def add_section(self):
+        section = MovieSceneSection(f"{self.get_name()}_Section")
+        self._sections.append(section)
+        return section
+
+    @_api
+    def get_sections(self):
+        return list(self._sections)
+
+    def get_display_name(self):
+        return self.get_name()
+
+class MovieSceneSkeletalAnimationTrack(MovieSceneTrack):
+    pass
+
+class MovieSceneControlRigParameterTrack(MovieSceneTrack):
+    pass
+
+# Axis suffixes of the float channels that back each control type
+_CONTROL_CHANNELS = {
+    "Float": ("",),
+    "Rotator": (".Rotation.X", ".Rotation.Y", ".Rotation.Z"),
+    "EulerTransform": (
+        ".Location.X", ".Location.Y", ".Location.Z",
+        ".Rotation.X", ".Rotation.Y", ".Rotation.Z",
+        ".Scale.X", ".Scale.Y", ".Scale.Z",
+    ),
+}
+
+class MovieSceneBindingProxy(Object):
+    def __init__(self, name, bound_object=None):
+        super().__init__(name)
+        self.bound_object = bound_object
+        self._tracks = []
+
+    @_api
+    def add_track(self, track_type):
+        track = track_type()
+        self._tracks.append(track)
+        return track
+
+    @_api
+    def get_tracks(self):
+        return list(self._tracks)
+
+    @_api
+    def remove_track(self, track):
+        self._tracks.remove(track)
+
+    @_api
+    def get_id(self):
+        return id(self)
+
+    @_api
+    def is_valid(self):
+        return True
+
+class LevelSequence(Object):
+    def __init__(self, name="LevelSequence", playback_start=0, playback_end=240):
+        super().__init__(name)
+        self._playback_start = playback_start
+        self._playback_end = playback_end
+        self._bindings = []
+        # ControlRigSequencerBindingProxy list, see ControlRigSequencerLibrary
+        self._control_rigs = []
+
+    @_api
+    def get_playback_start(self):
+        return self._playback_start
+
+    @_api
+    def get_playback_end(self):
+        return self._playback_end
+
+    @_api
+    def set_playback_start(self, start):
+        self._playback_start = int(start)
+
+    @_api
+    def set_playback_end(self, end):
+        self._playback_end = int(end)
+
+    @_api
+    def add_possessable(self, object_to_possess):
+        binding = MovieSceneBindingProxy(object_to_possess.get_name(), object_to_possess)
+        self._bindings.append(binding)
+        return binding
+
+    @_api
+    def get_bindings(self):
+        return list(self._bindings)
+
+# Editor
+
+class World(Object):
+    pass
+
+class UnrealEditorSubsystem(Object):
+    def __init__(self):
+        super().__init__("UnrealEditorSubsystem")
+        self._world = World("EditorWorld")
+
+    @_api
+    def get_editor_world(self):
+        return self._world
+
+_subsystems = {}
+
+@_api
+def get_editor_subsystem(subsystem_class):
+    subsystem = _subsystems.get(subsystem_class)
+    if subsystem is None:
+        subsystem = _subsystems[subsystem_class] = subsystem_class()
+    return subsystem
+
+_level_actors = []
+
+def add_level_actor(actor):
+    """Place an actor in the mock level, see EditorLevelLibrary.get_all_level_actors()."""
+    _level_actors.append(actor)
+    return actor
+
+class EditorLevelLibrary:
+    @staticmethod
+    @_api
+    def get_all_level_actors():
+        return list(_level_actors)
+
+_assets = {}
+
+def register_asset(path, asset):
+    """Make an asset loadable through EditorAssetLibrary and load_asset()."""
+    _assets[path] = asset
+    return asset
+
+class EditorAssetLibrary:
+    @staticmethod
+    @_api
+    def load_asset(asset_path):
+        return _assets.get(asset_path)
+
+    @staticmethod
+    @_api
+    def does_asset_exist(asset_path):
+        return asset_path in _assets
+
+    @staticmethod
+    @_api
+    def does_directory_exist(directory_path):
+        prefix = directory_path.rstrip("/") + "/"
+        return any(path.startswith(prefix) for path in _assets)
+
+    @staticmethod
+    @_api
+    def list_assets(directory_path, recursive=True, include_folder=False):
+        prefix = directory_path.rstrip("/") + "/"
+        paths = [path for path in _assets if path.startswith(prefix)]
+        if not recursive:
+            paths = [path for path in paths if "/" not in path[len(prefix):]]
+        return sorted(paths)
+
+    @staticmethod
+    @_api
+    def delete_asset(asset_path_to_delete):
+        return _assets.pop(asset_path_to_delete, None) is not None
+
+    @staticmethod
+    @_api
+    def rename_asset(source_asset_path, destination_asset_path):
+        if source_asset_path not in _assets or destination_asset_path in _assets:
+            return False
+        _assets[destination_asset_path] = _assets.pop(source_asset_path)
+        return True
+
+@_api
+def load_asset(name):
+    return _assets.get(name)
+
+class TopLevelAssetPath:
+    def __init__(self, package_name="", asset_name=""):
+        self.package_name = package_name
+        self.asset_name = asset_name
+
+class AssetData:
+    def __init__(self, object_path, asset):
+        self.package_name, _, self.asset_name = object_path.rpartition(".")
+        self.package_path = self.package_name.rpartition("/")[0]
+        self.asset_class_path = TopLevelAssetPath("/Script/Engine", type(asset).__name__)
+
+class AssetRegistry:
+    @_api
+    def get_assets_by_path(self, package_path, recursive=False, include_only_on_disk_assets=False):
+        prefix = package_path.rstrip("/") + "/"
+        paths = [path for path in _assets if path.startswith(prefix)]
+        if not recursive:
+            paths = [path for path in paths if "/" not in path[len(prefix):]]
+        return [AssetData(path, _assets[path]) for path in sorted(paths)]
+
+class AssetRegistryHelpers:
+    _registry = AssetRegistry()
+
+    @staticmethod
+    @_api
+    def get_asset_registry():
+        return AssetRegistryHelpers._registry
+
+class Paths:
+    # Point these at real folders to exercise code that reads the project from disk
+    content_dir = "MockProject/Content/"
+    saved_dir = "MockProject/Saved/"
+
+    @staticmethod
+    def project_content_dir():
+        return Paths.content_dir
+
+    @staticmethod
+    def project_saved_dir():
+        return Paths.saved_dir
+
+class AssetTools(Object):
+    @_api
+    def create_asset(self, asset_name, package_path, asset_class, factory):
+        asset = asset_class(asset_name)
+        _assets[f"{package_path.rstrip('/')}/{asset_name}.{asset_name}"] = asset
+        return asset
+
+class AssetToolsHelpers:
+    _asset_tools = None
+
+    @staticmethod
+    @_api
+    def get_asset_tools():
+        if AssetToolsHelpers._asset_tools is None:
+            AssetToolsHelpers._asset_tools = AssetTools("AssetTools")
+        return AssetToolsHelpers._asset_tools
+
+class SequencerTools:
+    @staticmethod
+    @_api
+    def export_anim_sequence(world, sequence, anim_sequence, export_option, binding, create_link):
+        return True
+
+class LevelSequenceEditorBlueprintLibrary:
+    _current_sequence = None
+    _current_time = 0
+    _playing = False
+
+    @staticmethod
+    @_api
+    def open_level_sequence(level_sequence):
+        LevelSequenceEditorBlueprintLibrary._current_sequence = level_sequence
+        return True
+
+    @staticmethod
+    @_api
+    def get_current_level_sequence():
+        return LevelSequenceEditorBlueprintLibrary._current_sequence
+
+    @staticmethod
+    @_api
+    def get_current_time():
+        return LevelSequenceEditorBlueprintLibrary._current_time
+
+    @staticmethod
+    @_api
+    def set_current_time(new_frame):
+        LevelSequenceEditorBlueprintLibrary._current_time = int(new_frame)
+
+    @staticmethod
+    @_api
+    def is_playing():
+        return LevelSequenceEditorBlueprintLibrary._playing
+
+    @staticmethod
+    @_api
+    def play():
+        LevelSequenceEditorBlueprintLibrary._playing = True
+
+    @staticmethod
+    @_api
+    def pause():
+        LevelSequenceEditorBlueprintLibrary._playing = False
+
+    @staticmethod
+    @_api
+    def add_actor_to_sequence(level_sequence, actor):
+        return [level_sequence.add_possessable(actor)]
+
+class ControlRigSequencerBindingProxy:
+    def __init__(self, control_rig, track):
+        self.control_rig = control_rig
+        self.track = track
+
+class ControlRigSequencerLibrary:
+    @staticmethod
+    @_api
+    def find_or_create_control_rig_track(world, level_sequence, control_rig_class, binding, is_layered_control_rig=False):
+        for proxy in level_sequence._control_rigs:
+            if proxy.track in binding._tracks:
+                return proxy.track
+
+        track = MovieSceneControlRigParameterTrack(control_rig_class.name)
+        binding._tracks.append(track)
+        section = MovieSceneSection(f"{control_rig_class.name}_Section")
+        for control_name, control_type in control_rig_class.controls.items():
+            for suffix in _CONTROL_CHANNELS[control_type]:
+                # Scale rests at 1, like a control's initial value in the rig
+                section._channels.append(MovieSceneScriptingFloatChannel(control_name + suffix, default=1.0 if ".Scale." in suffix else 0.0))
+        track._sections.append(section)
+
+        rig = ControlRig(control_rig_class.name, control_rig_class.controls)
+        level_sequence._control_rigs.append(ControlRigSequencerBindingProxy(rig, track))
+        return track
+
+    @staticmethod
+    @_api
+    def get_control_rigs(level_sequence):
+        return list(level_sequence._control_rigs)
+
+    @staticmethod
+    @_api
+    def set_local_control_rig_float(level_sequence, control_rig, control_name, frame_number, value, time_unit=None, set_key=True):
+        channels = _control_channels(level_sequence, control_rig, control_name)
+        _key_channels(channels, frame_number, (value,), set_key)
+
+    @staticmethod
+    @_api
+    def get_local_control_rig_float(level_sequence, control_rig, control_name, frame_number, time_unit=None):
+        channels = _control_channels(level_sequence, control_rig, control_name)
+        return channels[0]._evaluate(frame_number.value) if channels else 0.0
+
+    @staticmethod
+    @_api
+    def set_local_control_rig_rotator(level_sequence, control_rig, control_name, frame_number, value, time_unit=None, set_key=True):
+        channels = _control_channels(level_sequence, control_rig, control_name)
+        _key_channels(channels, frame_number, (value.roll, value.pitch, value.yaw), set_key)
+
+    @staticmethod
+    @_api
+    def get_local_control_rig_rotator(level_sequence, control_rig, control_name, frame_number, time_unit=None):
+        channels = _control_channels(level_sequence, control_rig, control_name)
+        return Rotator(*(channel._evaluate(frame_number.value) for channel in channels[:3]))
+
+    @staticmethod
+    @_api
+    def set_local_control_rig_euler_transform(level_sequence, control_rig, control_name, frame_number, value, time_unit=None, set_key=True):
+        channels = _control_channels(level_sequence, control_rig, control_name)
+        values = (
+            value.location.x, value.location.y, value.location.z,
+            value.rotation.roll, value.rotation.pitch, value.rotation.yaw,
+            value.scale.x, value.scale.y, value.scale.z,
+        )
+        _key_channels(channels, frame_number, values, set_key)
+
+    @staticmethod
+    @_api
+    def get_local_control_rig_euler_transform(level_sequence, control_rig, control_name, frame_number, time_unit=None):
+        channels = _control_channels(level_sequence, control_rig, control_name)
+        values = [channel._evaluate(frame_number.value) for channel in channels]
+        if len(values) < 9:
+            return EulerTransform()
+        return EulerTransform(Vector(*values[0:3]), Rotator(*values[3:6]), Vector(*values[6:9]))
+
+def _control_channels(level_sequence, control_rig, control_name):
+    for proxy in level_sequence._control_rigs:
+        if proxy.control_rig is control_rig:
+            control_type = control_rig.controls.get(control_name)
+            if control_type is None:
+                log_error(f"Control {control_name} not found on {control_rig.get_name()}")
+                return []
+            names = {control_name + suffix for suffix in _CONTROL_CHANNELS[control_type]}
+            section = proxy.track._sections[0]
+            return [channel for channel in section._channels if channel.channel_name in names]
+    log_error(f"Control rig {control_rig.get_name()} is not bound to {level_sequence.get_name()}")
+    return []
+
+def _key_channels(channels, frame_number, values, set_key):
+    if not set_key:
+        return
+    for channel, value in zip(channels, values):
+        channel._set_key(frame_number.value, value)
@@ -0,0 +1,109 @@
+"""
+Cost of draining OSC packets in one tick, batched recv_into drain against select per packet.
+
+Each tick a local UDP sender puts a burst of fader messages (what the MIDIToOSC bridge sends per
+fader move) on the listener's port, then the listener's update() is timed while it drains them.
+
+- batched: OSCListener as it is, recv_into a reused buffer until the socket is empty, plain
+  messages decoded in place.
+- select: the previous listener, select() before every recvfrom() and python-osc for every packet.
+
+Packets/sec is the packets drained divided by the time spent in update(). The benchmark exits
+non-zero when a listener drains a different number of packets than were sent. Run from the
+repository root:
+    python -m benchmarks.osc_ingest --ticks 600 --burst 200
+"""
+import argparse
+import logging
+import select
+import socket
+import statistics
+import sys
+import time
+
+from pythonosc.osc_message_builder import OscMessageBuilder
+from pythonosc.osc_packet import OscPacket
+from src import logger
+from src.OSCListener import OSCListener
+
+class SelectPerPacketListener(OSCListener):
+    """The listener before the batched drain: one select() and one recvfrom() per packet, decoded by python-osc."""
+    def poll(self):
+        count = 0
+        while True:
+            ready = select.select([self.sock], [], [], 0.0)[0]
+            if not ready:
+                break
+            data, _addr = self.sock.recvfrom(len(self._buffer))
+            count += 1
+            for timed_msg in OscPacket(data).messages:
+                msg = timed_msg.message
+                self._store(msg.address.strip("/"), msg.params[-1] if msg.params else None)
+        self.packets_received += count
+        self.last_update_packets = count
+
+def fader_packets(count):
+    """Encoded OSC messages sweeping the FAD9 faders (control_3..control_10)."""
+    packets = []
+    for index in range(count):
+        builder = OscMessageBuilder(address=f"/control_{3 + index % 8}")
+        builder.add_arg((index % 128) / 127.0)
+        packets.append(builder.build().dgram)
+    return packets
+
+def measure(listener_cls, packets, ticks, burst):
+    listener = listener_cls(port=0)
+    target = listener.sock.getsockname()
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    durations = []
+    sent = 0
+    try:
+        for tick in range(ticks):
+            for index in range(burst):
+                sender.sendto(packets[(tick * burst + index) % len(packets)], target)
+            sent += burst
+            start = time.perf_counter()
+            listener.update()
+            durations.append(time.perf_counter() - start)
+            listener.consume_changes()
+        received = listener.packets_received
+    finally:
+        sender.close()
+        listener.close()
+    return durations, sent, received
+
+def summary(durations, received):
+    ordered = sorted(durations)
+    return {
+        "packets_per_s": received / sum(ordered) if sum(ordered) else 0.0,
+        "mean_us": statistics.fmean(ordered) * 1e6,
+        "p99_us": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1e6,
+        "per_packet_us": sum(ordered) / received * 1e6 if received else 0.0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=600)
+    parser.add_argument("--burst", type=int, default=200, help="Packets sent before each tick")
+    args = parser.parse_args()
+    logger.configure(level=logging.WARNING)
+
+    packets = fader_packets(1024)
+    listeners = [
+        ("batched", OSCListener),
+        ("select", SelectPerPacketListener),
+    ]
+
+    failed = False
+    print(f"{'drain':>8} {'packets/s':>11} {'tick mean us':>13} {'tick p99 us':>12} {'us/packet':>10} {'received':>9}")
+    for name, listener_cls in listeners:
+        durations, sent, received = measure(listener_cls, packets, args.ticks, args.burst)
+        stats = summary(durations, received)
+        print(f"{name:>8} {stats['packets_per_s']:>11.0f} {stats['mean_us']:>13.1f} {stats['p99_us']:>12.1f} {stats['per_packet_us']:>10.2f} {received:>9}")
+        if received != sent:
+            print(f"  {name}: drained {received} of {sent} packets sent")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
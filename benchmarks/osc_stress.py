@@ -0,0 +1,148 @@
+"""
+Tick side cost of a threaded OSCListener under a message flood.
+
+A local sender thread sends fader messages at --rate messages/sec (about 50k by default, far
+beyond what a fader desk sends) while the main loop ticks at --tick-hz. The receiver thread
+decodes and coalesces per control, so each tick's update() only swaps in one value per control
+that changed, however many messages arrived. Reported per tick: update() cost and the number of
+values coalesced per swap (last_update_packets), next to the messages received in that time.
+
+The benchmark exits non-zero when a swap holds more values than there are controls, or the last
+value sent for a control isn't the one the listener ends up with. Run from the repository root:
+    python -m benchmarks.osc_stress --seconds 5 --rate 50000
+"""
+import argparse
+import logging
+import socket
+import statistics
+import sys
+import threading
+import time
+
+from pythonosc.osc_message_builder import OscMessageBuilder
+from src import logger
+from src.OSCListener import OSCListener
+
+def _encode(control_id, value):
+    builder = OscMessageBuilder(address=f"/{control_id}")
+    builder.add_arg(value)
+    return builder.build().dgram
+
+def send_flood(target, control_ids, rate, seconds, stop, sent):
+    """Send round robin over control_ids at rate messages/sec, paced per millisecond. sent gets the totals and last values."""
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    per_ms = max(1, rate // 1000)
+    # Values cycle through 0..1 in steps of 1/1000, pre-encoded so the sender keeps up
+    packets = [[_encode(control_id, step / 1000.0) for step in range(1000)] for control_id in control_ids]
+    count = 0
+    start = time.perf_counter()
+    try:
+        while not stop.is_set() and time.perf_counter() - start < seconds:
+            for _ in range(per_ms):
+                index = count % len(control_ids)
+                step = (count // len(control_ids)) % 1000
+                sender.sendto(packets[index][step], target)
+                sent["last"][control_ids[index]] = step / 1000.0
+                count += 1
+            # Catch up when behind, otherwise wait for the next millisecond
+            delay = start + count / rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+    finally:
+        sent["count"] = count
+        sent["elapsed"] = time.perf_counter() - start
+        sender.close()
+
+def run(rate, seconds, tick_hz, controls):
+    control_ids = [f"control_{3 + index}" for index in range(controls)]
+    listener = OSCListener(port=0, threaded=True)
+    # A bigger receive buffer rides out scheduling hiccups of the receiver thread
+    listener.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+    stop = threading.Event()
+    sent = {"count": 0, "elapsed": 0.0, "last": {}}
+    sender = threading.Thread(target=send_flood, args=(listener.sock.getsockname(), control_ids, rate, seconds, stop, sent), daemon=True)
+
+    tick_dt = 1.0 / tick_hz
+    durations = []
+    swapped = []
+    received = []
+    try:
+        sender.start()
+        next_tick = time.perf_counter()
+        previous_received = 0
+        while sender.is_alive():
+            next_tick += tick_dt
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            start = time.perf_counter()
+            listener.update()
+            durations.append(time.perf_counter() - start)
+            listener.consume_changes()
+            swapped.append(listener.last_update_packets)
+            received.append(listener.packets_received - previous_received)
+            previous_received = listener.packets_received
+        # Let the receiver thread drain what is still queued, then take the final values
+        time.sleep(0.2)
+        listener.update()
+        final = {control_id: listener.latest_values.get(control_id) for control_id in control_ids}
+        total_received = listener.packets_received
+    finally:
+        stop.set()
+        sender.join()
+        listener.close()
+    return {
+        "durations": durations,
+        "swapped": swapped,
+        "received": received,
+        "sent": sent,
+        "total_received": total_received,
+        "final": final,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rate", type=int, default=50000, help="Messages per second")
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--tick-hz", type=float, default=60.0)
+    parser.add_argument("--controls", type=int, default=8, help="Distinct controls the messages cycle through")
+    args = parser.parse_args()
+    logger.configure(level=logging.WARNING)
+
+    result = run(args.rate, args.seconds, args.tick_hz, args.controls)
+    durations = sorted(result["durations"])
+    sent = result["sent"]
+    ticks = len(durations)
+
+    print(f"{'sent':>10} {sent['count']:>10} ({sent['count'] / sent['elapsed']:.0f}/s)")
+    print(f"{'received':>10} {result['total_received']:>10} ({result['total_received'] / sent['elapsed']:.0f}/s)")
+    print(f"{'ticks':>10} {ticks:>10}")
+    print()
+    print(f"{'per tick':>16} {'mean':>9} {'p99':>9} {'max':>9}")
+    rows = [
+        ("update() us", [d * 1e6 for d in durations]),
+        ("values/swap", sorted(result["swapped"])),
+        ("msgs received", sorted(result["received"])),
+    ]
+    for name, values in rows:
+        p99 = values[min(len(values) - 1, int(len(values) * 0.99))]
+        print(f"{name:>16} {statistics.fmean(values):>9.1f} {p99:>9.1f} {values[-1]:>9.1f}")
+
+    failed = False
+    if max(result["swapped"], default=0) > args.controls:
+        print(f"A swap held {max(result['swapped'])} values for {args.controls} controls")
+        failed = True
+    # Values arrive in send order over localhost, unless the kernel dropped the tail
+    if result["total_received"] == sent["count"]:
+        # OSC floats are 32 bit
+        wrong = {control_id: value for control_id, value in result["final"].items()
+                 if value is None or abs(value - sent["last"].get(control_id, -1.0)) > 1e-6}
+        if wrong:
+            print(f"Final values differ from the last sent: {wrong}")
+            failed = True
+    else:
+        print(f"Dropped {sent['count'] - result['total_received']} messages, final values not checked")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Editor reads of the playhead, playback range and playing state per tick, with and without
+the per tick cache in SequencerControls.time_controls.
+
+Each scenario runs what one tick of OSC handling can do, against the mock `unreal` module,
+and counts the editor calls it makes. It also checks that a read after a jump sees the new
+playhead, that nothing cached is returned after end_tick(), and that a ScrubEngine tick,
+which runs outside the bridge's cache window, reads only the playhead once the scrub started.
+Exits with status 1 if a check fails. Run from the repository root:
+    python -m benchmarks.playhead_calls
+"""
+import logging
+import sys
+
+from benchmarks import mock_unreal
+
+unreal = mock_unreal.install()
+
+from src import logger
+from src.tickHook import TickScheduler
+from src.sequencer.scrubEngine import ScrubEngine
+from src.sequencer.sequencerControls import SequencerControls, ctrlRigVals
+
+_READS = (
+    "LevelSequenceEditorBlueprintLibrary.get_current_time",
+    "LevelSequence.get_playback_start",
+    "LevelSequence.get_playback_end",
+    "LevelSequenceEditorBlueprintLibrary.is_playing",
+)
+
+def _build_controls():
+    unreal.reset()
+    sequence = unreal.LevelSequence("playhead", playback_start=0, playback_end=240)
+    rig = unreal.ControlRigBlueprint("playhead_Rig", {ctrl.value: "Float" for ctrl in ctrlRigVals})
+    actor = unreal.SkeletalMeshActor("SkeletalMeshActor_6")
+    unreal.add_level_actor(actor)
+    controls = SequencerControls(sequence, frame_rate=24)
+    controls.add_control_rig_to_actor(controls.add_possesable_to_sequence(actor), rig)
+    unreal.LevelSequenceEditorBlueprintLibrary._current_time = 100
+    return controls
+
+def keyframe_faders(controls):
+    for ctrl in ctrlRigVals:
+        controls.set_keyframe_control_rig(ctrl.value, 10.0)
+
+def remove_keys(controls):
+    # Press and release of a RemoveKeys button handled in the same tick
+    start = controls.time_controls.current_time()
+    end = controls.time_controls.current_time()
+    controls.remove_keys_in_range_for_ctrl(ctrlRigVals.RightHandIndex.value, start, end)
+
+def jump_to_percent(controls):
+    for percent in (10.0, 50.0, 90.0):
+        controls.time_controls.jump_to_percent(percent)
+
+def time_knob(controls):
+    for value in (10.0, 20.0, 30.0, 40.0, 50.0):
+        controls.time_controls.time_knob_control(value, 1)
+
+def record_toggle(controls):
+    controls.time_controls.is_playing()
+    controls.time_controls.current_time()
+    controls.time_controls.is_playing()
+
+# Scenario and the editor reads it may make with the cache, a jump or knob step has to read back the playhead
+_SCENARIOS = [
+    (keyframe_faders, 1),
+    (remove_keys, 1),
+    (jump_to_percent, 2),
+    (time_knob, 5),
+    (record_toggle, 2),
+]
+
+def measure(scenario, cached):
+    controls = _build_controls()
+    if cached:
+        controls.time_controls.begin_tick()
+    unreal.reset_calls()
+    scenario(controls)
+    return sum(unreal.calls[name] for name in _READS)
+
+def check_jump_is_seen():
+    controls = _build_controls()
+    time_controls = controls.time_controls
+    time_controls.begin_tick()
+    before = time_controls.current_time()
+    time_controls.jump_x_frames_forward(5)
+    after = time_controls.current_time()
+    time_controls.set_sequence_range(10, 20)
+    return after == before + 5 and time_controls.get_sequence_range() == (10, 20)
+
+def check_no_stale_read_after_tick():
+    # The editor moves the playhead after the tick (e.g. playback), the next read and key must follow it
+    controls = _build_controls()
+    time_controls = controls.time_controls
+    time_controls.begin_tick()
+    time_controls.current_time()
+    time_controls.end_tick()
+    unreal.LevelSequenceEditorBlueprintLibrary._current_time = 120
+    controls.set_keyframe_control_rig(ctrlRigVals.RightHandIndex.value, 10.0)
+    keyed = [key.get_time().frame_number.value for channel in controls.get_channels_for_ctrl(ctrlRigVals.RightHandIndex.value) for key in channel.get_keys()]
+    return time_controls.current_time() == 120 and keyed == [120]
+
+def check_scrub_reads(ticks=10):
+    # Knob held at the rail: one playhead read per tick, the range only on the first tick and after a range change
+    controls = _build_controls()
+    scheduler = TickScheduler()
+    engine = ScrubEngine(controls.time_controls, scheduler=scheduler)
+    engine.set_knob(100.0)
+    unreal.reset_calls()
+    for _ in range(ticks):
+        scheduler.tick(1.0 / 60.0)
+    reads = sum(unreal.calls[name] for name in _READS)
+    controls.time_controls.set_sequence_range(0, 200)
+    unreal.reset_calls()
+    for _ in range(ticks):
+        scheduler.tick(1.0 / 60.0)
+    reads_after_range = sum(unreal.calls[name] for name in _READS)
+    engine.stop()
+    return reads == ticks + 2 and reads_after_range == ticks + 2
+
+def main():
+    logger.configure(level=logging.WARNING)
+    failed = False
+    print(f"{'scenario':>16} {'uncached':>9} {'cached':>7} {'expected':>9}")
+    for scenario, expected in _SCENARIOS:
+        uncached = measure(scenario, cached=False)
+        cached = measure(scenario, cached=True)
+        print(f"{scenario.__name__:>16} {uncached:>9} {cached:>7} {expected:>9}")
+        if cached > expected:
+            failed = True
+            print(f"  too many reads for {scenario.__name__}")
+
+    if check_jump_is_seen():
+        print("reads after a jump or range change see the new values")
+    else:
+        failed = True
+        print("stale read after a jump or range change")
+    if check_no_stale_read_after_tick():
+        print("reads after end_tick see the editor's playhead")
+    else:
+        failed = True
+        print("stale read after end_tick")
+    if check_scrub_reads():
+        print("scrub ticks read the playhead once, the range on start and after a range change")
+    else:
+        failed = True
+        print("scrub ticks read more than the playhead")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
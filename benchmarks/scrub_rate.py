@@ -0,0 +1,84 @@
+"""
+Playhead movement of the same TimeKnob gesture at different tick and OSC message rates.
+
+The legacy time_knob_control moves the playhead one step per knob message, so how far it goes
+depends on how often the controller sends. ScrubEngine integrates a velocity against
+delta_seconds and should land on about the same frame at every rate, setting the playhead
+at most once per tick. Time is simulated, the mock `unreal` module stands in for the editor.
+Run from the repository root:
+    python -m benchmarks.scrub_rate
+"""
+import argparse
+import logging
+
+from benchmarks import mock_unreal
+
+unreal = mock_unreal.install()
+
+from src import logger
+from src.tickHook import TickScheduler
+from src.sequencer.scrubEngine import ScrubEngine
+from src.sequencer.sequencerControls import SequencerControls
+
+def _build_controls():
+    unreal.reset()
+    sequence = unreal.LevelSequence("scrub", playback_start=0, playback_end=2400)
+    controls = SequencerControls(sequence, frame_rate=24)
+    unreal.LevelSequenceEditorBlueprintLibrary._current_time = 1200
+    return controls
+
+def gesture(t, turn_seconds):
+    """Knob value at time t: turn from 0 to 60 over turn_seconds, then hold."""
+    return 60.0 * min(t / turn_seconds, 1.0)
+
+def run_engine(tick_hz, message_hz, seconds, turn_seconds, mode):
+    controls = _build_controls()
+    scheduler = TickScheduler()
+    engine = ScrubEngine(controls.time_controls, mode=mode, scheduler=scheduler)
+    tick_dt = 1.0 / tick_hz
+    message_dt = 1.0 / message_hz
+    next_message = 0.0
+    now = 0.0
+    max_sets_per_tick = 0
+    while now < seconds:
+        now += tick_dt
+        # Deliver the messages that arrived since the previous tick, the bridge passes on the latest
+        while next_message <= now:
+            engine.set_knob(gesture(next_message, turn_seconds), timestamp=next_message)
+            next_message += message_dt
+        controls.time_controls.begin_tick()
+        sets = engine.sets
+        if scheduler.tasks:
+            scheduler.tick(tick_dt)
+        max_sets_per_tick = max(max_sets_per_tick, engine.sets - sets)
+    engine.stop()
+    return controls.time_controls.current_time() - 1200, max_sets_per_tick
+
+def run_legacy(message_hz, seconds, turn_seconds):
+    controls = _build_controls()
+    message_dt = 1.0 / message_hz
+    t = 0.0
+    while t < seconds:
+        value = gesture(t, turn_seconds)
+        if value != controls.time_controls.timeKnobPrevious:
+            controls.time_controls.time_knob_control(value, 1)
+        t += message_dt
+    return controls.time_controls.current_time() - 1200
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=2.0, help="Simulated time, turn plus coast")
+    parser.add_argument("--turn-seconds", type=float, default=0.5, help="How long the knob is turned for")
+    parser.add_argument("--mode", choices=(ScrubEngine.JOG, ScrubEngine.SHUTTLE), default=ScrubEngine.JOG)
+    args = parser.parse_args()
+    logger.configure(level=logging.WARNING)
+
+    print(f"{'tick Hz':>8} {'msg Hz':>7} {'legacy frames':>14} {'engine frames':>14} {'max sets/tick':>14}")
+    for tick_hz in (30, 60, 120):
+        for message_hz in (25, 50, 100):
+            legacy = run_legacy(message_hz, args.seconds, args.turn_seconds)
+            moved, max_sets = run_engine(tick_hz, message_hz, args.seconds, args.turn_seconds, args.mode)
+            print(f"{tick_hz:>8} {message_hz:>7} {legacy:>14} {moved:>14} {max_sets:>14}")
+
+if __name__ == "__main__":
+    main()
@@ -1,27 +1,158 @@
 import socket
-import select
+import struct
+import threading
+import time
 from pythonosc.osc_packet import OscPacket
-from collections import defaultdict
+from src.inputSource import InputSource
+from src.logger import get_logger
 
-class OSCListener:
-    def __init__(self, ip="127.0.0.1", port=5501):
+log = get_logger("OSCListener")
+
+# Argument type tags the fast decoder understands, mapped to (struct format, size)
+_FAST_ARG_FORMATS = {
+    "f": (">f", 4),
+    "i": (">i", 4),
+    "d": (">d", 8),
+    "h": (">q", 8),
+}
+_FAST_ARG_CONSTANTS = {
+    "T": True,
+    "F": False,
+    "N": None,
+}
+_BUNDLE_PREFIX = b"#bundle\0"
+
+def _align4(offset):
+    return (offset + 3) & ~3
+
+class OSCListener(InputSource):
+    def __init__(self, ip="127.0.0.1", port=5501, buffer_size=1024, max_packets_per_update=None, threaded=False, max_untracked_addresses=256):
+        super().__init__(threaded=threaded, max_untracked_addresses=max_untracked_addresses)
         self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         self.sock.bind((ip, port))
-        self.sock.setblocking(False)
-        self.latest_osc_values = defaultdict(lambda: None)
+        # Same dict as latest_values, under its old name
+        self.latest_osc_values = self.latest_values
+
+        # Reused receive buffer, packets are decoded in place before the next read
+        self._buffer = bytearray(buffer_size)
+        self._view = memoryview(self._buffer)
+        self.max_packets_per_update = max_packets_per_update
+
+        # Stats
+        self.packets_received = 0
+        self.packets_fallback = 0
 
-    def update(self):
+        # UDP arrival of the packet being decoded, taken while a profiler or recorder is set
+        self._arrival = 0.0
+
+        # Threaded mode: the receiver thread pushes into the pending values, update() swaps them in
+        self._thread = None
+        if threaded:
+            self.sock.settimeout(0.1)
+            self._thread = threading.Thread(target=self._receive_loop, name="OSCListener", daemon=True)
+            self._thread.start()
+        else:
+            self.sock.setblocking(False)
+
+    def poll(self):
+        self._drain_socket(self.profiler)
+
+    def _drain_socket(self, profiler):
+        count = 0
         try:
-            while True:
-                ready = select.select([self.sock], [], [], 0.0)[0]
-                if not ready:
+            while self.max_packets_per_update is None or count < self.max_packets_per_update:
+                try:
+                    size = self.sock.recv_into(self._view)
+                except BlockingIOError:
                     break
-                data, addr = self.sock.recvfrom(1024)
-                packet = OscPacket(data)
-                for timed_msg in packet.messages:
-                    msg = timed_msg.message
-                    address = msg.address.strip("/")
-                    value = msg.params[-1] if msg.params else None
-                    self.latest_osc_values[address] = value
+                count += 1
+                if profiler is not None or self.recorder is not None:
+                    self._arrival = time.perf_counter()
+                self._handle_datagram(size)
         except Exception as e:
-            print(f"[OSCListener] Error: {e}")
+            log.error("Failed to handle packet: %s", e)
+        finally:
+            self.packets_received += count
+            self.last_update_packets = count
+
+    def close(self):
+        """Stop the receiver thread (if any) and close the socket."""
+        super().close()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.sock.close()
+        log.info("Closed.")
+
+    def _receive_loop(self):
+        while not self._stop_event.is_set():
+            try:
+                size = self.sock.recv_into(self._view)
+            except socket.timeout:
+                continue
+            except OSError:
+                # Socket closed underneath us during shutdown
+                break
+            if self.profiler is not None or self.recorder is not None:
+                self._arrival = time.perf_counter()
+            try:
+                self.packets_received += 1
+                self._handle_datagram(size)
+            except Exception as e:
+                log.error("Failed to handle packet: %s", e)
+
+    def _handle_datagram(self, size):
+        if not self._decode_simple_message(size):
+            self.packets_fallback += 1
+            self._handle_with_python_osc(bytes(self._view[:size]))
+
+    def _store(self, address, value):
+        self.push(address, value, self._arrival)
+
+    def _decode_simple_message(self, size):
+        """
+        Decode a plain OSC message straight from the receive buffer.
+
+        Only the address and the last argument are extracted. Returns False for
+        bundles, malformed packets and unsupported type tags, so the caller can
+        fall back to python-osc.
+        """
+        buf = self._buffer
+        if size < 8 or buf[0] != 0x2F or buf.startswith(_BUNDLE_PREFIX, 0, size):  # 0x2F == "/"
+            return False
+
+        address_end = buf.find(b"\0", 0, size)
+        if address_end < 0:
+            return False
+        tags_start = _align4(address_end + 1)
+        if tags_start >= size or buf[tags_start] != 0x2C:  # 0x2C == ","
+            return False
+        tags_end = buf.find(b"\0", tags_start, size)
+        if tags_end < 0:
+            return False
+
+        offset = _align4(tags_end + 1)
+        value = None
+        for tag in buf[tags_start + 1:tags_end].decode("ascii"):
+            fmt = _FAST_ARG_FORMATS.get(tag)
+            if fmt is not None:
+                if offset + fmt[1] > size:
+                    return False
+                value = struct.unpack_from(fmt[0], buf, offset)[0]
+                offset += fmt[1]
+            elif tag in _FAST_ARG_CONSTANTS:
+                value = _FAST_ARG_CONSTANTS[tag]
+            else:
+                return False
+
+        address = buf[:address_end].decode("ascii").strip("/")
+        self._store(address, value)
+        return True
+
+    def _handle_with_python_osc(self, data):
+        packet = OscPacket(data)
+        for timed_msg in packet.messages:
+            msg = timed_msg.message
+            address = msg.address.strip("/")
+            value = msg.params[-1] if msg.params else None
+            self._store(address, value)
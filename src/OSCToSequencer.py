@@ -1,38 +1,247 @@
 import time
-import json
+from collections.abc import Mapping
+from functools import partial
+from src.controlMapping import ControlMappingLoader, validate_mapping
+from src.logger import get_logger
+from src.faderRecorder import FaderRecorder
+from src.sequencer.scrubEngine import ScrubEngine
+
+_DEFAULT_TIME_KNOB_SPEED = 5.0
+
+log = get_logger("OSCToSequencerBridge")
 
 class OSCToSequencerBridge:
-    def __init__(self, osc_listener, sequencer_controls, control_mapping_path, rate_limit_interval=0.05):
-        self.osc_listener = osc_listener
+    def __init__(self, input_source, sequencer_controls, control_mapping_path, rate_limit_interval=0.05, scheduler=None, watch_interval=1.0):
+        # Any InputSource: OSCListener, MidiInput or an InputMux of several
+        self.input_source = input_source
         self.sequencer_controls = sequencer_controls
         self.rate_limit_interval = rate_limit_interval
         self.previous_osc_values = {}
         self.last_update_times = {}
-        self.time_knob_speed = 5.0  # Default speed for time knob control
+        self.time_knob_speed = _DEFAULT_TIME_KNOB_SPEED  # Set by TimeKnobSlow/TimeKnobFast, scales the scrub speed
+        # TimeKnob scrubbing, moves the playhead on its own scheduler task, see ScrubEngine
+        self.scrub = ScrubEngine(sequencer_controls.time_controls, scheduler=scheduler)
         self.remove_keys_start_frames = {}
+        # Controls that changed but were rate limited, retried on the next update
+        self._deferred = set()
+        self._last_generation = None
+        self.profiler = None  # Opt-in TickProfiler, see update()
+        self.recorder = None  # FaderRecorder while recording, see start_recording()
+        self._recording_started_playback = False
+
+        # Action registry, mapping values in the control mapping to handlers.
+        # Handlers are called as handler(control_id, value, converted_value).
+        self.actions = {
+            "TimeKnob": self._action_time_knob,
+            "TimeKnobSlow": partial(self._action_time_knob_speed, 1.0),
+            "TimeKnobFast": partial(self._action_time_knob_speed, 10.0),
+            "SaveSequence": self._action_save_sequence,
+            "FrameForward": self._action_frame_forward,
+            "FrameBackward": self._action_frame_backward,
+            "PlayPause": self._action_play_pause,
+            "Stop": self._action_stop,
+            "KeyframeAllZero": self._action_keyframe_all_zero,
+            "Record": self._action_record,
+        }
+        # Prefix actions get the remainder of the mapped string as their first argument
+        self.prefix_actions = {
+            "RemoveKeys": self._action_remove_keys,
+        }
+
+        # The mapping is validated and compiled into a read-only table, update() reloads it when the file changes.
+        # An invalid mapping raises here, on reload it is logged and the current one stays in use.
+        self.mapping_loader = ControlMappingLoader(control_mapping_path, self.compile_mapping, context=self.mapping_ctrl_names)
+        self.watch_interval = watch_interval  # Seconds between checks of the mapping file, None to never reload
+        self._next_mapping_check = time.perf_counter() + (watch_interval or 0.0)
+        self._set_mapping(self.mapping_loader.load())
+
+    def _set_mapping(self, compiled):
+        # Both are swapped as a whole, dispatch only ever sees one table
+        self.control_mapping = compiled.control_mapping
+        self.handlers = compiled.handlers
+        # Let the listener evict addresses that nothing is mapped to
+        self.input_source.set_tracked_addresses(self.handlers.keys())
+
+    def reload_mapping(self):
+        """Swap in the mapping file if it changed since it was loaded, returns whether it did."""
+        compiled = self.mapping_loader.poll()
+        if compiled is None:
+            return False
+        self._set_mapping(compiled)
+        return True
+
+    def register_action(self, name, handler, prefix=False):
+        """
+        Register (or replace) an action and recompile the mapping.
+
+        Params:
+        - name (str): The action name as used in the mapping JSON.
+        - handler (callable): Called as handler(control_id, value, converted_value),
+          prefix handlers receive the remainder of the mapped string first.
+        - prefix (bool): Match mapped strings starting with name instead of equal to it.
+        """
+        if not callable(handler):
+            raise ValueError("Provided handler must be callable")
+        if prefix:
+            self.prefix_actions[name] = handler
+        else:
+            self.actions[name] = handler
+        self._set_mapping(self.mapping_loader.recompile())
+
+    def compile_mapping(self, control_mapping):
+        """
+        Validate the mapping JSON and compile it into a dict of control_id to bound handler.
+
+        Raises ValueError listing every invalid entry. Once a rig is added to the sequence controls,
+        control names it doesn't have are logged as warnings, keying them only logs an error.
+        """
+        errors, warnings = validate_mapping(control_mapping, self.actions, tuple(self.prefix_actions), self.mapping_ctrl_names())
+        for warning in warnings:
+            log.warning("Control mapping: %s", warning)
+        if errors:
+            raise ValueError("Invalid control mapping:\n  " + "\n  ".join(errors))
+        return {control_id: self._compile_entry(control_mapping, mapped) for control_id, mapped in control_mapping.items()}
 
-        with open(control_mapping_path, "r") as f:
-            self.control_mapping = json.load(f)
+    def mapping_ctrl_names(self):
+        """Control names on the rig the mapping is validated against, None before a rig is added."""
+        if not self.sequencer_controls.control_rig:
+            return None
+        return frozenset(self.sequencer_controls.get_control_names())
+
+    def _compile_entry(self, control_mapping, mapped):
+        if isinstance(mapped, str):
+            action = self.actions.get(mapped)
+            if action is not None:
+                return action
+            for prefix, action in self.prefix_actions.items():
+                if mapped.startswith(prefix):
+                    return partial(action, mapped[len(prefix):])
+            return partial(self._action_keyframe, mapped, "Float")
+        elif isinstance(mapped, Mapping):
+            targets = []
+            for ctrl in mapped.get("set_prev", ()):
+                ctrl_mapping = control_mapping.get(ctrl)
+                if isinstance(ctrl_mapping, str):
+                    targets.append((ctrl, ctrl_mapping, "Float"))
+                elif isinstance(ctrl_mapping, (list, tuple)):
+                    targets.append((ctrl, ctrl_mapping[0], ctrl_mapping[1]))
+            return partial(self._action_set_prev, tuple(targets))
+        elif isinstance(mapped, (list, tuple)):
+            return partial(self._action_keyframe, mapped[0], mapped[1])
+        return None
 
     def convert_to_range(self, value):
         try:
             return max(-100.0, min(100.0, ((float(value) * 200.0) - 100.0)))
         except:
             return 0.0
-    
+
     def pop_previous_value(self, control_id):
         self.previous_osc_values.pop(control_id, None)
-        self.osc_listener.latest_osc_values.pop(control_id, None)
+        self.input_source.latest_values.pop(control_id, None)
+
+    def keyframe_targets(self):
+        """Control ids mapped to a keyframe action, as control_id -> (ctrl_name, modus)."""
+        targets = {}
+        for control_id, handler in self.handlers.items():
+            if getattr(handler, "func", None) == self._action_keyframe:
+                targets[control_id] = handler.args
+        return targets
+
+    def start_recording(self, capacity=65536, play=True):
+        """
+        Record every value of the keyframe mapped controls at full rate instead of keying them live.
+
+        Params:
+        - capacity (int): Samples kept per control, see FaderRecorder.
+        - play (bool): Start playback if the sequence is paused, it is paused again on stop.
+        """
+        if self.recorder is not None:
+            log.warning("Already recording.")
+            return self.recorder
+        time_controls = self.sequencer_controls.time_controls
+        self.recorder = FaderRecorder(self.keyframe_targets(), capacity, convert=self.convert_to_range)
+        self.recorder.start(time_controls.current_time(), self.sequencer_controls.frame_rate)
+        self.input_source.recorder = self.recorder
+        self._recording_started_playback = play and not time_controls.is_playing()
+        if self._recording_started_playback:
+            time_controls.play_pause()
+        return self.recorder
+
+    def stop_recording(self, epsilon=0.0):
+        """
+        Stop recording and write the takes as keys on the sequence's frame grid, in one undo step.
+
+        Params:
+        - epsilon (float): Drop keys within this distance of the line through their neighbours, 0 only drops holds.
+
+        Returns the number of keys written.
+        """
+        recorder, self.recorder = self.recorder, None
+        if recorder is None:
+            log.warning("Not recording.")
+            return 0
+        self.input_source.recorder = None
+        recorder.stop()
+        if self._recording_started_playback:
+            self.sequencer_controls.time_controls.play_pause()
+            self._recording_started_playback = False
+
+        curves = {}
+        for control_id, target in self.keyframe_targets().items():
+            frames, values = recorder.resample(control_id, epsilon)
+            if len(frames):
+                curves[target] = (frames, values)
+        return self.sequencer_controls.set_curves(curves, description="Record faders")
 
     def update(self):
+        # A changed mapping file is swapped in before dispatch, so this tick already uses it
+        if self.watch_interval is not None:
+            now = time.perf_counter()
+            if now >= self._next_mapping_check:
+                self._next_mapping_check = now + self.watch_interval
+                self.reload_mapping()
+        # Handlers share one read of the playhead during dispatch, later reads go to the editor again
+        time_controls = self.sequencer_controls.time_controls
+        time_controls.begin_tick()
+        try:
+            profiler = self.profiler
+            if profiler is None:
+                self._dispatch(None)
+                return
+            start = time.perf_counter()
+            self._dispatch(profiler)
+            profiler.record("dispatch", time.perf_counter() - start)
+        finally:
+            time_controls.end_tick()
+
+    def _dispatch(self, profiler):
+        # Nothing arrived and nothing is waiting on the rate limit
+        if self.input_source.generation == self._last_generation and not self._deferred:
+            return
+        self._last_generation = self.input_source.generation
+
+        changed = self.input_source.consume_changes()
+        if self._deferred:
+            changed |= self._deferred
+            self._deferred = set()
+        if not changed:
+            return
+
         now = time.time()
-        to_pop = []
-        for control_id, value in self.osc_listener.latest_osc_values.items():
-            if value is None or control_id not in self.control_mapping:
+        handlers = self.handlers
+        latest_values = self.input_source.latest_values
+        for control_id in changed:
+            handler = handlers.get(control_id)
+            if handler is None:
+                continue
+            value = latest_values.get(control_id)
+            if value is None:
                 continue
 
-            # Rate limiting
+            # Rate limiting, keep the control around so its latest value is applied once the interval has passed
             if now - self.last_update_times.get(control_id, 0) < self.rate_limit_interval:
+                self._deferred.add(control_id)
                 continue
 
             # Skip unchanged
@@ -41,65 +250,85 @@ class OSCToSequencerBridge:
 
             self.last_update_times[control_id] = now
             self.previous_osc_values[control_id] = value
-            mapped = self.control_mapping[control_id]
             converted_value = self.convert_to_range(value)
+            if profiler is None:
+                handler(control_id, value, converted_value)
+            else:
+                self._profiled_call(profiler, handler, control_id, value, converted_value)
+
+            log.debug("Updated %s to %s with mapping %s", control_id, converted_value, self.control_mapping[control_id])
+
+    def _profiled_call(self, profiler, handler, control_id, value, converted_value):
+        # Keyframes written by the handler measure their latency against this arrival, see SequencerControls
+        arrival = self.input_source.arrival_times.get(control_id)
+        if arrival is not None:
+            profiler.record("osc_to_dispatch", time.perf_counter() - arrival)
+        profiler.current_arrival = arrival
+        try:
+            handler(control_id, value, converted_value)
+        finally:
+            profiler.current_arrival = None
+
+    # Actions
+
+    def _action_time_knob(self, control_id, value, converted_value):
+        # The scrub engine keeps moving while the knob is held at a rail, no need to refire it every tick
+        self.scrub.set_knob(converted_value)
+
+    def _action_time_knob_speed(self, speed, control_id, value, converted_value):
+        if value == 1.0:
+            self.time_knob_speed = speed
+        elif value == 0.0:
+            self.time_knob_speed = _DEFAULT_TIME_KNOB_SPEED
+        self.scrub.speed_scale = self.time_knob_speed / _DEFAULT_TIME_KNOB_SPEED
+
+    def _action_save_sequence(self, control_id, value, converted_value):
+        # Export on press only, queued so the bake doesn't stall OSC handling, repeated presses merge into the pending export
+        if value != 1.0:
+            return
+        self.sequencer_controls.queue_export("file_name_test", "file_path", ue_package_path="/Game/")
+
+    def _action_frame_forward(self, control_id, value, converted_value):
+        self.sequencer_controls.time_controls.step_forward()
+
+    def _action_frame_backward(self, control_id, value, converted_value):
+        self.sequencer_controls.time_controls.step_backward()
+
+    def _action_play_pause(self, control_id, value, converted_value):
+        self.sequencer_controls.time_controls.play_pause()
+
+    def _action_stop(self, control_id, value, converted_value):
+        self.sequencer_controls.time_controls.pause()
+
+    def _action_record(self, control_id, value, converted_value):
+        # Toggle on press
+        if value == 1.0:
+            if self.recorder is None:
+                self.start_recording()
+            else:
+                self.stop_recording()
+
+    def _action_keyframe_all_zero(self, control_id, value, converted_value):
+        self.sequencer_controls.set_keyframe_all_zero()
+
+    def _action_remove_keys(self, ctrl_name, control_id, value, converted_value):
+        # If value is 1, record the current frame
+        if value == 1.0:
+            current_frame = self.sequencer_controls.time_controls.current_time()
+            self.remove_keys_start_frames[control_id] = current_frame
+        # If value is 0, remove keys between the recorded start frame and the current frame
+        elif value == 0.0 and control_id in self.remove_keys_start_frames:
+            start_frame = self.remove_keys_start_frames.pop(control_id)
+            current_frame = self.sequencer_controls.time_controls.current_time()
+            self.sequencer_controls.remove_keys_in_range_for_ctrl(ctrl_name, start_frame, current_frame)
+
+    def _action_set_prev(self, targets, control_id, value, converted_value):
+        for ctrl, ctrl_name, modus in targets:
+            if ctrl in self.previous_osc_values:
+                self.sequencer_controls.set_keyframe_control_rig(ctrl_name, self.convert_to_range(self.previous_osc_values[ctrl]), modus=modus)
 
-            # Handle actions
-            if isinstance(mapped, str):
-                if mapped == "TimeKnob":
-                    self.sequencer_controls.time_controls.time_knob_control(converted_value, self.time_knob_speed)
-                    # remove the TimeKnob from previous_osc_values to avoid repeated updates
-                    to_pop.append(control_id)
-                elif mapped == "TimeKnobSlow":
-                    if value == 1.0:
-                        self.time_knob_speed = 1.0
-                    elif value == 0.0:
-                        self.time_knob_speed = 5.0
-                elif mapped == "TimeKnobFast":
-                    if value == 1.0:
-                        self.time_knob_speed = 10.0
-                    elif value == 0.0:
-                        self.time_knob_speed = 5.0
-                elif mapped == "SaveSequence":
-                    self.sequencer_controls.export_current_sequence("file_name_test", "file_path", ue_package_path="/Game/")
-                elif mapped == "FrameForward":
-                    self.sequencer_controls.time_controls.step_forward()
-                elif mapped == "FrameBackward":
-                    self.sequencer_controls.time_controls.step_backward()
-                elif mapped == "PlayPause":
-                    self.sequencer_controls.time_controls.play_pause()
-                elif mapped == "KeyframeAllZero":
-                    self.sequencer_controls.set_keyframe_all_zero()
-                # elif mapped == "Stop":
-                #     self.sequencer_controls.time_controls.pause()
-                elif mapped.startswith("RemoveKeys"):
-                    # If value is 1, record the current frame
-                    if value == 1.0:
-                        current_frame = self.sequencer_controls.time_controls.current_time()
-                        self.remove_keys_start_frames[control_id] = current_frame
-                    # If value is 0, remove keys between the recorded start frame and the current frame
-                    elif value == 0.0 and control_id in self.remove_keys_start_frames:
-                        start_frame = self.remove_keys_start_frames.pop(control_id)
-                        current_frame = self.sequencer_controls.time_controls.current_time()
-                        # Assuming the control_id is in the form "RemoveKeys<control_name>"
-                        ctrl_name = mapped.split("RemoveKeys")[-1]
-                        self.sequencer_controls.remove_keys_in_range_for_ctrl(ctrl_name, start_frame, current_frame)
-                else:
-                    self.sequencer_controls.set_keyframe_control_rig(mapped, converted_value)
-            elif isinstance(mapped, dict):
-                for ctrl in mapped["set_prev"]:
-                    ctrl_mapping = self.control_mapping.get(ctrl)
-                    if isinstance(ctrl_mapping, str):
-                        if ctrl in self.previous_osc_values:
-                            self.sequencer_controls.set_keyframe_control_rig(ctrl_mapping, self.convert_to_range(self.previous_osc_values[ctrl]))
-                    elif isinstance(ctrl_mapping, list):
-                        if ctrl in self.previous_osc_values:
-                            self.sequencer_controls.set_keyframe_control_rig(ctrl_mapping[0], self.convert_to_range(self.previous_osc_values[ctrl]), modus=ctrl_mapping[1])
-            elif isinstance(mapped, list):
-                self.sequencer_controls.set_keyframe_control_rig(mapped[0], converted_value, modus=mapped[1])
-
-            print(f"[OSCToSequencerBridge] Updated {control_id} to {converted_value} with mapping {mapped}")
-        
-        # Remove popped controls from previous values, useful for controls like TimeKnob that should need to be updated repeatedly on max values
-        for control_id in to_pop:
-            self.pop_previous_value(control_id)
+    def _action_keyframe(self, ctrl_name, modus, control_id, value, converted_value):
+        # The recorder has every value of this control, it is keyed on stop_recording()
+        if self.recorder is not None:
+            return
+        self.sequencer_controls.set_keyframe_control_rig(ctrl_name, converted_value, modus=modus)
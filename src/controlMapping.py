@@ -0,0 +1,179 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from collections.abc import Mapping
+from types import MappingProxyType
+from src.logger import get_logger
+from src.sequencer.sequencerControls import SUPPORTED_MODI
+
+log = get_logger("ControlMapping")
+
+def _is_keyframe_entry(mapped, actions, prefix_actions):
+    if isinstance(mapped, (list, tuple)):
+        return True
+    return isinstance(mapped, str) and mapped not in actions and not any(mapped.startswith(prefix) for prefix in prefix_actions)
+
+def validate_mapping(control_mapping, actions, prefix_actions=(), ctrl_names=None):
+    """
+    Check a control mapping before it is compiled, returns (errors, warnings) as lists of messages.
+
+    Errors make the mapping unusable. Control names the rig doesn't have are warnings, keying
+    them only fails for that control.
+
+    Entries are an action name, a prefix action followed by a control name ("RemoveKeysRightHandIndex"),
+    a float control name, [ctrl_name, modus] or {"set_prev": [control ids of keyframed controls]}.
+
+    Params:
+    - actions, prefix_actions: The action names the bridge knows.
+    - ctrl_names (iterable): Controls on the rig, None skips checking control names.
+    """
+    if not isinstance(control_mapping, Mapping):
+        return [f"expected a JSON object, got {type(control_mapping).__name__}"], []
+    ctrl_names = frozenset(ctrl_names) if ctrl_names is not None else None
+    errors = []
+    warnings = []
+
+    def check_ctrl(control_id, ctrl_name):
+        if not ctrl_name:
+            errors.append(f"{control_id}: empty control name")
+        elif ctrl_names is not None and ctrl_name not in ctrl_names:
+            warnings.append(f"{control_id}: unknown control {ctrl_name!r}")
+
+    for control_id, mapped in control_mapping.items():
+        if isinstance(mapped, str):
+            if mapped in actions:
+                continue
+            prefix = next((prefix for prefix in prefix_actions if mapped.startswith(prefix)), None)
+            check_ctrl(control_id, mapped[len(prefix):] if prefix is not None else mapped)
+        elif isinstance(mapped, (list, tuple)):
+            if len(mapped) != 2 or not all(isinstance(part, str) for part in mapped):
+                errors.append(f"{control_id}: expected [ctrl_name, modus], got {list(mapped)!r}")
+                continue
+            check_ctrl(control_id, mapped[0])
+            if mapped[1] not in SUPPORTED_MODI:
+                errors.append(f"{control_id}: unsupported modus {mapped[1]!r}, expected one of {sorted(SUPPORTED_MODI)}")
+        elif isinstance(mapped, Mapping):
+            unknown = set(mapped) - {"set_prev"}
+            if unknown:
+                errors.append(f"{control_id}: unknown keys {sorted(unknown)}")
+            set_prev = mapped.get("set_prev", ())
+            if not isinstance(set_prev, (list, tuple)):
+                errors.append(f"{control_id}: set_prev must be a list of control ids")
+                continue
+            for ref in set_prev:
+                if ref not in control_mapping:
+                    errors.append(f"{control_id}: set_prev references unmapped control {ref!r}")
+                elif not _is_keyframe_entry(control_mapping[ref], actions, prefix_actions):
+                    errors.append(f"{control_id}: set_prev references {ref!r}, which is not a keyframed control")
+        else:
+            errors.append(f"{control_id}: unsupported mapping {mapped!r}")
+    return errors, warnings
+
+def freeze(value):
+    """Read-only copy of parsed JSON, objects become MappingProxyType and lists tuples."""
+    if isinstance(value, Mapping):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+class CompiledMapping:
+    """A validated mapping and its handlers, both read-only, so a table is only ever replaced as a whole."""
+    __slots__ = ("control_mapping", "handlers", "digest")
+
+    def __init__(self, control_mapping, handlers, digest):
+        self.control_mapping = freeze(control_mapping)
+        self.handlers = MappingProxyType(dict(handlers))
+        self.digest = digest
+
+class ControlMappingLoader:
+    """
+    Loads a control mapping file through a compile function and reloads it when the file changes.
+
+    poll() compares the file's mtime and size with the last load, so it costs one stat call. A file
+    that no longer validates is logged and the current mapping stays in use. Compiled mappings are
+    kept by SHA-1 of the file contents and the compile context, so going back to an earlier version
+    skips validation and compile.
+
+    Params:
+    - path (str): The mapping JSON.
+    - compile (callable): compile(control_mapping) -> {control_id: handler}, raises ValueError when invalid.
+    - context (callable): Returns whatever else the compile depends on (e.g. the rig's control names),
+      part of the cache key so a table compiled against one rig isn't reused for another.
+    - cache_size (int): Compiled mappings kept.
+    """
+    def __init__(self, path, compile, context=None, cache_size=8):
+        self.path = path
+        self.compile = compile
+        self.context = context
+        self.cache_size = cache_size
+        self.current = None
+        self._cache = OrderedDict()
+        self._stat = None
+
+        # Stats
+        self.reloads = 0
+        self.cache_hits = 0
+        self.failures = 0
+
+    def load(self):
+        """Load, validate and compile the file, raises OSError or ValueError."""
+        # Stat before reading, a write that lands during the read is picked up by the next poll
+        stat = os.stat(self.path)
+        with open(self.path, "rb") as f:
+            data = f.read()
+        self._stat = (stat.st_mtime_ns, stat.st_size)
+        digest = hashlib.sha1(data).hexdigest()
+
+        key = self._key(digest)
+        compiled = self._cache.get(key)
+        if compiled is not None:
+            self._cache.move_to_end(key)
+            self.cache_hits += 1
+        else:
+            control_mapping = json.loads(data)
+            compiled = CompiledMapping(control_mapping, self.compile(control_mapping), digest)
+            self._remember(key, compiled)
+        self.current = compiled
+        return compiled
+
+    def poll(self):
+        """Reload if the file changed. Returns the new CompiledMapping, None if unchanged or invalid."""
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        if (stat.st_mtime_ns, stat.st_size) == self._stat:
+            return None
+
+        previous = self.current
+        try:
+            compiled = self.load()
+        except (OSError, ValueError) as e:
+            self.failures += 1
+            log.error("Keeping the current control mapping, %s failed to load: %s", self.path, e)
+            return None
+        if previous is not None and compiled.digest == previous.digest:
+            return None
+        self.reloads += 1
+        log.info("Reloaded control mapping %s, %s controls", self.path, len(compiled.handlers))
+        return compiled
+
+    def recompile(self):
+        """Compile the current mapping again, e.g. after the actions changed. Drops the cache."""
+        self._cache.clear()
+        if self.current is None:
+            return self.load()
+        current = self.current
+        self.current = CompiledMapping(current.control_mapping, self.compile(current.control_mapping), current.digest)
+        self._remember(self._key(current.digest), self.current)
+        return self.current
+
+    def _key(self, digest):
+        return (digest, self.context() if self.context is not None else None)
+
+    def _remember(self, key, compiled):
+        self._cache[key] = compiled
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
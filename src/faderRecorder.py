@@ -0,0 +1,127 @@
+import math
+import threading
+import time
+from array import array
+from src.logger import get_logger
+
+log = get_logger("FaderRecorder")
+
+class _SampleRing:
+    """Fixed size ring of (time, value) pairs in two preallocated array('d') buffers."""
+    __slots__ = ("times", "values", "head", "count")
+
+    def __init__(self, capacity):
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.head = 0
+        self.count = 0
+
+    def append(self, timestamp, value):
+        head = self.head
+        self.times[head] = timestamp
+        self.values[head] = value
+        self.head = (head + 1) % len(self.times)
+        if self.count < len(self.times):
+            self.count += 1
+            return False
+        return True  # Overwrote the oldest sample
+
+    def ordered(self):
+        if self.count < len(self.times):
+            return self.times[:self.count], self.values[:self.count]
+        head = self.head
+        return self.times[head:] + self.times[:head], self.values[head:] + self.values[:head]
+
+class FaderRecorder:
+    """
+    Capture every value of a set of OSC addresses with its arrival time, to write them as keys afterwards.
+
+    While set as the recorder of an InputSource (OSCListener, MidiInput) it gets every value, so
+    nothing is lost to the tick rate or the bridge's rate limit. Samples are placed on the timeline
+    by arrival time, as if the sequence plays in real time from the frame the recording started at.
+    Run the listener threaded while recording, so arrival is taken when a packet comes in rather
+    than when the tick drains the socket.
+
+    Params:
+    - addresses (iterable): The OSC addresses (control ids) to record, others are ignored.
+    - capacity (int): Samples kept per address, the oldest are overwritten beyond that.
+    - convert (callable): Applied to each value as it is recorded, e.g. the bridge's convert_to_range.
+    """
+    def __init__(self, addresses, capacity=65536, convert=None):
+        self.capacity = capacity
+        self.convert = convert
+        self._rings = {address: _SampleRing(capacity) for address in addresses}
+        self._lock = threading.Lock()  # record() runs on the listener thread in threaded mode
+        self.start_time = None
+        self.stop_time = None
+        self.start_frame = 0
+        self.frame_rate = 24
+
+        # Stats
+        self.recorded = 0
+        self.overwritten = 0
+        self.ignored = 0
+
+    @property
+    def recording(self):
+        return self.start_time is not None and self.stop_time is None
+
+    def start(self, start_frame, frame_rate):
+        with self._lock:
+            for address in self._rings:
+                self._rings[address] = _SampleRing(self.capacity)
+            self.start_frame = start_frame
+            self.frame_rate = frame_rate
+            self.stop_time = None
+            self.start_time = time.perf_counter()
+        log.info("Recording %s controls from frame %s at %s fps", len(self._rings), start_frame, frame_rate)
+
+    def stop(self):
+        with self._lock:
+            self.stop_time = time.perf_counter()
+        log.info("Recorded %s samples in %.2f s, %s overwritten", self.recorded, self.stop_time - self.start_time, self.overwritten)
+
+    def record(self, address, value, timestamp=None):
+        ring = self._rings.get(address)
+        if ring is None or value is None or not self.recording:
+            self.ignored += 1
+            return
+        if self.convert is not None:
+            value = self.convert(value)
+        with self._lock:
+            if ring.append(timestamp if timestamp else time.perf_counter(), float(value)):
+                self.overwritten += 1
+            self.recorded += 1
+
+    def samples(self, address):
+        """(times, values) of an address in arrival order, as array('d')."""
+        ring = self._rings.get(address)
+        if ring is None:
+            return array("d"), array("d")
+        with self._lock:
+            return ring.ordered()
+
+    def resample(self, address, epsilon=0.0):
+        """
+        The samples of an address on the frame grid, as int64 frames and float64 values.
+
+        Faders only send on change, so each frame holds the last value that arrived at or before
+        it. Keys that lie within epsilon of the line through their neighbours (e.g. the middle of
+        a hold) are dropped.
+        """
+        import numpy as np
+        from src.sequencer.curveProcessing import rdp_mask
+
+        times, values = self.samples(address)
+        if not times:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        positions = self.start_frame + (np.frombuffer(times, dtype=np.float64) - self.start_time) * self.frame_rate
+        values = np.frombuffer(values, dtype=np.float64)
+
+        end_time = self.stop_time if self.stop_time is not None else time.perf_counter()
+        last_frame = math.floor(self.start_frame + (end_time - self.start_time) * self.frame_rate)
+        frames = np.arange(math.ceil(positions[0]), max(last_frame, math.ceil(positions[0])) + 1, dtype=np.int64)
+        held = values[np.searchsorted(positions, frames, side="right") - 1]
+
+        keep = rdp_mask(frames, held, epsilon)
+        return frames[keep], held[keep]
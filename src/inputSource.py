@@ -0,0 +1,177 @@
+import threading
+import time
+from collections import defaultdict, OrderedDict
+
+class InputSource:
+    """
+    Base for the inputs OSCToSequencerBridge reads controls from (OSCListener, MidiInput, InputMux).
+
+    Subclasses deliver (control_id, value, timestamp) through push(). Values are coalesced per
+    control id into latest_values, and the ids written since the last consume_changes() form the
+    dirty set the bridge dispatches from. With threaded=True push() may be called from another
+    thread (a receiver thread or a driver callback); values wait in a pending dict until update()
+    swaps them in on the game thread. Otherwise update() calls poll() to read the input.
+
+    Params:
+    - threaded (bool): push() is called from another thread.
+    - max_untracked_addresses (int): Control ids outside tracked_addresses are evicted oldest first beyond this.
+    """
+    def __init__(self, threaded=False, max_untracked_addresses=256):
+        self.latest_values = defaultdict(lambda: None)
+
+        # Change tracking, consumers call consume_changes() to get the control ids written since their last call
+        self.generation = 0
+        self._dirty = set()
+
+        # Ids outside tracked_addresses are evicted oldest first once there are more than max_untracked_addresses.
+        # None means nothing is tracked, so every id counts towards the bound.
+        self.tracked_addresses = None
+        self.max_untracked_addresses = max_untracked_addresses
+        self._untracked = OrderedDict()
+
+        # Opt-in TickProfiler, also records per control arrival times (time.perf_counter) in arrival_times
+        self.profiler = None
+        self.arrival_times = {}
+
+        # Opt-in FaderRecorder, gets every value with its arrival time
+        self.recorder = None
+
+        # Threaded mode: push() coalesces into _pending, update() swaps it out
+        self.threaded = threaded
+        self._pending = {}
+        self._pending_arrivals = {}
+        self._pending_lock = threading.Lock()
+        self._stop_event = threading.Event()
+
+        # Stats
+        self.last_update_packets = 0
+
+    def update(self):
+        profiler = self.profiler
+        start = time.perf_counter() if profiler is not None else 0.0
+        if self.threaded:
+            self._swap_pending()
+        else:
+            self.poll()
+        if profiler is not None:
+            profiler.record("listener_update", time.perf_counter() - start)
+
+    def poll(self):
+        """Read the input on the game thread, called by update() when not threaded."""
+
+    def close(self):
+        self._stop_event.set()
+
+    def push(self, control_id, value, timestamp=None):
+        """Deliver a value, timestamp is its arrival in time.perf_counter() seconds."""
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(control_id, value, timestamp)
+        if self.threaded:
+            with self._pending_lock:
+                self._pending[control_id] = value
+                if self.profiler is not None and timestamp is not None:
+                    self._pending_arrivals[control_id] = timestamp
+        else:
+            self._record(control_id, value)
+            if self.profiler is not None and timestamp is not None:
+                self.arrival_times[control_id] = timestamp
+
+    def set_tracked_addresses(self, addresses):
+        """Set the control ids that are never evicted, e.g. the ones present in a control mapping."""
+        self.tracked_addresses = frozenset(addresses) if addresses is not None else None
+        if self.tracked_addresses:
+            for address in self.tracked_addresses:
+                self._untracked.pop(address, None)
+
+    def consume_changes(self):
+        """Return the set of control ids written since the last call and reset it."""
+        changed, self._dirty = self._dirty, set()
+        return changed
+
+    def _swap_pending(self):
+        with self._pending_lock:
+            if not self._pending:
+                self.last_update_packets = 0
+                return
+            pending, self._pending = self._pending, {}
+            arrivals, self._pending_arrivals = self._pending_arrivals, {}
+        self.last_update_packets = len(pending)
+        for address, value in pending.items():
+            self._record(address, value)
+        if arrivals:
+            self.arrival_times.update(arrivals)
+
+    def _record(self, address, value):
+        self.latest_values[address] = value
+        self._dirty.add(address)
+        self.generation += 1
+
+        if self.tracked_addresses is not None and address in self.tracked_addresses:
+            return
+        untracked = self._untracked
+        untracked[address] = None
+        untracked.move_to_end(address)
+        if len(untracked) > self.max_untracked_addresses:
+            evicted, _ = untracked.popitem(last=False)
+            self.latest_values.pop(evicted, None)
+            self.arrival_times.pop(evicted, None)
+            self._dirty.discard(evicted)
+
+class InputMux(InputSource):
+    """
+    Several inputs behind one bridge, e.g. the fader desk over MIDI next to OSC from a tablet.
+
+    update() updates every source and merges the control ids they changed, the last source
+    wins when two write the same id in one tick. The profiler and recorder are handed to
+    the sources, so arrival times and recorded samples are taken where values come in.
+    """
+    def __init__(self, *sources, max_untracked_addresses=256):
+        if not sources:
+            raise ValueError("InputMux needs at least one source")
+        self.sources = sources
+        super().__init__(threaded=False, max_untracked_addresses=max_untracked_addresses)
+
+    @property
+    def profiler(self):
+        return self._profiler
+
+    @profiler.setter
+    def profiler(self, profiler):
+        self._profiler = profiler
+        for source in self.sources:
+            source.profiler = profiler
+
+    @property
+    def recorder(self):
+        return self._recorder
+
+    @recorder.setter
+    def recorder(self, recorder):
+        self._recorder = recorder
+        for source in self.sources:
+            source.recorder = recorder
+
+    def update(self):
+        for source in self.sources:
+            source.update()
+            changed = source.consume_changes()
+            if not changed:
+                continue
+            latest_values = source.latest_values
+            for control_id in changed:
+                value = latest_values.get(control_id)
+                if value is not None:
+                    self._record(control_id, value)
+            if self._profiler is not None:
+                self.arrival_times.update((control_id, source.arrival_times[control_id]) for control_id in changed if control_id in source.arrival_times)
+
+    def set_tracked_addresses(self, addresses):
+        super().set_tracked_addresses(addresses)
+        for source in self.sources:
+            source.set_tracked_addresses(addresses)
+
+    def close(self):
+        for source in self.sources:
+            source.close()
+        super().close()
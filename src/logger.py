@@ -0,0 +1,141 @@
+import logging
+import sys
+import threading
+from collections import deque
+
+ROOT_LOGGER_NAME = "SequenceController"
+
+class RateLimitFilter(logging.Filter):
+    """
+    Rate limit records per call site (file and line).
+
+    Every `interval` seconds a call site may emit `burst` records, further records
+    are dropped, or sampled when sample_every is set. The first record of the next
+    window reports how many were dropped.
+    """
+    def __init__(self, interval=1.0, burst=5, sample_every=None):
+        super().__init__()
+        self.interval = interval
+        self.burst = burst
+        self.sample_every = sample_every
+        self._sites = {}  # (pathname, lineno) -> [window_start, emitted, suppressed]
+
+    def filter(self, record):
+        if self.interval is None:
+            return True
+
+        site = (record.pathname, record.lineno)
+        state = self._sites.get(site)
+        if state is None or record.created - state[0] >= self.interval:
+            suppressed = state[2] if state is not None else 0
+            self._sites[site] = [record.created, 1, 0]
+            record.suppressed = suppressed
+            return True
+
+        if state[1] < self.burst:
+            state[1] += 1
+            return True
+        state[2] += 1
+        return self.sample_every is not None and state[2] % self.sample_every == 0
+
+class RingBufferHandler(logging.Handler):
+    """Keep the last `capacity` records in memory, see dump()."""
+    def __init__(self, capacity=1000):
+        super().__init__()
+        self.records = deque(maxlen=capacity)
+
+    def emit(self, record):
+        self.records.append(record)
+
+    def dump(self, path=None, background=True):
+        """
+        Write the buffered records and clear the buffer.
+
+        Params:
+        - path (str): File to append to, defaults to stdout.
+        - background (bool): Format and write on a separate thread, returns the thread.
+        """
+        records = list(self.records)
+        self.records.clear()
+        if not background:
+            self._write(records, path)
+            return None
+        thread = threading.Thread(target=self._write, args=(records, path), name="LogDump", daemon=True)
+        thread.start()
+        return thread
+
+    def _write(self, records, path):
+        lines = "".join(self.format(record) + "\n" for record in records)
+        if path is None:
+            sys.stdout.write(lines)
+        else:
+            with open(path, "a") as f:
+                f.write(lines)
+
+class _ConsoleHandler(logging.StreamHandler):
+    # Unreal swaps sys.stdout for the Output Log, so look it up on every emit
+    def emit(self, record):
+        self.stream = sys.stdout
+        super().emit(record)
+
+class _Formatter(logging.Formatter):
+    def format(self, record):
+        record.component = record.name.rpartition(".")[2]
+        text = super().format(record)
+        suppressed = getattr(record, "suppressed", 0)
+        if suppressed:
+            text += f" ({suppressed} similar messages suppressed)"
+        return text
+
+_root = logging.getLogger(ROOT_LOGGER_NAME)
+_console_handler = None
+_ring_handler = None
+
+def configure(level=logging.INFO, console=True, console_level=None, ring_capacity=1000, rate_limit_interval=1.0, burst=5, sample_every=None):
+    """
+    Configure the project loggers. Safe to call again, e.g. to turn on debug output.
+
+    Params:
+    - level (int): Level of the project loggers, hot path messages are DEBUG so they cost a level check by default.
+    - console (bool): Write records to stdout (the Output Log in the editor).
+    - console_level (int): Level for the console only, e.g. keep DEBUG in the ring but not on the console.
+    - ring_capacity (int): Records kept for dump_ring(), 0 disables the ring.
+    - rate_limit_interval (float): Window of the per call site console rate limit in seconds, None disables it.
+    - burst (int): Console records per call site per window.
+    - sample_every (int): Let every n-th rate limited record through anyway.
+    """
+    global _console_handler, _ring_handler
+    for handler in list(_root.handlers):
+        _root.removeHandler(handler)
+    _root.setLevel(level)
+    _root.propagate = False
+    formatter = _Formatter("[%(component)s] %(levelname)s: %(message)s")
+
+    _console_handler = None
+    if console:
+        _console_handler = _ConsoleHandler()
+        _console_handler.setLevel(console_level if console_level is not None else level)
+        _console_handler.setFormatter(formatter)
+        _console_handler.addFilter(RateLimitFilter(rate_limit_interval, burst, sample_every))
+        _root.addHandler(_console_handler)
+
+    _ring_handler = None
+    if ring_capacity:
+        _ring_handler = RingBufferHandler(ring_capacity)
+        _ring_handler.setFormatter(_Formatter("%(asctime)s [%(component)s] %(levelname)s: %(message)s"))
+        _root.addHandler(_ring_handler)
+
+    if not _root.handlers:
+        _root.addHandler(logging.NullHandler())
+
+def get_logger(name):
+    """Get the logger for a component, e.g. get_logger("SequencerControls")."""
+    if not _root.handlers:
+        configure()
+    return _root.getChild(name)
+
+def dump_ring(path=None, background=True):
+    """Write and clear the records buffered in the ring, see RingBufferHandler.dump()."""
+    if _ring_handler is None:
+        return None
+    return _ring_handler.dump(path, background)
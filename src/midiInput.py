@@ -0,0 +1,144 @@
+import time
+from src.inputSource import InputSource
+from src.logger import get_logger
+
+try:
+    import rtmidi
+except ImportError:  # Only RtMidiBackend needs it, see MidiInput
+    rtmidi = None
+
+log = get_logger("MidiInput")
+
+_CONTROL_CHANGE = 0xB0
+_PROGRAM_CHANGE = 0xC0
+
+# Control ids as used in the control mapping (FAD9.json), CC n is "control_n"
+_CC_CONTROL_IDS = tuple(f"control_{cc}" for cc in range(128))
+# The FAD9 time knob sends program changes, mapped to TimeKnob as "control_-1"
+PROGRAM_CHANGE_CONTROL_ID = "control_-1"
+
+def _require_rtmidi():
+    if rtmidi is None:
+        raise ImportError("python-rtmidi is required to read MIDI ports, install it into the editor's Python")
+
+def midi_to_control(message):
+    """
+    (control_id, value) of a raw MIDI message, value scaled from 0..127 to 0..1 like the OSC bridge sends it.
+
+    Returns None for messages that don't map to a control (notes, clock, sysex).
+    """
+    if len(message) < 2:
+        return None
+    kind = message[0] & 0xF0
+    if kind == _CONTROL_CHANGE and len(message) >= 3:
+        return _CC_CONTROL_IDS[message[1] & 0x7F], (message[2] & 0x7F) / 127.0
+    if kind == _PROGRAM_CHANGE:
+        return PROGRAM_CHANGE_CONTROL_ID, (message[1] & 0x7F) / 127.0
+    return None
+
+class RtMidiBackend:
+    """
+    A MIDI input port through python-rtmidi, messages are delivered on rtmidi's callback thread.
+
+    Params:
+    - port_name (str): Open the first port whose name contains this, None opens the first port.
+    - virtual (bool): Create a virtual port named port_name instead, for other software to send to.
+    - client_name (str): Name of the MIDI client as other software sees it.
+    """
+    def __init__(self, port_name=None, virtual=False, client_name="UnrealSequenceController"):
+        self.port_name = port_name
+        self.virtual = virtual
+        self.client_name = client_name
+        self._midi_in = None
+
+    @staticmethod
+    def available_ports():
+        _require_rtmidi()
+        midi_in = rtmidi.MidiIn()
+        try:
+            return midi_in.get_ports()
+        finally:
+            midi_in.delete()
+
+    def open(self, callback):
+        _require_rtmidi()
+        midi_in = rtmidi.MidiIn(name=self.client_name)
+        if self.virtual:
+            midi_in.open_virtual_port(self.port_name or self.client_name)
+            log.info("Opened virtual MIDI port %s", self.port_name or self.client_name)
+        else:
+            ports = midi_in.get_ports()
+            index = next((i for i, name in enumerate(ports) if self.port_name is None or self.port_name in name), None)
+            if index is None:
+                midi_in.delete()
+                raise ValueError(f"No MIDI input port matching {self.port_name!r}, available: {ports}")
+            midi_in.open_port(index)
+            log.info("Opened MIDI port %s", ports[index])
+        midi_in.ignore_types(sysex=True, timing=True, active_sense=True)
+        midi_in.set_callback(self._on_message, callback)
+        self._midi_in = midi_in
+
+    def _on_message(self, event, callback):
+        message, _delta = event
+        callback(message, time.perf_counter())
+
+    def close(self):
+        if self._midi_in is None:
+            return
+        self._midi_in.cancel_callback()
+        self._midi_in.close_port()
+        self._midi_in.delete()
+        self._midi_in = None
+
+class LoopbackMidiBackend:
+    """In-process MIDI port for tests and benchmarks, send() delivers straight to the MidiInput that opened it."""
+    def __init__(self):
+        self._callback = None
+        self.sent = 0
+
+    def open(self, callback):
+        self._callback = callback
+
+    def send(self, message, timestamp=None):
+        if self._callback is None:
+            raise RuntimeError("Loopback port is not open")
+        self.sent += 1
+        self._callback(message, timestamp if timestamp is not None else time.perf_counter())
+
+    def close(self):
+        self._callback = None
+
+class MidiInput(InputSource):
+    """
+    Reads a MIDI controller in process, without a MIDI to OSC bridge and UDP in between.
+
+    Control changes arrive as "control_<cc>" and program changes as "control_-1" with values in
+    0..1, so an OSC control mapping works unchanged. Messages are decoded on the backend's
+    thread and coalesced per control until update() swaps them in on the game thread.
+
+    Params:
+    - backend: RtMidiBackend (the default, opened on port_name) or LoopbackMidiBackend.
+    - port_name (str): Passed to the default RtMidiBackend.
+    """
+    def __init__(self, backend=None, port_name=None, max_untracked_addresses=256):
+        super().__init__(threaded=True, max_untracked_addresses=max_untracked_addresses)
+        self.backend = backend if backend is not None else RtMidiBackend(port_name)
+
+        # Stats
+        self.messages_received = 0
+        self.messages_ignored = 0
+
+        self.backend.open(self._on_message)
+
+    def _on_message(self, message, timestamp):
+        self.messages_received += 1
+        control = midi_to_control(message)
+        if control is None:
+            self.messages_ignored += 1
+            return
+        self.push(control[0], control[1], timestamp)
+
+    def close(self):
+        super().close()
+        self.backend.close()
+        log.info("Closed.")
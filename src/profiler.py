@@ -0,0 +1,123 @@
+import csv
+import json
+import time
+from collections import deque
+from contextlib import contextmanager
+from src.logger import get_logger
+
+log = get_logger("TickProfiler")
+
+def _percentile(sorted_samples, percent):
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, int(round(percent / 100.0 * len(sorted_samples))) - 1))
+    return sorted_samples[index]
+
+class TickProfiler:
+    """
+    Opt-in per tick timing, pass one instance to tickHooker.hook and the components on the control path.
+
+    Every stage keeps its last `capacity` durations (seconds) in a ring. Stage names
+    used by the project:
+    - tick: the whole hooked function
+    - listener_update, dispatch, flush_keyframes: the control path stages
+    - unreal.<category>: editor API calls, e.g. unreal.write_float or unreal.remove_keys
+    - osc_to_dispatch, osc_to_keyframe: latency from UDP arrival to handler call and keyframe write
+    """
+    def __init__(self, capacity=2048, summary_interval=5.0):
+        self.capacity = capacity
+        self.summary_interval = summary_interval
+        self.samples = {}
+        self.ticks = 0
+        self._last_summary = time.perf_counter()
+        # Arrival time of the OSC value being dispatched, set by the bridge around each handler call
+        self.current_arrival = None
+
+    def attach(self, *components):
+        """Enable profiling on components with a `profiler` attribute, e.g. the listener, bridge and sequencer controls."""
+        for component in components:
+            component.profiler = self
+        return self
+
+    def record(self, stage, seconds):
+        ring = self.samples.get(stage)
+        if ring is None:
+            ring = self.samples[stage] = deque(maxlen=self.capacity)
+        ring.append(seconds)
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def end_tick(self):
+        """Called by tickHooker after every tick, logs the summary line every summary_interval seconds."""
+        self.ticks += 1
+        if self.summary_interval is None:
+            return
+        now = time.perf_counter()
+        if now - self._last_summary >= self.summary_interval:
+            self._last_summary = now
+            log.info(self.summary_line())
+
+    def stats(self, stage):
+        """Count, mean, p50, p95, p99 and max of a stage in milliseconds."""
+        samples = sorted(self.samples.get(stage, ()))
+        if not samples:
+            return {"count": 0, "mean_ms": 0.0, "p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "max_ms": 0.0}
+        return {
+            "count": len(samples),
+            "mean_ms": sum(samples) / len(samples) * 1000.0,
+            "p50_ms": _percentile(samples, 50) * 1000.0,
+            "p95_ms": _percentile(samples, 95) * 1000.0,
+            "p99_ms": _percentile(samples, 99) * 1000.0,
+            "max_ms": samples[-1] * 1000.0,
+        }
+
+    def histogram(self, stage, bins=20):
+        """Equal width histogram of a stage as (bin edges in ms, counts)."""
+        samples = self.samples.get(stage, ())
+        if not samples:
+            return [], []
+        low, high = min(samples), max(samples)
+        width = (high - low) / bins or 1e-9
+        counts = [0] * bins
+        for sample in samples:
+            counts[min(bins - 1, int((sample - low) / width))] += 1
+        edges = [(low + width * i) * 1000.0 for i in range(bins + 1)]
+        return edges, counts
+
+    def summary_line(self):
+        parts = [f"{self.ticks} ticks"]
+        for stage in sorted(self.samples):
+            stats = self.stats(stage)
+            parts.append(f"{stage} p50 {stats['p50_ms']:.3f} p95 {stats['p95_ms']:.3f} max {stats['max_ms']:.3f} ms")
+        return " | ".join(parts)
+
+    def dump_json(self, path, bins=20):
+        data = {"ticks": self.ticks, "stages": {}}
+        for stage, samples in self.samples.items():
+            edges, counts = self.histogram(stage, bins)
+            data["stages"][stage] = {
+                **self.stats(stage),
+                "histogram": {"edges_ms": edges, "counts": counts},
+                "samples_ms": [sample * 1000.0 for sample in samples],
+            }
+        with open(path, "w") as f:
+            json.dump(data, f, indent=2)
+
+    def dump_csv(self, path):
+        """One row per sample, (stage, index, ms), oldest first."""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["stage", "index", "ms"])
+            for stage, samples in self.samples.items():
+                for index, sample in enumerate(samples):
+                    writer.writerow([stage, index, f"{sample * 1000.0:.6f}"])
+
+    def reset(self):
+        self.samples.clear()
+        self.ticks = 0
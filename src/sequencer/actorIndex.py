@@ -0,0 +1,106 @@
+import bisect
+import unreal
+from src.logger import get_logger
+
+log = get_logger("ActorIndex")
+
+class ActorIndex:
+    """
+    Lookup of level actors by exact name, label and class, built once per editor world.
+
+    Unreal's Python API has no actor added/removed events, so the index checks that a
+    hit is still a valid actor with that name, rebuilds once on a miss (a new actor)
+    and rebuilds when the editor world changes (a new level). Call invalidate() after
+    spawning, deleting or renaming actors from script.
+    """
+    def __init__(self, rebuild_on_miss=True):
+        self.rebuild_on_miss = rebuild_on_miss
+        self._by_name = None
+        self._by_label = {}
+        self._by_class = {}
+        self._sorted_names = []
+        self._world = None
+        self.builds = 0
+
+    def invalidate(self):
+        self._by_name = None
+
+    def build(self):
+        by_name = {}
+        by_label = {}
+        by_class = {}
+        for actor in unreal.EditorLevelLibrary.get_all_level_actors():
+            name = actor.get_name()
+            by_name[name] = actor
+            by_label.setdefault(actor.get_actor_label(), actor)
+            by_class.setdefault(actor.get_class().get_name(), []).append(actor)
+
+        self._by_name = by_name
+        self._by_label = by_label
+        self._by_class = by_class
+        self._sorted_names = sorted(by_name)
+        self._world = self._current_world()
+        self.builds += 1
+        log.debug("Indexed %s actors", len(by_name))
+
+    def find(self, name, match="exact"):
+        """
+        Find one actor by name or label.
+
+        Params:
+        - name (str): The actor name (or label) to look for.
+        - match (str): "exact" (default), "prefix" or "substring". Non exact matches return the first name in sorted order.
+        """
+        if match != "exact":
+            matches = self.find_all(name, match)
+            return matches[0] if matches else None
+
+        self._ensure_built()
+        actor = self._lookup(name)
+        if actor is not None and self._is_current(actor, name):
+            return actor
+        if not self.rebuild_on_miss and actor is None:
+            return None
+
+        self.build()
+        return self._lookup(name)
+
+    def find_all(self, query, match="substring"):
+        """All actors whose name matches query, "prefix" or "substring", in sorted name order."""
+        self._ensure_built()
+        if match == "prefix":
+            start = bisect.bisect_left(self._sorted_names, query)
+            names = []
+            for name in self._sorted_names[start:]:
+                if not name.startswith(query):
+                    break
+                names.append(name)
+        elif match == "substring":
+            names = [name for name in self._sorted_names if query in name]
+        else:
+            raise ValueError(f"Unsupported match: {match}")
+        return [self._by_name[name] for name in names]
+
+    def find_by_class(self, class_name):
+        """All actors of a class, e.g. "SkeletalMeshActor"."""
+        self._ensure_built()
+        return list(self._by_class.get(class_name, []))
+
+    def _lookup(self, name):
+        actor = self._by_name.get(name)
+        if actor is None:
+            actor = self._by_label.get(name)
+        return actor
+
+    def _ensure_built(self):
+        if self._by_name is None or self._world != self._current_world():
+            self.build()
+
+    def _is_current(self, actor, name):
+        # Deleted or renamed since the index was built
+        if not unreal.SystemLibrary.is_valid(actor):
+            return False
+        return actor.get_name() == name or actor.get_actor_label() == name
+
+    def _current_world(self):
+        return unreal.get_editor_subsystem(unreal.UnrealEditorSubsystem).get_editor_world()
@@ -0,0 +1,193 @@
+import time
+import numpy as np
+from src.logger import get_logger
+
+log = get_logger("CurveProcessing")
+
+def _columns(values):
+    values = np.asarray(values, dtype=np.float64)
+    return values[:, None] if values.ndim == 1 else values
+
+def _interp_columns(x, xp, fp):
+    return np.column_stack([np.interp(x, xp, fp[:, column]) for column in range(fp.shape[1])])
+
+class OneEuroFilter:
+    """
+    One Euro filter (Casiez et al. 2012): a low pass whose cutoff rises with the curve's speed,
+    so slow fader drift is smoothed hard and fast moves keep their timing.
+
+    Params:
+    - min_cutoff (float): Cutoff in Hz at rest, lower smooths more.
+    - beta (float): How much the cutoff rises per unit/s of speed, higher lags less on fast moves.
+    - d_cutoff (float): Cutoff in Hz of the speed estimate.
+    """
+    def __init__(self, min_cutoff=1.0, beta=0.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+
+    def __call__(self, frames, values, frame_rate):
+        values = _columns(values)
+        if len(values) < 2:
+            return values
+        dt = np.diff(frames) / float(frame_rate)
+        alpha_d = self._alpha(self.d_cutoff, dt)
+
+        # The filter is recursive, so it runs per sample on plain floats, which beats tiny arrays
+        dt = dt.tolist()
+        alpha_d = alpha_d.tolist()
+        two_pi = 2.0 * np.pi
+        out = np.empty_like(values)
+        for column in range(values.shape[1]):
+            samples = values[:, column].tolist()
+            x_prev = samples[0]
+            dx_prev = 0.0
+            filtered = [x_prev]
+            for i in range(1, len(samples)):
+                dx = (samples[i] - x_prev) / dt[i - 1]
+                dx_prev += alpha_d[i - 1] * (dx - dx_prev)
+                cutoff = self.min_cutoff + self.beta * abs(dx_prev)
+                alpha = 1.0 / (1.0 + 1.0 / (two_pi * cutoff * dt[i - 1]))
+                x_prev += alpha * (samples[i] - x_prev)
+                filtered.append(x_prev)
+            out[:, column] = filtered
+        return out
+
+    @staticmethod
+    def _alpha(cutoff, dt):
+        tau = 1.0 / (2.0 * np.pi * cutoff)
+        return 1.0 / (1.0 + tau / dt)
+
+class SavitzkyGolayFilter:
+    """
+    Savitzky-Golay filter: a least squares polynomial fit over a sliding window, which smooths
+    noise while keeping peaks better than a moving average. The ends are fitted on the first
+    and last full window.
+
+    Params:
+    - window (int): Odd number of frames in the window.
+    - polyorder (int): Polynomial order, below window.
+    """
+    def __init__(self, window=9, polyorder=3):
+        if window % 2 == 0 or window <= polyorder:
+            raise ValueError("window must be odd and larger than polyorder")
+        self.window = window
+        self.polyorder = polyorder
+        half = window // 2
+        vandermonde = np.vander(np.arange(-half, half + 1, dtype=np.float64), polyorder + 1, increasing=True)
+        self._fit = np.linalg.pinv(vandermonde)  # (polyorder + 1, window), window samples to coefficients
+        self._vandermonde = vandermonde
+
+    def __call__(self, frames, values, frame_rate):
+        values = _columns(values)
+        if len(values) < self.window:
+            return values
+        half = self.window // 2
+        # Smoothed value at the window center is the constant coefficient
+        center = self._fit[0][::-1]
+        out = np.empty_like(values)
+        for column in range(values.shape[1]):
+            out[half:-half, column] = np.convolve(values[:, column], center, mode="valid")
+        out[:half] = self._vandermonde[:half] @ (self._fit @ values[:self.window])
+        out[-half:] = self._vandermonde[-half:] @ (self._fit @ values[-self.window:])
+        return out
+
+def rdp_mask(frames, values, epsilon):
+    """
+    Ramer-Douglas-Peucker key reduction, returns a boolean mask of the keys to keep.
+
+    The error is measured along the value axis, the largest difference over all columns between a
+    dropped key and the straight line through the kept keys around it, so it is bounded by epsilon
+    in the curve's own units.
+    """
+    values = _columns(values)
+    count = len(frames)
+    keep = np.zeros(count, dtype=bool)
+    if count < 3:
+        keep[:] = True
+        return keep
+    keep[0] = keep[-1] = True
+    x = np.asarray(frames, dtype=np.float64)
+
+    stack = [(0, count - 1)]
+    while stack:
+        lo, hi = stack.pop()
+        if hi - lo < 2:
+            continue
+        t = (x[lo + 1:hi] - x[lo]) / (x[hi] - x[lo])
+        line = values[lo] + t[:, None] * (values[hi] - values[lo])
+        error = np.abs(values[lo + 1:hi] - line).max(axis=1)
+        index = int(np.argmax(error))
+        if error[index] > epsilon:
+            split = lo + 1 + index
+            keep[split] = True
+            stack.append((lo, split))
+            stack.append((split, hi))
+    return keep
+
+class CurveProcessor:
+    """
+    Smooth and thin out keyed control rig curves, e.g. live fader takes before export.
+
+    Each control's keys are resampled onto every frame, run through the filters in order and
+    reduced with rdp_mask. Set it as SequencerControls.curve_processor to run it before every export.
+
+    Params:
+    - filters (list): Callables taking (frames, values, frame_rate), e.g. OneEuroFilter or SavitzkyGolayFilter.
+    - epsilon (float): Largest value error the key reduction may introduce, in the control's units.
+    - min_keys (int): Controls with fewer keys are left alone.
+    """
+    def __init__(self, filters=(), epsilon=0.01, min_keys=3):
+        self.filters = list(filters)
+        self.epsilon = epsilon
+        self.min_keys = min_keys
+
+    def process(self, frames, values, frame_rate=24):
+        """
+        Returns (frames, values, stats), with values shaped like the input and stats holding
+        keys_before, keys_after and max_error, the largest difference from the input keys.
+        """
+        frames = np.asarray(frames, dtype=np.int64)
+        columns = _columns(values)
+        stats = {"keys_before": len(frames), "keys_after": len(frames), "max_error": 0.0}
+        if len(frames) < max(self.min_keys, 3):
+            return frames, values, stats
+
+        dense_frames = np.arange(frames[0], frames[-1] + 1, dtype=np.int64)
+        dense = _interp_columns(dense_frames, frames, columns)
+        for curve_filter in self.filters:
+            dense = curve_filter(dense_frames, dense, frame_rate)
+
+        keep = rdp_mask(dense_frames, dense, self.epsilon)
+        out_frames = dense_frames[keep]
+        out_values = dense[keep]
+
+        reconstructed = _interp_columns(frames, out_frames, out_values)
+        stats["keys_after"] = len(out_frames)
+        stats["max_error"] = float(np.abs(reconstructed - columns).max())
+        if np.ndim(values) == 1:
+            out_values = out_values[:, 0]
+        return out_frames, out_values, stats
+
+    def apply(self, controls, ctrl_names=None):
+        """
+        Process the keys of controls (a SequencerControls) in place and return a report.
+
+        Params:
+        - ctrl_names (list): Controls to process, None for every control on the rig track.
+        """
+        start = time.perf_counter()
+        report = {"controls": {}, "keys_before": 0, "keys_after": 0, "max_error": 0.0}
+        for ctrl_name in ctrl_names if ctrl_names is not None else controls.get_control_names():
+            frames, values = controls.get_control_keys(ctrl_name)
+            if len(frames) < max(self.min_keys, 3):
+                continue
+            new_frames, new_values, stats = self.process(frames, values, controls.frame_rate)
+            controls.set_control_keys(ctrl_name, new_frames, new_values)
+            report["controls"][ctrl_name] = stats
+            report["keys_before"] += stats["keys_before"]
+            report["keys_after"] += stats["keys_after"]
+            report["max_error"] = max(report["max_error"], stats["max_error"])
+        report["seconds"] = time.perf_counter() - start
+        log.info("Reduced %s keys to %s on %s controls, max error %.4f, %.1f ms", report["keys_before"], report["keys_after"], len(report["controls"]), report["max_error"], report["seconds"] * 1000.0)
+        return report
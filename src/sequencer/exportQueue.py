@@ -0,0 +1,170 @@
+import time
+from collections import deque
+import unreal
+from src.tickHook import get_scheduler
+from src.logger import get_logger
+
+log = get_logger("ExportQueue")
+
+class ExportJob:
+    """
+    An AnimSequence export with the editor state it needs captured at submit time.
+
+    The sequence is baked as it is when the job runs, the snapshot only pins which
+    sequence, binding, skeleton and destination it uses. process_curves, when set, is called
+    as the job's first step (e.g. a CurveProcessor over the rig keys) and its return value
+    kept as curve_report, so merged submits don't process the keys again.
+    """
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+
+    def __init__(self, file_name, ue_package_path, sequence, binding, skeleton, export_morph_targets=True, process_curves=None):
+        self.file_name = file_name
+        self.ue_package_path = ue_package_path
+        self.sequence = sequence
+        self.binding = binding
+        self.skeleton = skeleton
+        self.export_morph_targets = export_morph_targets
+        self.process_curves = process_curves
+        self.curve_report = None
+        # A job with the same key submitted while this one runs, queued once this one finishes
+        self.rerun = None
+
+        self.status = ExportJob.QUEUED
+        self.error = None
+        self.anim_sequence = None
+        self.callbacks = []
+        self.submitted_at = time.perf_counter()
+        self.durations = {}  # Step name to seconds, plus "wait" and "total"
+
+    @property
+    def key(self):
+        return (self.ue_package_path, self.file_name)
+
+    def steps(self):
+        """Generator doing the export in steps, yields after processing the curves and between creating the asset and baking it."""
+        if self.process_curves is not None:
+            start = time.perf_counter()
+            self.curve_report = self.process_curves()
+            self.durations["process"] = time.perf_counter() - start
+            yield
+
+        start = time.perf_counter()
+        world = unreal.get_editor_subsystem(unreal.UnrealEditorSubsystem).get_editor_world()
+
+        # Create animation sequence export options
+        anim_seq_export_options = unreal.AnimSeqExportOption()
+        anim_seq_export_options.export_morph_targets = self.export_morph_targets
+
+        animFactory = unreal.AnimSequenceFactory()
+        animFactory.target_skeleton = self.skeleton
+        # Create an empty AnimSequence - /Game/Test_Anim
+        asset_tools = unreal.AssetToolsHelpers.get_asset_tools()
+        self.anim_sequence = unreal.AssetTools.create_asset(asset_tools, asset_name = self.file_name, package_path = self.ue_package_path, asset_class = unreal.AnimSequence, factory = animFactory)
+        self.durations["create"] = time.perf_counter() - start
+        yield
+
+        # Bake to the created AnimSequence
+        start = time.perf_counter()
+        unreal.SequencerTools.export_anim_sequence(world, self.sequence, self.anim_sequence, anim_seq_export_options, self.binding, False)
+        self.durations["bake"] = time.perf_counter() - start
+
+class ExportQueue:
+    """
+    Run ExportJobs one after another on the tick scheduler, one step per tick.
+
+    Jobs run as low priority generator work, so they start once the tick budget has
+    room. A job submitted while an identical one (same package path and file name) is
+    still queued is merged into it. While the identical job is running it runs once more
+    when done, further submits merge into that rerun. The bake itself is a single editor
+    call and still takes one tick, but live control keeps running on the ticks around it.
+    """
+    def __init__(self, scheduler=None, priority=-5, history=50):
+        self.scheduler = scheduler if scheduler is not None else get_scheduler()
+        self.priority = priority
+        self._queue = deque()
+        self._task = None
+        self.current = None
+        self.history = deque(maxlen=history)  # Finished jobs, newest last
+
+        # Stats
+        self.completed = 0
+        self.failed = 0
+        self.deduped = 0
+
+    def submit(self, job, on_done=None):
+        """
+        Queue a job and return it, or the queued job or rerun it was merged into.
+
+        Params:
+        - on_done (callable): Called with the job once it is done or failed, see job.status and job.error.
+        """
+        for queued in self._queue:
+            if queued.key == job.key:
+                self.deduped += 1
+                job = queued
+                log.info("Export of %s already queued", job.file_name)
+                break
+        else:
+            current = self.current
+            if current is not None and current.key == job.key:
+                # Already baking, keys changed since are only in a second run
+                if current.rerun is not None:
+                    self.deduped += 1
+                    job = current.rerun
+                else:
+                    current.rerun = job
+                log.info("Export of %s is running, it runs once more when done", job.file_name)
+            else:
+                self._queue.append(job)
+                log.info("Queued export of %s", job.file_name)
+
+        if on_done is not None:
+            job.callbacks.append(on_done)
+        if self._task is None:
+            self._task = self.scheduler.add_generator(self._run(), priority=self.priority, name="ExportQueue")
+        return job
+
+    def pending(self):
+        return list(self._queue)
+
+    def stats(self):
+        """Completed, failed and merged jobs, with mean seconds per step of the finished ones."""
+        finished = [job for job in self.history if job.status == ExportJob.DONE]
+        means = {}
+        for step in ("wait", "process", "create", "bake", "total"):
+            values = [job.durations[step] for job in finished if step in job.durations]
+            means[step] = sum(values) / len(values) if values else 0.0
+        return {"completed": self.completed, "failed": self.failed, "deduped": self.deduped, "queued": len(self._queue), "mean_s": means}
+
+    def _run(self):
+        try:
+            while self._queue:
+                job = self._queue.popleft()
+                self.current = job
+                job.status = ExportJob.RUNNING
+                job.durations["wait"] = time.perf_counter() - job.submitted_at
+                try:
+                    for _ in job.steps():
+                        yield
+                    job.status = ExportJob.DONE
+                    self.completed += 1
+                    log.info("Exported %s/%s in %.2f s", job.ue_package_path, job.file_name, sum(job.durations.get(step, 0.0) for step in ("create", "bake")))
+                except Exception as e:
+                    job.status = ExportJob.FAILED
+                    job.error = e
+                    self.failed += 1
+                    log.error("Export of %s failed: %s", job.file_name, e)
+                job.durations["total"] = time.perf_counter() - job.submitted_at
+                self.current = None
+                if job.rerun is not None:
+                    self._queue.appendleft(job.rerun)
+                self.history.append(job)
+                for callback in job.callbacks:
+                    callback(job)
+                yield
+        finally:
+            self._task = None
+            self.current = None
@@ -0,0 +1,144 @@
+import math
+import time
+from src.tickHook import get_scheduler
+from src.logger import get_logger
+
+log = get_logger("ScrubEngine")
+
+class ScrubEngine:
+    """
+    Knob scrubbing that doesn't depend on the tick or OSC message rate.
+
+    Knob input only sets a target playhead velocity. While it is non zero a scheduler task
+    moves the velocity towards it (limited to max_accel) and integrates it against
+    delta_seconds, so each tick costs one playhead read and at most one set_current_time.
+    The playback range is read when a scrub starts and again after set_sequence_range()
+    or reset_sequence_range() changed it.
+
+    Modes:
+    - "jog": the playhead follows how fast the knob turns, jog_full_scale knob units per second
+      scrub at max_speed. Held at either end of its travel the knob keeps scrubbing at rail_speed.
+      Otherwise the playhead coasts to a stop with friction once the knob stops turning.
+    - "shuttle": the knob's deflection from the center sets the speed, max_speed at either end.
+
+    Params:
+    - time_controls: The SequencerControls.time_controls to move.
+    - max_speed (float): Frames per second at full input, scaled by speed_scale.
+    - exponent (float): Response curve, 1 is linear, higher gives finer control at low input.
+    - deadzone (float): Inputs below this fraction of full scale are ignored.
+    - rail_speed (float): Jog frames per second while the knob is held at the end of its travel.
+    - friction (float): How quickly jog coasts to a stop, per second.
+    - max_accel (float): Largest change of velocity in frames per second, per second.
+    - snap (int): The playhead moves in multiples of this many frames.
+    """
+    JOG = "jog"
+    SHUTTLE = "shuttle"
+
+    def __init__(self, time_controls, mode="jog", max_speed=48.0, exponent=2.0, deadzone=0.02, jog_full_scale=200.0, rail_speed=24.0, friction=6.0, max_accel=480.0, snap=1, scheduler=None, priority=90):
+        if mode not in (ScrubEngine.JOG, ScrubEngine.SHUTTLE):
+            raise ValueError(f"Unsupported mode: {mode}")
+        if not isinstance(snap, int) or snap <= 0:
+            raise ValueError("snap must be a positive integer")
+        self.time_controls = time_controls
+        self.mode = mode
+        self.max_speed = max_speed
+        self.exponent = exponent
+        self.deadzone = deadzone
+        self.jog_full_scale = jog_full_scale
+        self.rail_speed = rail_speed
+        self.friction = friction
+        self.max_accel = max_accel
+        self.snap = snap
+        self.speed_scale = 1.0  # Applies to the current scrub too, e.g. TimeKnobSlow / TimeKnobFast
+        self.scheduler = scheduler if scheduler is not None else get_scheduler()
+        self.priority = priority
+
+        self._knob = None
+        self._knob_time = None
+        self._at_rail = False
+        self._target_velocity = 0.0  # Frames per second the knob asks for
+        self.velocity = 0.0  # Frames per second the playhead moves at
+        self._position = None  # Fractional playhead in frames while scrubbing
+        self._last_frame = None
+        self._range = None
+        self._range_version = None
+        self._task = None
+
+        # Stats
+        self.ticks = 0
+        self.sets = 0
+
+    def set_knob(self, value, timestamp=None):
+        """Feed a knob value in -100..100, as converted by the bridge."""
+        now = timestamp if timestamp is not None else time.perf_counter()
+        if self.mode == ScrubEngine.SHUTTLE:
+            self._target_velocity = self._shape(value / 100.0) * self.max_speed
+        else:
+            self._at_rail = abs(value) >= 100.0
+            if self._at_rail:
+                self._target_velocity = math.copysign(self.rail_speed, value)
+            elif self._knob is not None and now > self._knob_time:
+                knob_velocity = (value - self._knob) / (now - self._knob_time)
+                self._target_velocity = self._shape(knob_velocity / self.jog_full_scale) * self.max_speed
+        self._knob = value
+        self._knob_time = now
+
+        if self._task is None and (self._target_velocity or self.velocity):
+            self._task = self.scheduler.add(self._tick, priority=self.priority, name="ScrubEngine")
+
+    def stop(self):
+        """Stop scrubbing right away, leaving the playhead where it is."""
+        self._target_velocity = 0.0
+        self.velocity = 0.0
+        self._at_rail = False
+        self._knob = None
+        self._position = None
+        self._range = None
+        if self._task is not None:
+            self.scheduler.remove(self._task)
+            self._task = None
+
+    def _shape(self, x):
+        magnitude = min(abs(x), 1.0)
+        if magnitude <= self.deadzone:
+            return 0.0
+        magnitude = (magnitude - self.deadzone) / (1.0 - self.deadzone)
+        return math.copysign(magnitude ** self.exponent, x)
+
+    def _tick(self, delta_seconds):
+        self.ticks += 1
+        current = self.time_controls.current_time()
+        # Start from the playhead, and follow it when something else moved it
+        if self._position is None or current != self._last_frame:
+            self._position = float(current)
+            self._last_frame = current
+
+        if self.mode == ScrubEngine.JOG and not self._at_rail:
+            self._target_velocity *= math.exp(-self.friction * delta_seconds)
+            if abs(self._target_velocity) < 0.01:
+                self._target_velocity = 0.0
+
+        max_change = self.max_accel * delta_seconds
+        self.velocity += max(-max_change, min(max_change, self._target_velocity * self.speed_scale - self.velocity))
+        self._position += self.velocity * delta_seconds
+
+        if self._range is None or self._range_version != self.time_controls.range_version:
+            self._range = self.time_controls.get_sequence_range()
+            self._range_version = self.time_controls.range_version
+        start, end = self._range
+        if not start <= self._position <= end:
+            self._position = max(start, min(end, self._position))
+            self.velocity = 0.0
+
+        frame = int(round(self._position / self.snap)) * self.snap
+        if frame != self._last_frame:
+            self.time_controls.jump_to_frame(frame)
+            self._last_frame = frame
+            self.sets += 1
+
+        if self._target_velocity == 0.0 and self.velocity == 0.0:
+            self.scheduler.remove(self._task)
+            self._task = None
+            self._position = None
+            self._range = None
+            log.debug("Scrub settled at frame %s", frame)
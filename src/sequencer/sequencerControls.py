@@ -1,5 +1,18 @@
+import bisect
+import time
 import unreal
 from enum import Enum
+from functools import partial
+from src.logger import get_logger
+from src.sequencer.actorIndex import ActorIndex
+from src.sequencer.exportQueue import ExportJob, ExportQueue
+
+try:
+    import numpy as np
+except ImportError:  # Only the array key API needs it, see get_control_keys()
+    np = None
+
+log = get_logger("SequencerControls")
 
 class ctrlRigVals(Enum):
     RightHandIndex = "RightHandIndex"
@@ -13,45 +26,141 @@ class ctrlRigVals(Enum):
     LeftHandPinky = "LeftHandPinky"
     LeftHandThumb = "LeftHandThumb"
 
-def get_actor_by_name(name):
+# Modus name to rotator component index
+_ROTATOR_AXES = {
+    "RotatorX": 0,
+    "RotatorY": 1,
+    "RotatorZ": 2,
+}
+
+# Modus name to (euler transform part, attribute)
+_EULER_AXES = {
+    "EulerRotationX": ("rotation", "roll"),
+    "EulerRotationY": ("rotation", "yaw"),
+    "EulerRotationZ": ("rotation", "pitch"),
+    "EulerTransformX": ("location", "x"),
+    "EulerTransformY": ("location", "y"),
+    "EulerTransformZ": ("location", "z"),
+}
+
+# Modus name to the index of its channel among the control's channels, in Sequencer's order
+# (Location XYZ, Rotation XYZ as roll, pitch, yaw, Scale XYZ), matching _ROTATOR_AXES and _EULER_AXES
+_MODUS_CHANNELS = {
+    "Float": 0,
+    "RotatorX": 0,
+    "RotatorY": 1,
+    "RotatorZ": 2,
+    "EulerTransformX": 0,
+    "EulerTransformY": 1,
+    "EulerTransformZ": 2,
+    "EulerRotationX": 3,
+    "EulerRotationY": 5,
+    "EulerRotationZ": 4,
+}
+
+# Modus values set_keyframe_control_rig accepts, e.g. for validating control mappings
+SUPPORTED_MODI = frozenset(_MODUS_CHANNELS)
+
+# Unreal calls a single unqueued set_keyframe_control_rig makes per kind, with read-back
+_UNBATCHED_CALLS = {
+    "Float": 2,
+    "Rotator": 2,
+    "Euler": 3,
+}
+
+# Shared by every get_actor_by_name call, built on first use
+actor_index = ActorIndex()
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for the array key API, install it into the editor's Python")
+
+def get_actor_by_name(name, match="exact"):
     """
     Fetch an actor by name.
 
     Params:
-    - name (str): The name of the actor to fetch.
+    - name (str): The name (or label) of the actor to fetch.
+    - match (str): "exact" (default), "prefix" or "substring", see ActorIndex.find().
     """
-    actors = unreal.EditorLevelLibrary.get_all_level_actors()
-    for actor in actors:
-        if name in actor.get_name():
-            return actor
-    return None
+    return actor_index.find(name, match)
 
 class SequencerControls:
-    def __init__(self, sequence: unreal.LevelSequence, frame_rate: int = 30):
+    def __init__(self, sequence: unreal.LevelSequence, frame_rate: int = 30, defer_keyframes: bool = False):
         self.control_rig = None
         self.skeletal_mesh = None
         self.anim_sequence = None
+        self.anim_track = None
+        self.anim_section = None
         self.actor = None
         self.skeletal_mesh_binding_proxy = None
         self.sequence = sequence
+        self._channel_index = None  # ctrl_name -> [MovieSceneScriptingFloatChannel], see get_channels_for_ctrl()
         unreal.LevelSequenceEditorBlueprintLibrary.open_level_sequence(sequence)
         self.time_controls = self.time_controls(sequence)
         self.frame_rate = frame_rate
 
+        # Write-behind keyframe queue, see flush_keyframes()
+        self.defer_keyframes = defer_keyframes
+        self.debug_keyframes = False  # Read keyed values back after writing
+        self._pending_keyframes = {}
+        self._pending_arrivals = {}  # (ctrl_name, frame, kind) -> earliest OSC arrival, only while profiling
+        self._queued_keyframe_writes = {"Float": 0, "Rotator": 0, "Euler": 0}
+        self.unreal_calls_saved = 0
+
+        # Created on the first queue_export()
+        self.export_queue = None
+
+        # Optional CurveProcessor run over the control rig keys as the first step of every export, see ExportJob.curve_report
+        self.curve_processor = None
+
+        # Opt-in TickProfiler, records unreal.write_<kind>, unreal.remove_keys, flush_keyframes and osc_to_keyframe
+        self.profiler = None
+
     class time_controls:
+        """
+        Playhead and playback range of the sequence.
+
+        Between begin_tick() and end_tick() (the bridge calls both around its dispatch), the playhead,
+        playback range and playing state are read from the editor at most once and shared by every
+        consumer. The jump, step, play and range setters invalidate what they change. Outside of
+        that window every read goes to the editor, so nothing stale is returned once ticks stop.
+        """
         def __init__(self, sequence: unreal.LevelSequence):
             self.sequence = sequence
+            self.per_tick_cache = False
+            self._time = None
+            self._range = None
+            self._playing = None
+            # Bumped by set_sequence_range(), for consumers that keep the range across ticks (ScrubEngine)
+            self.range_version = 0
             self.initial_playback_range = self.get_sequence_range()
             self.timeKnobPrevious = 0.0
 
+        def begin_tick(self):
+            """Drop the cached editor state and cache reads until end_tick(), call at the start of each tick."""
+            self.per_tick_cache = True
+            self.invalidate()
+
+        def end_tick(self):
+            """Stop caching, later reads go to the editor until the next begin_tick()."""
+            self.per_tick_cache = False
+            self.invalidate()
+
+        def invalidate(self):
+            """Drop the cached editor state, e.g. after changing the playhead or range outside time_controls."""
+            self._time = None
+            self._range = None
+            self._playing = None
+
         def time_knob_control(self, timeKnobCur: float, step: int = 1):
             if not self.sequence:
-                print("Error: No sequence set.")
+                log.error("No sequence set.")
                 return
 
             # Calculate the new time based on the percentage
             if timeKnobCur < -100.0 or timeKnobCur > 100.0:
-                print("Error: timeKnobCur must be between -100 and 100, received:", timeKnobCur)
+                log.error("timeKnobCur must be between -100 and 100, received: %s", timeKnobCur)
                 return
             
             # Timeknob is clamped between 0 and 100
@@ -63,119 +172,146 @@ class SequencerControls:
             self.timeKnobPrevious = timeKnobCur
             step = step if forward else -step
 
-            curTime = unreal.LevelSequenceEditorBlueprintLibrary.get_current_time()
-            new_time = curTime + step
-            unreal.LevelSequenceEditorBlueprintLibrary.set_current_time(new_time)
+            self._set_time(self.current_time() + step)
         
+        def is_playing(self):
+            if self._playing is None or not self.per_tick_cache:
+                self._playing = unreal.LevelSequenceEditorBlueprintLibrary.is_playing()
+            return self._playing
+
         def play_pause(self):
             if not self.sequence:
-                print("Error: No sequence set.")
+                log.error("No sequence set.")
                 return
             
-            if unreal.LevelSequenceEditorBlueprintLibrary.is_playing():
+            if self.is_playing():
                 unreal.LevelSequenceEditorBlueprintLibrary.pause()
-                print("[SequencerControls] Playback paused")
+                log.info("Playback paused")
             else:
                 unreal.LevelSequenceEditorBlueprintLibrary.play()
-                print("[SequencerControls] Playback started")
+                log.info("Playback started")
+            self._playing = None
+            self._time = None
+
+        def pause(self):
+            if not self.sequence:
+                log.error("No sequence set.")
+                return
+
+            if self.is_playing():
+                unreal.LevelSequenceEditorBlueprintLibrary.pause()
+                log.info("Playback paused")
+            self._playing = None
+            self._time = None
 
         def jump_to_frame(self, frame_number: int):
             if not self.sequence:
-                print("Error: No sequence set.")
+                log.error("No sequence set.")
                 return
 
-            unreal.LevelSequenceEditorBlueprintLibrary.set_current_time(frame_number)
-            print(f"[SequencerControls] Jumped to frame {frame_number}")
+            self._set_time(frame_number)
+            log.debug("Jumped to frame %s", frame_number)
 
         def jump_x_frames_forward(self, x: int):
             if not self.sequence:
-                print("Error: No sequence set.")
+                log.error("No sequence set.")
                 return
 
-            current_time = unreal.LevelSequenceEditorBlueprintLibrary.get_current_time()
-            new_time = current_time + x
-            unreal.LevelSequenceEditorBlueprintLibrary.set_current_time(new_time)
-            print(f"[SequencerControls] Jumped {x} frames forward to {new_time}")
+            new_time = self.current_time() + x
+            self._set_time(new_time)
+            log.debug("Jumped %s frames forward to %s", x, new_time)
         
         def jump_x_frames_backward(self, x: int):
             if not self.sequence:
-                print("Error: No sequence set.")
+                log.error("No sequence set.")
                 return
 
-            current_time = unreal.LevelSequenceEditorBlueprintLibrary.get_current_time()
-            new_time = current_time - x
-            unreal.LevelSequenceEditorBlueprintLibrary.set_current_time(new_time)
-            print(f"[SequencerControls] Jumped {x} frames backward to {new_time}")
+            new_time = self.current_time() - x
+            self._set_time(new_time)
+            log.debug("Jumped %s frames backward to %s", x, new_time)
+
+        def step_forward(self, frames: int = 1):
+            self.jump_x_frames_forward(frames)
+
+        def step_backward(self, frames: int = 1):
+            self.jump_x_frames_backward(frames)
 
         def get_sequence_range(self):
             if not self.sequence:
-                print("Error: No sequence set.")
+                log.error("No sequence set.")
                 return
 
-            start = self.sequence.get_playback_start()
-            end = self.sequence.get_playback_end()
-
-            print(f"[SequencerControls] Sequence range: {start} to {end}")
-            return (start, end)
+            if self._range is None or not self.per_tick_cache:
+                self._range = (self.sequence.get_playback_start(), self.sequence.get_playback_end())
+                log.debug("Sequence range: %s to %s", *self._range)
+            return self._range
 
         def set_sequence_range(self, start, end):
             if not self.sequence:
-                print("Error: No sequence set.")
+                log.error("No sequence set.")
                 return
 
             # Set playback range directly
             self.sequence.set_playback_start(start)
             self.sequence.set_playback_end(end)
+            self._range = None
+            self.range_version += 1
 
-            print(f"[SequencerControls] Set playback range: {start} to {end}")
+            log.info("Set playback range: %s to %s", start, end)
             return (start, end)
 
         def reset_sequence_range(self):
             if not self.sequence:
-                print("Error: No sequence set.")
+                log.error("No sequence set.")
                 return
 
             # Reset to default range (0 to 1)
             self.set_sequence_range(self.initial_playback_range[0], self.initial_playback_range[1])
-            print("[SequencerControls] Reset playback range to default")
+            log.info("Reset playback range to default")
 
         def current_time(self):
             if not self.sequence:
-                print("Error: No sequence set.")
+                log.error("No sequence set.")
                 return
 
-            current_time = unreal.LevelSequenceEditorBlueprintLibrary.get_current_time()
-            print(f"[SequencerControls] Current time: {current_time}")
-            return current_time
+            if self._time is None or not self.per_tick_cache:
+                self._time = unreal.LevelSequenceEditorBlueprintLibrary.get_current_time()
+                log.debug("Current time: %s", self._time)
+            return self._time
         
         def jump_to_percent(self, percent: float):
             if not self.sequence:
-                print("Error: No sequence set.")
+                log.error("No sequence set.")
                 return
 
             start, end = self.get_sequence_range()
             new_time = start + (end - start) * (percent / 100.0)
+            self._set_time(new_time)
+            log.debug("Jumped to %s%% of the sequence", percent)
+
+        def _set_time(self, new_time):
             unreal.LevelSequenceEditorBlueprintLibrary.set_current_time(new_time)
-            print(f"[SequencerControls] Jumped to {percent}% of the sequence")            
+            # Read back on next use, the editor may clamp or round it
+            self._time = None
 
     def add_actor_to_sequence(self, actor : unreal.Actor):
         if not self.sequence:
-            print("Error: No sequence set.")
+            log.error("No sequence set.")
             return
 
         # Add the actor to the sequence
         self.actor = actor
         unreal.LevelSequenceEditorBlueprintLibrary.add_actor_to_sequence(self.sequence, actor)
-        print(f"[SequencerControls] Added actor {actor.get_name()} to sequence")
+        log.info("Added actor %s to sequence", actor.get_name())
     
     def add_possesable_to_sequence(self, possesable_actor):
         if not self.sequence:
-            print("Error: No sequence set.")
+            log.error("No sequence set.")
             return
 
         # Add the spawnable to the sequence
         possesable = self.sequence.add_possessable(possesable_actor)
-        print(f"[SequencerControls] Added spawnable {possesable_actor.get_name()} to sequence with ID {possesable}")
+        log.info("Added spawnable %s to sequence with ID %s", possesable_actor.get_name(), possesable)
         self.skeletal_mesh = possesable_actor
         self.skeletal_mesh_binding_proxy = possesable
 
@@ -183,12 +319,12 @@ class SequencerControls:
 
     def add_animation_to_actor(self, skeletal_mesh, anim):
         if not self.sequence:
-            print("Error: No sequence set.")
+            log.error("No sequence set.")
             return
         
         # Don't add the same animation twice
         if self.anim_sequence == anim:
-            print(f"[SequencerControls] Animation {anim.get_name()} already added to actor {skeletal_mesh.get_name()} in sequence")
+            log.info("Animation %s already added to actor %s in sequence", anim.get_name(), skeletal_mesh.get_name())
             return
 
         params = unreal.MovieSceneSkeletalAnimationParams()
@@ -200,12 +336,33 @@ class SequencerControls:
         animation_section.set_range(0, anim.get_play_length()*self.frame_rate)
 
         self.anim_sequence = anim
-        print(f"[SequencerControls] Added animation {anim.get_name()} to actor {skeletal_mesh.get_name()} in sequence")
+        self.anim_track = anim_track
+        self.anim_section = animation_section
+        log.info("Added animation %s to actor %s in sequence", anim.get_name(), skeletal_mesh.get_name())
         return anim_track, animation_section
+
+    def swap_animation(self, anim):
+        """
+        Point the existing animation section at another animation, instead of adding a new track.
+
+        Params:
+        - anim (unreal.AnimSequence): The animation to play on the current skeletal mesh binding.
+        """
+        if self.anim_section is None:
+            return self.add_animation_to_actor(self.skeletal_mesh_binding_proxy, anim)
+
+        params = unreal.MovieSceneSkeletalAnimationParams()
+        params.set_editor_property('Animation', anim)
+        self.anim_section.set_editor_property('Params', params)
+        self.anim_section.set_range(0, anim.get_play_length()*self.frame_rate)
+
+        self.anim_sequence = anim
+        log.info("Swapped animation to %s", anim.get_name())
+        return self.anim_track, self.anim_section
     
     def add_control_rig_to_actor(self, skeletal_mesh, control_rig):
         if not self.sequence:
-            print("Error: No sequence set.")
+            log.error("No sequence set.")
             return
 
         # Using the level sequence and actor binding, we can either find or create a control rig track from the class
@@ -218,8 +375,9 @@ class SequencerControls:
         # Get the Control Rig instance
         control_rig_instance = unreal.ControlRigSequencerLibrary.get_control_rigs(self.sequence)[0].control_rig
 
-        print(f"[SequencerControls] Added Control Rig {control_rig.get_name()} to actor {skeletal_mesh.get_name()} in sequence")
+        log.info("Added Control Rig %s to actor %s in sequence", control_rig.get_name(), skeletal_mesh.get_name())
         self.control_rig = control_rig_instance
+        self.invalidate_channel_index()
         return rig_track, control_rig_instance
 
     def remove_existing_animation_tracks(self):
@@ -232,103 +390,482 @@ class SequencerControls:
             if isinstance(track, unreal.MovieSceneSkeletalAnimationTrack):
                 unreal.log(f"[SequencerControls] Removing existing animation track: {track.get_display_name()}")
                 self.skeletal_mesh_binding_proxy.remove_track(track)
+        self.anim_sequence = None
+        self.anim_track = None
+        self.anim_section = None
+        self.invalidate_channel_index()
+
+    def clear_control_rig_keys(self):
+        """Remove every key from the control rig channels, queued keyframes included, e.g. between takes."""
+        # Queued keyframes aren't in the channels yet, write them first so none land after the clear
+        self.flush_keyframes()
+        if self._channel_index is None:
+            self._channel_index = self._build_channel_index()
+
+        removed = 0
+        for channels in self._channel_index.values():
+            for channel in channels:
+                keys = channel.get_keys()
+                if keys:
+                    self._remove_keys(channel, keys)
+                    removed += len(keys)
+        log.info("Cleared %s control rig keys", removed)
+        return removed
 
     
     def set_keyframe_control_rig(self, ctrl_name, value, frame_number=None, modus="Float"):
         if not self.sequence:
-            print("Error: No sequence set.")
+            log.error("No sequence set.")
             return
 
         if not self.control_rig:
-            print("Error: No control rig set.")
+            log.error("No control rig set.")
             return
 
+        kind, axis = self._parse_modus(modus)
+
         if frame_number is None:
             frame_number = unreal.FrameNumber(self.time_controls.current_time())
 
-        seq_lib = unreal.ControlRigSequencerLibrary
+        if self.defer_keyframes:
+            self._queue_keyframe(ctrl_name, frame_number, kind, axis, value)
+            return
+
+        if self.profiler is None:
+            self._write_keyframe(ctrl_name, frame_number, kind, {axis: value})
+        else:
+            self._profiled_write(self.profiler, ctrl_name, frame_number, kind, {axis: value}, self.profiler.current_arrival)
 
+    def _parse_modus(self, modus):
         if modus == "Float":
-            # Set the control rig float value
+            return "Float", None
+        if modus in _ROTATOR_AXES:
+            return "Rotator", _ROTATOR_AXES[modus]
+        if modus in _EULER_AXES:
+            return "Euler", _EULER_AXES[modus]
+        raise ValueError(f"Unsupported modus: {modus}")
+
+    def _queue_keyframe(self, ctrl_name, frame_number, kind, axis, value):
+        frame = frame_number.value if isinstance(frame_number, unreal.FrameNumber) else int(frame_number)
+        key = (ctrl_name, frame, kind)
+        pending = self._pending_keyframes.get(key)
+        if pending is None:
+            self._pending_keyframes[key] = {axis: value}
+        else:
+            # Superseded values for the same axis are dropped, other axes are merged into one write
+            pending[axis] = value
+        self._queued_keyframe_writes[kind] += 1
+
+        if self.profiler is not None and self.profiler.current_arrival is not None:
+            arrival = self._pending_arrivals.get(key)
+            if arrival is None or self.profiler.current_arrival < arrival:
+                self._pending_arrivals[key] = self.profiler.current_arrival
+
+    def flush_keyframes(self):
+        """Write all queued keyframes, one Unreal write per (ctrl_name, frame). Call once per tick."""
+        if not self._pending_keyframes:
+            return 0
+
+        pending_keyframes, self._pending_keyframes = self._pending_keyframes, {}
+        pending_arrivals, self._pending_arrivals = self._pending_arrivals, {}
+        queued_writes, self._queued_keyframe_writes = self._queued_keyframe_writes, {"Float": 0, "Rotator": 0, "Euler": 0}
+
+        if not self.sequence or not self.control_rig:
+            log.error("No sequence or control rig set, dropping queued keyframes.")
+            return 0
+
+        profiler = self.profiler
+        start = time.perf_counter() if profiler is not None else 0.0
+        calls = 0
+        for key, axes in pending_keyframes.items():
+            ctrl_name, frame, kind = key
+            if profiler is None:
+                calls += self._write_keyframe(ctrl_name, unreal.FrameNumber(frame), kind, axes)
+            else:
+                calls += self._profiled_write(profiler, ctrl_name, unreal.FrameNumber(frame), kind, axes, pending_arrivals.get(key))
+        if profiler is not None:
+            profiler.record("flush_keyframes", time.perf_counter() - start)
+
+        # What the same writes would have cost one by one, including the read-back
+        unbatched_calls = sum(count * _UNBATCHED_CALLS[kind] for kind, count in queued_writes.items())
+        self.unreal_calls_saved += max(0, unbatched_calls - calls)
+        return len(pending_keyframes)
+
+    def _profiled_write(self, profiler, ctrl_name, frame_number, kind, axes, arrival):
+        start = time.perf_counter()
+        calls = self._write_keyframe(ctrl_name, frame_number, kind, axes)
+        end = time.perf_counter()
+        profiler.record(f"unreal.write_{kind.lower()}", end - start)
+        if arrival is not None:
+            profiler.record("osc_to_keyframe", end - arrival)
+        return calls
+
+    def _write_keyframe(self, ctrl_name, frame_number, kind, axes):
+        """Write one key with all given axes applied. Returns the number of Unreal calls made."""
+        seq_lib = unreal.ControlRigSequencerLibrary
+        calls = 1
+        current = None
+
+        if kind == "Float":
+            value = axes[None]
             seq_lib.set_local_control_rig_float(self.sequence, self.control_rig, ctrl_name, frame_number, value, set_key=True)
-            # Set a keyframe at the current time
-            current = seq_lib.get_local_control_rig_float(self.sequence, self.control_rig, ctrl_name, frame_number)
-            print(f"[SequencerControls] Set {ctrl_name} to {value} at frame {frame_number}, current value: {current}")
-        elif modus.startswith("Rotator"):
-            rot_map = {
-                "RotatorX": unreal.Rotator(value, 0, 0),
-                "RotatorY": unreal.Rotator(0, value, 0),
-                "RotatorZ": unreal.Rotator(0, 0, value)
-            }
-            rot = rot_map.get(modus)
+            if self.debug_keyframes:
+                current = seq_lib.get_local_control_rig_float(self.sequence, self.control_rig, ctrl_name, frame_number)
+                calls += 1
+        elif kind == "Rotator":
+            # Axes that are not set are keyed at 0
+            rot_values = [0.0, 0.0, 0.0]
+            for index, value in axes.items():
+                rot_values[index] = value
+            rot = unreal.Rotator(*rot_values)
             seq_lib.set_local_control_rig_rotator(self.sequence, self.control_rig, ctrl_name, frame_number, rot, set_key=True)
-            current = seq_lib.get_local_control_rig_rotator(self.sequence, self.control_rig, ctrl_name, frame_number)
-        elif modus.startswith("EulerRotation"):
-            current_transform = seq_lib.get_local_control_rig_euler_transform(self.sequence, self.control_rig, ctrl_name, frame_number)
-            if modus == "EulerRotationX":
-                current_transform.rotation.roll = value
-            elif modus == "EulerRotationY":
-                current_transform.rotation.yaw = value
-            elif modus == "EulerRotationZ":
-                current_transform.rotation.pitch = value
-            seq_lib.set_local_control_rig_euler_transform(self.sequence, self.control_rig, ctrl_name, frame_number, current_transform, set_key=True)
-            current = seq_lib.get_local_control_rig_euler_transform(self.sequence, self.control_rig, ctrl_name, frame_number)
-        elif modus.startswith("EulerTransform"):
+            if self.debug_keyframes:
+                current = seq_lib.get_local_control_rig_rotator(self.sequence, self.control_rig, ctrl_name, frame_number)
+                calls += 1
+        else:
             current_transform = seq_lib.get_local_control_rig_euler_transform(self.sequence, self.control_rig, ctrl_name, frame_number)
-            if modus == "EulerTransformX":
-                current_transform.location.x = value
-            elif modus == "EulerTransformY":
-                current_transform.location.y = value
-            elif modus == "EulerTransformZ":
-                current_transform.location.z = value
+            for (part, attr), value in axes.items():
+                setattr(getattr(current_transform, part), attr, value)
             seq_lib.set_local_control_rig_euler_transform(self.sequence, self.control_rig, ctrl_name, frame_number, current_transform, set_key=True)
-            current = seq_lib.get_local_control_rig_euler_transform(self.sequence, self.control_rig, ctrl_name, frame_number)
-        else:
-            raise ValueError(f"Unsupported modus: {modus}")
-        
-        print(f"[SequencerControls] Set {ctrl_name} to {value} at frame {frame_number}, current value: {current}")
+            calls += 1
+            if self.debug_keyframes:
+                current = seq_lib.get_local_control_rig_euler_transform(self.sequence, self.control_rig, ctrl_name, frame_number)
+                calls += 1
+
+        log.debug("Set %s to %s at frame %s, current value: %s", ctrl_name, axes, frame_number, current)
+        return calls
     
     def set_keyframe_all_zero(self):
-        for ctrl in ctrlRigVals:
-            print(f"[SequencerControls] Setting keyframe for {ctrl.value} to 0.0")
-            self.set_keyframe_control_rig(ctrl.value, 0.0, modus="Float")
+        """Key every ctrlRigVals control to 0 at the current frame, as one undo step."""
+        return self.set_pose({ctrl.value: 0.0 for ctrl in ctrlRigVals}, description="Key all controls to zero")
 
-    def remove_keys_in_range_for_ctrl(self, ctrl_name, start_frame, end_frame):
+    def set_pose(self, pose, frame_number=None, description="Set pose"):
+        """
+        Key several controls at one frame in a single editor transaction, so the pose is one undo step.
+
+        Params:
+        - pose (dict): ctrl_name -> value for float controls, or ctrl_name -> {modus: value} with the
+          modi of set_keyframe_control_rig, e.g. {"RightHandIndex": 20.0, "Wrist": {"RotatorX": 10.0}}.
+        - frame_number (int): Frame to key, the playhead (read once) when None.
+
+        Returns the number of Unreal calls made for the keys.
+        """
+        if not self.sequence:
+            log.error("No sequence set.")
+            return 0
+
+        if not self.control_rig:
+            log.error("No control rig set.")
+            return 0
+
+        # Parse the whole pose first, so a bad modus doesn't leave half of it keyed
+        writes = {}
+        for ctrl_name, value in pose.items():
+            for modus, axis_value in (value.items() if isinstance(value, dict) else (("Float", value),)):
+                kind, axis = self._parse_modus(modus)
+                writes.setdefault((ctrl_name, kind), {})[axis] = axis_value
+
+        if frame_number is None:
+            frame_number = unreal.FrameNumber(self.time_controls.current_time())
+        elif not isinstance(frame_number, unreal.FrameNumber):
+            frame_number = unreal.FrameNumber(int(frame_number))
+
+        # Queued keys would land on top of the pose at the next flush
+        self.flush_keyframes()
+
+        calls = 0
+        with unreal.ScopedEditorTransaction(description):
+            for (ctrl_name, kind), axes in writes.items():
+                calls += self._write_keyframe(ctrl_name, frame_number, kind, axes)
+        log.info("%s: keyed %s controls at frame %s", description, len(pose), frame_number.value)
+        return calls
+
+    def get_pose(self, ctrl_names=None, frame_number=None):
+        """
+        Read float controls at a frame as a pose for set_pose(), e.g. to snapshot and reapply it.
+
+        Params:
+        - ctrl_names (list): Controls to read, every ctrlRigVals control when None.
+        - frame_number (int): Frame to read, the playhead (read once) when None.
+        """
         if not self.sequence or not self.control_rig:
-            print("Error: No sequence or control rig set.")
-            return
+            log.error("No sequence or control rig set.")
+            return {}
 
-        if start_frame > end_frame:
-            start_frame, end_frame = end_frame, start_frame
+        if frame_number is None:
+            frame_number = unreal.FrameNumber(self.time_controls.current_time())
+        elif not isinstance(frame_number, unreal.FrameNumber):
+            frame_number = unreal.FrameNumber(int(frame_number))
+
+        self.flush_keyframes()
+        seq_lib = unreal.ControlRigSequencerLibrary
+        names = ctrl_names if ctrl_names is not None else [ctrl.value for ctrl in ctrlRigVals]
+        return {name: seq_lib.get_local_control_rig_float(self.sequence, self.control_rig, name, frame_number) for name in names}
+
+    def get_channels_for_ctrl(self, ctrl_name):
+        """
+        Get the control rig float channels for a control, using a cached index.
+
+        Params:
+        - ctrl_name (str): The channel name as shown in Sequencer.
+        """
+        if self._channel_index is None:
+            self._channel_index = self._build_channel_index()
+        return self._channel_index.get(ctrl_name, [])
+
+    def invalidate_channel_index(self):
+        self._channel_index = None
+
+    def _build_channel_index(self):
+        index = {}
+        if not self.sequence:
+            return index
 
         for binding in self.sequence.get_bindings():
             for track in binding.get_tracks():
                 if isinstance(track, unreal.MovieSceneControlRigParameterTrack):
                     for section in track.get_sections():
                         # We must iterate all possible scripting channels manually
-                        all_channels = section.get_channels_by_type(unreal.MovieSceneScriptingFloatChannel)
-                        # all_channels = section.get_channel_proxy().get_all_channels()
-                        for channel in all_channels:
+                        for channel in section.get_channels_by_type(unreal.MovieSceneScriptingFloatChannel):
                             # This returns the name as shown in Sequencer
-                            name = channel.channel_name
-                            if name == ctrl_name:
-                                if isinstance(channel, unreal.MovieSceneScriptingFloatChannel):
-                                    keys = channel.get_keys()
-                                    for key in keys:
-                                        frame = key.get_time().frame_number.value
-                                        if start_frame <= frame <= end_frame:
-                                            print(f"[SequencerControls] Removing key on '{ctrl_name}' at frame {frame}")
-                                            channel.remove_key(key)
+                            index.setdefault(str(channel.channel_name), []).append(channel)
+        return index
+
+    def remove_keys_in_range_for_ctrl(self, ctrl_name, start_frame, end_frame):
+        if not self.sequence or not self.control_rig:
+            log.error("No sequence or control rig set.")
+            return
+        # Queued keyframes in the range would otherwise be written after the removal
+        self.flush_keyframes()
+
+        if start_frame > end_frame:
+            start_frame, end_frame = end_frame, start_frame
+
+        for channel in self.get_channels_for_ctrl(ctrl_name):
+            keys = channel.get_keys()
+            if not keys:
+                continue
+
+            frames = [key.get_time().frame_number.value for key in keys]
+            if any(frames[i] > frames[i + 1] for i in range(len(frames) - 1)):
+                order = sorted(range(len(keys)), key=frames.__getitem__)
+                keys = [keys[i] for i in order]
+                frames = [frames[i] for i in order]
+
+            lo = bisect.bisect_left(frames, start_frame)
+            hi = bisect.bisect_right(frames, end_frame)
+            if lo < hi:
+                log.info("Removing %s keys on '%s' between frame %s and %s", hi - lo, ctrl_name, start_frame, end_frame)
+                if self.profiler is None:
+                    self._remove_keys(channel, keys[lo:hi])
+                else:
+                    with self.profiler.stage("unreal.remove_keys"):
+                        self._remove_keys(channel, keys[lo:hi])
+
+    def _remove_keys(self, channel, keys):
+        """Returns the number of Unreal calls made."""
+        for key in keys:
+            channel.remove_key(key)
+        return len(keys)
+
+    def _add_keys(self, channel, frames, values):
+        """Returns the number of Unreal calls made."""
+        frame_numbers = [unreal.FrameNumber(frame) for frame in frames]
+        for frame_number, value in zip(frame_numbers, values):
+            channel.add_key(frame_number, value)
+        return len(frame_numbers)
+
+    def get_control_keys(self, ctrl_name, start_frame=None, end_frame=None):
+        """
+        Read a control's keys as NumPy arrays, with one get_keys() call per channel.
+
+        Params:
+        - ctrl_name (str): The control name, its channels are "<ctrl_name>" or "<ctrl_name>.<part>.<axis>".
+        - start_frame, end_frame (int): Inclusive frame range, None reads to the start or end of the channels.
+
+        Returns (frames, values). frames is an int64 array of shape (N,) with every keyed frame of the
+        control. values is float64, shaped (N,) for a float control and (N, C) with one column per
+        channel in Sequencer's order otherwise (3 for a rotator, 9 for an euler transform). A channel
+        without a key on one of the frames is filled in linearly from its own keys, a channel without
+        any keys with its default value.
+        """
+        _require_numpy()
+        self.flush_keyframes()
+        channels = self._control_channels(ctrl_name)
+        if not channels:
+            log.error("No channels found for control '%s'", ctrl_name)
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+
+        per_channel = []
+        for channel in channels:
+            keys = channel.get_keys()
+            key_frames = np.fromiter((key.get_time().frame_number.value for key in keys), dtype=np.int64, count=len(keys))
+            key_values = np.fromiter((key.get_value() for key in keys), dtype=np.float64, count=len(keys))
+            order = np.argsort(key_frames, kind="stable")
+            per_channel.append((key_frames[order], key_values[order]))
+
+        frames = np.unique(np.concatenate([key_frames for key_frames, _ in per_channel]))
+        if start_frame is not None:
+            frames = frames[frames >= start_frame]
+        if end_frame is not None:
+            frames = frames[frames <= end_frame]
+
+        columns = [
+            np.interp(frames, key_frames, key_values) if len(key_frames) else np.full(len(frames), self._channel_default(channel))
+            for channel, (key_frames, key_values) in zip(channels, per_channel)
+        ]
+        values = columns[0] if len(columns) == 1 else np.column_stack(columns)
+        return frames, values
+
+    def set_control_keys(self, ctrl_name, frames, values):
+        """
+        Write arrays shaped like get_control_keys() returns them back to a control's channels.
+
+        The keys of each channel between the first and last frame are replaced: keys on a given frame
+        are updated in place when their value changed, keys on other frames are removed and new frames
+        are added. A channel without any keys is only keyed when its column differs from the default
+        get_control_keys() filled in, so a round trip doesn't key untouched channels. Returns the number
+        of Unreal calls made.
+        """
+        _require_numpy()
+        self.flush_keyframes()
+        channels = self._control_channels(ctrl_name)
+        if not channels:
+            log.error("No channels found for control '%s'", ctrl_name)
+            return 0
+
+        frames = np.asarray(frames, dtype=np.int64).ravel()
+        values = np.asarray(values, dtype=np.float64)
+        if values.ndim == 1:
+            values = values[:, None]
+        if values.shape != (len(frames), len(channels)):
+            raise ValueError(f"Expected values of shape ({len(frames)}, {len(channels)}) for '{ctrl_name}', got {values.shape}")
+        if len(frames) == 0:
+            return 0
+
+        order = np.argsort(frames, kind="stable")
+        frames, values = frames[order], values[order]
+        if np.any(frames[1:] == frames[:-1]):
+            raise ValueError("frames must be unique")
+
+        start, end = int(frames[0]), int(frames[-1])
+        calls = 0
+        for column, channel in enumerate(channels):
+            keys = channel.get_keys()
+            calls += 1
+            if not keys and np.all(values[:, column] == self._channel_default(channel)):
+                continue
+            calls += self._write_channel_keys(channel, frames.tolist(), values[:, column].tolist(), start, end, keys)
+        log.debug("Wrote %s keys on '%s' between frame %s and %s with %s calls", len(frames), ctrl_name, start, end, calls)
+        return calls
+
+    def set_channel_keys(self, ctrl_name, modus, frames, values):
+        """
+        Write keys to the single channel of a control that a modus keys (see set_keyframe_control_rig),
+        replacing its keys between the first and last frame like set_control_keys().
+
+        Params:
+        - frames, values: Sorted unique frames and their values, arrays or lists.
+        """
+        _require_numpy()
+        if modus not in _MODUS_CHANNELS:
+            raise ValueError(f"Unsupported modus: {modus}")
+        channels = self._control_channels(ctrl_name)
+        index = _MODUS_CHANNELS[modus]
+        if index >= len(channels):
+            log.error("No %s channel found for control '%s'", modus, ctrl_name)
+            return 0
+
+        frames = np.asarray(frames, dtype=np.int64).ravel()
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if len(frames) != len(values):
+            raise ValueError(f"Got {len(frames)} frames for {len(values)} values")
+        if len(frames) == 0:
+            return 0
+        self.flush_keyframes()
+        return self._write_channel_keys(channels[index], frames.tolist(), values.tolist(), int(frames[0]), int(frames[-1]))
+
+    def set_curves(self, curves, description="Set curves"):
+        """
+        Write several channels with set_channel_keys() in one editor transaction, so they are one undo step.
+
+        Params:
+        - curves (dict): (ctrl_name, modus) -> (frames, values).
+
+        Returns the number of keys written.
+        """
+        if not self.sequence or not self.control_rig:
+            log.error("No sequence or control rig set.")
+            return 0
+
+        keys = 0
+        with unreal.ScopedEditorTransaction(description):
+            for (ctrl_name, modus), (frames, values) in curves.items():
+                if self.set_channel_keys(ctrl_name, modus, frames, values):
+                    keys += len(frames)
+        log.info("%s: wrote %s keys on %s channels", description, keys, len(curves))
+        return keys
+
+    def _write_channel_keys(self, channel, frames, values, start, end, keys=None):
+        # keys: the channel's keys when the caller already read them
+        calls = 0
+        if keys is None:
+            keys = channel.get_keys()
+            calls += 1
+        existing = {}
+        for key in keys:
+            frame = key.get_time().frame_number.value
+            if start <= frame <= end:
+                existing[frame] = key
+
+        targets = dict(zip(frames, values))
+        stale = [key for frame, key in existing.items() if frame not in targets]
+        if stale:
+            calls += self._remove_keys(channel, stale)
+
+        new_frames = []
+        new_values = []
+        for frame, value in targets.items():
+            key = existing.get(frame)
+            if key is None:
+                new_frames.append(frame)
+                new_values.append(value)
+            elif key.get_value() != value:
+                key.set_value(value)
+                calls += 1
+        if new_frames:
+            calls += self._add_keys(channel, new_frames, new_values)
+        return calls
+
+    @staticmethod
+    def _channel_default(channel):
+        has_default = getattr(channel, "has_default", None)
+        if has_default is not None and has_default():
+            return channel.get_default()
+        return 0.0
+
+    def get_control_names(self):
+        """Names of the controls with channels on the control rig track, in Sequencer's order."""
+        if self._channel_index is None:
+            self._channel_index = self._build_channel_index()
+        return list(dict.fromkeys(name.split(".", 1)[0] for name in self._channel_index))
+
+    def _control_channels(self, ctrl_name):
+        # A float control has one channel named after it, other types one per "<ctrl_name>.<part>.<axis>"
+        channels = self.get_channels_for_ctrl(ctrl_name)
+        if channels:
+            return list(channels)
+        prefix = f"{ctrl_name}."
+        return [channel for name, named in self._channel_index.items() if name.startswith(prefix) for channel in named]
 
     def export_current_sequence(self, file_name, file_path, ue_package_path="/Game/"):
         if not self.sequence:
-            print("Error: No sequence set.")
+            log.error("No sequence set.")
             return
         
         # ls_editor = unreal.get_editor_subsystem(unreal.LevelSequenceEditorSubsystem)
         # print(self.skeletal_mesh)
         # binding = self.sequence.find_binding_by_name(self.skeletal_mesh.get_name())
-        binding = self.skeletal_mesh_binding_proxy
 
         # if not binding or binding.get_id() == unreal.Guid():
         #     print(self.skeletal_mesh)
@@ -347,28 +884,33 @@ class SequencerControls:
         # else:
         #     print("Transform baking failed.")
 
-        # Get the current level sequence
-        level_sequence = self.sequence
         # level_sequence = unreal.LevelSequenceEditorBlueprintLibrary.get_current_level_sequence()
+        job = self._export_job(file_name, ue_package_path)
+        for _ in job.steps():
+            pass
+        return job.anim_sequence
 
-        # Grab the Level Editor World
-        editor_subsystem = unreal.get_editor_subsystem(unreal.UnrealEditorSubsystem)
-        world = editor_subsystem.get_editor_world()
+    def queue_export(self, file_name, file_path, ue_package_path="/Game/", on_done=None):
+        """
+        Export like export_current_sequence, but on later ticks through the export queue.
 
-        # Create animation sequence export options
-        anim_seq_export_options = unreal.AnimSeqExportOption()
-        anim_seq_export_options.export_morph_targets = True
+        Params:
+        - on_done (callable): Called with the ExportJob when it is done or failed.
 
-        animFactory = unreal.AnimSequenceFactory()
-        animFactory.target_skeleton = self.skeletal_mesh.skeletal_mesh_component.skeletal_mesh.skeleton
-        # Get asset tools
-        # Create an empty AnimSequence - /Game/Test_Anim
-        print(dir(self.skeletal_mesh))
-        asset_tools = unreal.AssetToolsHelpers.get_asset_tools()
-        anim_sequence = unreal.AssetTools.create_asset(asset_tools, asset_name = file_name, package_path = ue_package_path, asset_class = unreal.AnimSequence, factory = animFactory)
-
-        # Bake to the created AnimSequence
-        unreal.SequencerTools.export_anim_sequence(world, level_sequence, anim_sequence, anim_seq_export_options, binding, False)
+        Returns the ExportJob, or the already queued job with the same name it was merged into.
+        While that export is running the returned job is its rerun, see ExportQueue.
+        """
+        if not self.sequence:
+            log.error("No sequence set.")
+            return None
+        if self.export_queue is None:
+            self.export_queue = ExportQueue()
+        return self.export_queue.submit(self._export_job(file_name, ue_package_path), on_done)
+
+    def _export_job(self, file_name, ue_package_path):
+        skeleton = self.skeletal_mesh.skeletal_mesh_component.skeletal_mesh.skeleton
+        process_curves = partial(self.curve_processor.apply, self) if self.curve_processor is not None and self.control_rig else None
+        return ExportJob(file_name, ue_package_path, self.sequence, self.skeletal_mesh_binding_proxy, skeleton, process_curves=process_curves)
 
 
 
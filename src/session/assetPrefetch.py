@@ -0,0 +1,123 @@
+import os
+from collections import OrderedDict, deque
+import unreal
+from src.tickHook import get_scheduler
+from src.logger import get_logger
+
+log = get_logger("AssetPrefetcher")
+
+def game_path_to_disk(path):
+    """Map a /Game/ package or object path to its location under the project Content folder, None for other roots."""
+    if not path.startswith("/Game/"):
+        return None
+    package = path.split(".", 1)[0]
+    return os.path.join(unreal.Paths.project_content_dir(), *package[len("/Game/"):].split("/"))
+
+class AssetPrefetcher:
+    """
+    LRU of assets loaded ahead of time on the tick scheduler.
+
+    Unreal's Python API has no asynchronous package loading, so prefetching loads one
+    queued asset per tick as a low priority generator task. It is deferrable work, so it
+    waits whenever the scheduler's global budget is spent. Assets are charged with their
+    package size on disk, and the oldest ones are dropped above memory_limit_mb.
+    """
+    def __init__(self, memory_limit_mb=512, default_asset_mb=16, scheduler=None, priority=-10):
+        self.memory_limit_bytes = int(memory_limit_mb * 1024 * 1024)
+        self.default_asset_bytes = int(default_asset_mb * 1024 * 1024)
+        self.scheduler = scheduler if scheduler is not None else get_scheduler()
+        self.priority = priority
+        self._cache = OrderedDict()  # path -> (asset, size in bytes)
+        self._queue = deque()
+        self._task = None
+        self.cached_bytes = 0
+
+        # Stats
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.evictions = 0
+
+    def get(self, path):
+        """
+        Return the asset at path, from the cache when prefetched, loading it now otherwise.
+
+        The asset leaves the cache, whoever asked for it holds the reference from here on.
+        """
+        entry = self._cache.pop(path, None)
+        if entry is not None:
+            self.cached_bytes -= entry[1]
+            self.hits += 1
+            return entry[0]
+
+        if path in self._queue:
+            self._queue.remove(path)
+        self.misses += 1
+        return unreal.load_asset(path)
+
+    def prefetch(self, paths):
+        """Queue paths to be loaded on upcoming ticks, in order."""
+        for path in paths:
+            if path not in self._cache and path not in self._queue:
+                self._queue.append(path)
+        if self._queue and self._task is None:
+            self._task = self.scheduler.add_generator(self._prefetch_steps(), priority=self.priority, name="AssetPrefetch")
+
+    def clear(self):
+        self._queue.clear()
+        if self._task is not None:
+            self.scheduler.remove(self._task)
+            self._task = None
+        self._cache.clear()
+        self.cached_bytes = 0
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "prefetched": self.prefetched,
+            "evictions": self.evictions,
+            "cached": len(self._cache),
+            "cached_mb": self.cached_bytes / (1024 * 1024),
+        }
+
+    def _prefetch_steps(self):
+        try:
+            while self._queue:
+                path = self._queue.popleft()
+                if path not in self._cache:
+                    asset = unreal.load_asset(path)
+                    if asset:
+                        self._put(path, asset)
+                        self.prefetched += 1
+                        log.debug("Prefetched %s", path)
+                    else:
+                        log.warning("Could not prefetch %s", path)
+                yield
+        finally:
+            self._task = None
+
+    def _put(self, path, asset):
+        size = self._estimate_bytes(path)
+        previous = self._cache.pop(path, None)
+        if previous is not None:
+            self.cached_bytes -= previous[1]
+        self._cache[path] = (asset, size)
+        self.cached_bytes += size
+
+        # Keep the newest entry even when it alone is over the limit
+        while self.cached_bytes > self.memory_limit_bytes and len(self._cache) > 1:
+            evicted, (_, evicted_size) = self._cache.popitem(last=False)
+            self.cached_bytes -= evicted_size
+            self.evictions += 1
+            log.debug("Evicted %s", evicted)
+
+    def _estimate_bytes(self, path):
+        package_file = game_path_to_disk(path)
+        if package_file is None:
+            return self.default_asset_bytes
+        size = 0
+        for extension in (".uasset", ".uexp", ".ubulk"):
+            if os.path.exists(package_file + extension):
+                size += os.path.getsize(package_file + extension)
+        return size or self.default_asset_bytes
@@ -0,0 +1,399 @@
+"""
+Parallel batch export across several headless editor processes.
+
+The coordinator fills a file based job queue with the todo list, starts N workers
+and merges their reports. Each worker runs AnimationSessionManager without ticks,
+leasing one take at a time until the queue is drained. A worker that dies leaves its
+lease behind, which expires and puts the take back in the queue for another attempt.
+
+Run a worker in a headless editor (the coordinator does this for you):
+    UnrealEditor-Cmd.exe Project.uproject -run=pythonscript -script="src/session/batchExport.py worker --queue-dir D:/queue --worker-id w0"
+
+Try the whole flow locally against the mock `unreal` module:
+    python -m src.session.batchExport coordinator --queue-dir /tmp/queue --workers 3 --stub 12
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import uuid
+
+_REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if _REPO_ROOT not in sys.path:
+    # Started as a script by a headless editor, make the src package importable
+    sys.path.insert(0, _REPO_ROOT)
+
+from src.logger import get_logger
+
+log = get_logger("BatchExport")
+
+class FileJobQueue:
+    """
+    Job queue in a directory, shared by processes on one machine.
+
+    Jobs are JSON files that move between pending/, leased/, done/ and failed/ with
+    atomic renames, so only one worker can lease a job. A lease lasts lease_seconds
+    from the leased file's mtime, renew() touches it. The leased file carries a lease token,
+    renew(), complete() and fail() check it and drop the call when the lease has expired
+    and the job went back to pending or to another worker.
+    """
+    STATES = ("pending", "leased", "done", "failed")
+
+    def __init__(self, directory, lease_seconds=600.0, max_attempts=3):
+        self.directory = directory
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        for state in self.STATES + ("reports",):
+            os.makedirs(os.path.join(directory, state), exist_ok=True)
+
+    def add(self, asset_paths):
+        """Add a job per asset path that isn't in the queue yet, returns the number added."""
+        known = {job["asset"] for state in self.STATES for job in self.jobs(state)}
+        next_id = sum(len(os.listdir(self._dir(state))) for state in self.STATES)
+        added = 0
+        for asset_path in asset_paths:
+            if asset_path in known:
+                continue
+            job = {"id": f"{next_id:06d}", "asset": asset_path, "attempts": 0, "errors": []}
+            self._write(self._path("pending", job["id"]), job)
+            known.add(asset_path)
+            next_id += 1
+            added += 1
+        return added
+
+    def lease(self, worker_id):
+        """Take the oldest pending job, or None when nothing is pending."""
+        self.reclaim_expired()
+        for name in sorted(os.listdir(self._dir("pending"))):
+            job_id = name[:-len(".json")]
+            leased_path = self._path("leased", job_id)
+            try:
+                os.rename(self._path("pending", job_id), leased_path)
+            except OSError:
+                continue  # Another worker got it first
+            # rename keeps the mtime from when the job was queued, the lease starts now
+            os.utime(leased_path)
+            job = self._read(leased_path)
+            job["worker"] = worker_id
+            job["lease"] = uuid.uuid4().hex
+            self._write(leased_path, job)
+            return job
+        return None
+
+    def renew(self, job):
+        """Extend the lease, returns False when it was lost."""
+        if not self.holds_lease(job):
+            return False
+        try:
+            os.utime(self._path("leased", job["id"]))
+        except OSError:
+            return False
+        return True
+
+    def holds_lease(self, job):
+        """Whether the leased file is still the one leased as job."""
+        try:
+            leased = self._read(self._path("leased", job["id"]))
+        except (OSError, ValueError):
+            return False
+        return leased.get("lease") == job.get("lease")
+
+    def complete(self, job, result):
+        """Record the result, returns False and drops it when the lease was lost."""
+        if not self.holds_lease(job):
+            log.warning("Dropping the result of %s, the lease of %s was lost", job["asset"], job.get("worker"))
+            return False
+        job = dict(job, result=result)
+        self._write(self._path("done", job["id"]), job)
+        self._remove(self._path("leased", job["id"]))
+        self._remove(self._path("pending", job["id"]))
+        return True
+
+    def fail(self, job, error):
+        """
+        Record a failed attempt, the job goes back to pending until it has used max_attempts.
+
+        Returns False and drops the attempt when the lease was lost.
+        """
+        if not self.holds_lease(job):
+            log.warning("Dropping the failed attempt on %s, the lease of %s was lost", job["asset"], job.get("worker"))
+            return False
+        job = dict(job, attempts=job["attempts"] + 1, errors=job["errors"] + [error])
+        state = "failed" if job["attempts"] >= self.max_attempts else "pending"
+        self._write(self._path(state, job["id"]), job)
+        self._remove(self._path("leased", job["id"]))
+        return True
+
+    def reclaim_expired(self):
+        now = time.time()
+        for name in os.listdir(self._dir("leased")):
+            path = os.path.join(self._dir("leased"), name)
+            try:
+                expired = os.path.getmtime(path) + self.lease_seconds < now
+                job = self._read(path) if expired else None
+            except (OSError, ValueError):
+                continue
+            if job is not None:
+                self.fail(job, f"lease of {job.get('worker')} expired")
+
+    def counts(self):
+        return {state: len(os.listdir(self._dir(state))) for state in self.STATES}
+
+    def is_drained(self):
+        counts = self.counts()
+        return counts["pending"] == 0 and counts["leased"] == 0
+
+    def jobs(self, state):
+        jobs = []
+        for name in sorted(os.listdir(self._dir(state))):
+            try:
+                jobs.append(self._read(os.path.join(self._dir(state), name)))
+            except (OSError, ValueError):
+                continue
+        return jobs
+
+    def _dir(self, state):
+        return os.path.join(self.directory, state)
+
+    def _path(self, state, job_id):
+        return os.path.join(self.directory, state, f"{job_id}.json")
+
+    def _read(self, path):
+        with open(path, "r") as f:
+            return json.load(f)
+
+    def _write(self, path, data):
+        # Write next to the target and swap, readers never see half a file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, path)
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+def _load_config(queue_dir):
+    with open(os.path.join(queue_dir, "config.json"), "r") as f:
+        return json.load(f)
+
+def _install_stub(config):
+    """Use the mock `unreal` module with the sequence, rig and actor of the config, returns the module."""
+    from benchmarks import mock_unreal
+    unreal = mock_unreal.install()
+    mock_unreal.set_latency(config.get("stub_latency_ms", 0.0) / 1000.0)
+    unreal.register_asset(config["sequence_path"], unreal.LevelSequence("stub_sequence"))
+    unreal.register_asset(config["rig_path"], unreal.ControlRigBlueprint("stub_rig", {"RightHandIndex": "Float"}))
+    unreal.add_level_actor(unreal.SkeletalMeshActor(config["actor_name"]))
+    return unreal
+
+def run_worker(queue_dir, worker_id, poll_seconds=1.0):
+    """Process jobs from the queue until it is drained, writing reports/<worker_id>.json after every job."""
+    config = _load_config(queue_dir)
+    queue = FileJobQueue(queue_dir, config["lease_seconds"], config["max_attempts"])
+    stub = _install_stub(config) if config.get("stub") else None
+
+    from src.session.sessionManager import AnimationSessionManager
+    manager = AnimationSessionManager(config["input_folder"], config["output_folder"], config["sequence_path"], config["rig_path"], warm_session=True)
+    report = {"worker": worker_id, "pid": os.getpid(), "started": time.time(), "completed": 0, "failed": 0, "lost": 0, "stage_s": {"load": [], "export": [], "cleanup": []}}
+    report_path = os.path.join(queue_dir, "reports", f"{worker_id}.json")
+
+    while True:
+        job = queue.lease(worker_id)
+        if job is None:
+            if queue.is_drained():
+                break
+            # Other workers still hold leases, one may expire and come back to pending
+            time.sleep(poll_seconds)
+            continue
+
+        asset_path = job["asset"]
+        if stub is not None:
+            stub.register_asset(asset_path, stub.AnimSequence(asset_path.rpartition(".")[2]))
+        anim_name = asset_path.replace(f"{config['input_folder']}/", "")
+        manager.todo = [asset_path]
+        timings = {}
+        try:
+            start = time.perf_counter()
+            controls = manager.load_animation(anim_name, config["actor_name"])
+            timings["load"] = time.perf_counter() - start
+            if not controls:
+                raise RuntimeError("load failed")
+            if not queue.renew(job):
+                raise RuntimeError("lease lost")
+
+            start = time.perf_counter()
+            exported = manager.bake_and_export(anim_name.split(".")[0], controls)
+            timings["export"] = time.perf_counter() - start
+            if not exported:
+                raise RuntimeError("export failed")
+            if not queue.renew(job):
+                raise RuntimeError("lease lost")
+
+            start = time.perf_counter()
+            manager.cleanup_input(anim_name, config["delete_original"], config["move_folder"], anim_name.split(".")[0])
+            timings["cleanup"] = time.perf_counter() - start
+        except Exception as e:
+            log.error("%s failed on %s: %s", worker_id, asset_path, e)
+            if queue.fail(job, f"{worker_id}: {e}"):
+                report["failed"] += 1
+            else:
+                report["lost"] += 1
+        else:
+            if queue.complete(job, {"worker": worker_id, "timings": timings}):
+                report["completed"] += 1
+            else:
+                report["lost"] += 1
+        for stage, seconds in timings.items():
+            report["stage_s"][stage].append(seconds)
+        report["finished"] = time.time()
+        queue._write(report_path, report)
+
+    return report
+
+class BatchExportCoordinator:
+    """
+    Shard a todo list across worker processes through a FileJobQueue.
+
+    Params:
+    - worker_command (list): Command starting one worker, "{queue_dir}" and "{worker_id}" are substituted in every item.
+    - max_restarts (int): Workers that exit with an error while work is left are restarted this many times in total.
+    """
+    def __init__(self, queue_dir, worker_command, workers=2, lease_seconds=600.0, max_attempts=3, max_restarts=2):
+        self.queue_dir = queue_dir
+        self.worker_command = worker_command
+        self.workers = workers
+        self.max_restarts = max_restarts
+        self.queue = FileJobQueue(queue_dir, lease_seconds, max_attempts)
+        self._processes = {}
+        self.restarts = 0
+
+    def prepare(self, asset_paths, input_folder, output_folder, sequence_path, rig_path, actor_name="SkeletalMeshActor_6", delete_original=False, move_folder=None, **extra):
+        """Write the session config for the workers and queue the assets. An existing queue directory is resumed."""
+        config = {
+            "input_folder": input_folder,
+            "output_folder": output_folder,
+            "sequence_path": sequence_path,
+            "rig_path": rig_path,
+            "actor_name": actor_name,
+            "delete_original": delete_original,
+            "move_folder": move_folder,
+            "lease_seconds": self.queue.lease_seconds,
+            "max_attempts": self.queue.max_attempts,
+            **extra,
+        }
+        self.queue._write(os.path.join(self.queue_dir, "config.json"), config)
+        return self.queue.add(asset_paths)
+
+    def launch(self):
+        for index in range(self.workers):
+            self._start(f"worker{index}")
+
+    def wait(self, poll_seconds=1.0):
+        """Block until every worker has exited, restarting failed ones while work is left."""
+        while self._processes:
+            time.sleep(poll_seconds)
+            self.queue.reclaim_expired()
+            for worker_id, process in list(self._processes.items()):
+                code = process.poll()
+                if code is None:
+                    continue
+                del self._processes[worker_id]
+                if code != 0 and not self.queue.is_drained() and self.restarts < self.max_restarts:
+                    self.restarts += 1
+                    log.warning("%s exited with %s, restarting", worker_id, code)
+                    self._start(worker_id)
+
+    def run(self, asset_paths, **session):
+        self.prepare(asset_paths, **session)
+        started = time.time()
+        self.launch()
+        self.wait()
+        report = self.merge_reports()
+        report["wall_s"] = time.time() - started
+        report["assets_per_min"] = report["completed"] / report["wall_s"] * 60.0 if report["wall_s"] > 0 else 0.0
+        return report
+
+    def merge_reports(self):
+        """Totals, per worker counts and mean seconds per stage across all worker reports."""
+        merged = {"completed": 0, "failed_attempts": 0, "lost_leases": 0, "workers": {}, "stage_mean_s": {}, "failed": [], "queue": self.queue.counts()}
+        stage_samples = {}
+        reports_dir = os.path.join(self.queue_dir, "reports")
+        for name in sorted(os.listdir(reports_dir)):
+            if not name.endswith(".json"):
+                continue
+            with open(os.path.join(reports_dir, name), "r") as f:
+                report = json.load(f)
+            merged["completed"] += report["completed"]
+            merged["failed_attempts"] += report["failed"]
+            merged["lost_leases"] += report.get("lost", 0)
+            merged["workers"][report["worker"]] = {"completed": report["completed"], "failed": report["failed"]}
+            for stage, samples in report["stage_s"].items():
+                stage_samples.setdefault(stage, []).extend(samples)
+        merged["stage_mean_s"] = {stage: sum(samples) / len(samples) if samples else 0.0 for stage, samples in stage_samples.items()}
+        merged["failed"] = [{"asset": job["asset"], "errors": job["errors"]} for job in self.queue.jobs("failed")]
+        return merged
+
+    def _start(self, worker_id):
+        command = [part.format(queue_dir=self.queue_dir, worker_id=worker_id) for part in self.worker_command]
+        self._processes[worker_id] = subprocess.Popen(command, cwd=_REPO_ROOT)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    worker = sub.add_parser("worker", help="Process jobs from a queue directory")
+    worker.add_argument("--queue-dir", required=True)
+    worker.add_argument("--worker-id", required=True)
+
+    coordinator = sub.add_parser("coordinator", help="Queue a todo list and run workers over it")
+    coordinator.add_argument("--queue-dir", required=True)
+    coordinator.add_argument("--workers", type=int, default=2)
+    coordinator.add_argument("--todo-file", help="JSON list of asset paths to export")
+    coordinator.add_argument("--input-folder", default="/Game/anims/Editing/EditingInput")
+    coordinator.add_argument("--output-folder", default="/Game/anims/Editing/EditingOutput")
+    coordinator.add_argument("--sequence-path", default="/Game/anims/Editing/blank.blank")
+    coordinator.add_argument("--rig-path", default="/Game/Avatars/RPM/GlassesGuy/armHands_Rig.armHands_Rig")
+    coordinator.add_argument("--actor-name", default="SkeletalMeshActor_6")
+    coordinator.add_argument("--editor-cmd", nargs="+", help="Headless editor command, e.g. UnrealEditor-Cmd.exe Project.uproject")
+    coordinator.add_argument("--lease-seconds", type=float, default=600.0)
+    coordinator.add_argument("--max-attempts", type=int, default=3)
+    coordinator.add_argument("--stub", type=int, metavar="N", help="Run workers against the mock unreal module with N generated takes")
+    coordinator.add_argument("--stub-latency-ms", type=float, default=0.0, help="Simulated cost per editor call in stub mode")
+    args = parser.parse_args()
+
+    if args.mode == "worker":
+        report = run_worker(args.queue_dir, args.worker_id)
+        log.info("%s done: %s completed, %s failed", args.worker_id, report["completed"], report["failed"])
+        return
+
+    if args.stub:
+        todo = [f"{args.input_folder}/take_{index:04d}.take_{index:04d}" for index in range(args.stub)]
+        worker_command = [sys.executable, "-m", "src.session.batchExport", "worker", "--queue-dir", "{queue_dir}", "--worker-id", "{worker_id}"]
+    else:
+        if not args.todo_file or not args.editor_cmd:
+            parser.error("--todo-file and --editor-cmd are required without --stub")
+        with open(args.todo_file, "r") as f:
+            todo = json.load(f)
+        script = os.path.abspath(__file__)
+        worker_command = list(args.editor_cmd) + ["-run=pythonscript", f"-script={script} worker --queue-dir {{queue_dir}} --worker-id {{worker_id}}", "-unattended", "-nosplash"]
+
+    coordinator = BatchExportCoordinator(args.queue_dir, worker_command, args.workers, args.lease_seconds, args.max_attempts)
+    report = coordinator.run(
+        todo,
+        input_folder=args.input_folder,
+        output_folder=args.output_folder,
+        sequence_path=args.sequence_path,
+        rig_path=args.rig_path,
+        actor_name=args.actor_name,
+        stub=bool(args.stub),
+        stub_latency_ms=args.stub_latency_ms,
+    )
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,24 @@
+import hashlib
+import json
+import os
+import time
 import unreal
 from src.sequencer.sequencerControls import SequencerControls, get_actor_by_name
+from src.session.assetPrefetch import AssetPrefetcher, game_path_to_disk
+from src.tickHook import get_scheduler
+from src.logger import get_logger
+
+log = get_logger("Session")
+
+def _asset_class_name(asset_data) -> str:
+    # asset_class_path (TopLevelAssetPath) replaced asset_class in UE 5.1
+    class_path = getattr(asset_data, "asset_class_path", None)
+    if class_path is not None:
+        return str(class_path.asset_name)
+    return str(asset_data.asset_class)
 
 class AnimationSessionManager:
-    def __init__(self, input_folder: str, output_folder: str, sequence_path: str, rig_path: str):
+    def __init__(self, input_folder: str, output_folder: str, sequence_path: str, rig_path: str, warm_session: bool = False, todo_cache_path: str = None, prefetch_count: int = 0, prefetch_memory_mb: float = 512):
         self.input_folder = input_folder
         self.output_folder = output_folder
         self.sequence_path = sequence_path
@@ -10,6 +26,23 @@ class AnimationSessionManager:
         self.todo = []
         self.current_animation = None
 
+        # JSON cache of the gathered todo list per input folder, reused while the folder's files are unchanged
+        self.todo_cache_path = todo_cache_path
+
+        # Load the next prefetch_count todo entries on idle ticks after each load, see AssetPrefetcher
+        self.prefetch_count = prefetch_count
+        self.prefetcher = AssetPrefetcher(prefetch_memory_mb) if prefetch_count > 0 else None
+
+        # Warm session, keeps the SequencerControls of the first load and only swaps the animation for later takes
+        self.warm_session = warm_session
+        self._warm_controls = None
+
+        # Batch mode, see run_batch()
+        self.batch_timings = {"load": [], "export": [], "cleanup": []}
+        self.batch_completed = 0
+        self.batch_failed = 0
+        self._batch_started = None
+
     def initialize(self):
         # Initialize the session manager, validate environment, and gather animations
         self._validate_environment()
@@ -28,22 +61,72 @@ class AnimationSessionManager:
         if self.input_folder == self.output_folder:
             unreal.log_warning("Input and output folders are the same. This may cause issues with asset management.")
 
-    def _is_valid_animation(self, path: str) -> bool:
-        if not unreal.EditorAssetLibrary.does_asset_exist(path):
-            return False
-        asset = unreal.EditorAssetLibrary.load_asset(path)
-        return isinstance(asset, unreal.AnimSequence)
+    def iter_animations_from_folder(self):
+        """Yield the AnimSequence asset paths in the input folder from Asset Registry metadata, without loading them."""
+        registry = unreal.AssetRegistryHelpers.get_asset_registry()
+        for asset_data in registry.get_assets_by_path(self.input_folder, recursive=True):
+            if _asset_class_name(asset_data) == "AnimSequence":
+                yield f"{asset_data.package_name}.{asset_data.asset_name}"
 
     def _gather_animations_from_folder(self):
-        # Define a list of animations to process
-        self.todo = unreal.EditorAssetLibrary.list_assets(self.input_folder, recursive=True, include_folder=True)
-        print(self.todo)
-        # Check if each item in todo is a valid animation asset, otherwise log a warning and remove it
-        self.todo = [anim for anim in self.todo if self._is_valid_animation(anim)]
+        # Define a list of animations to process, from the cache while the folder is unchanged
+        fingerprint = self._folder_fingerprint() if self.todo_cache_path else None
+        cached = self._load_todo_cache(fingerprint)
+        if cached is not None:
+            self.todo = cached
+            unreal.log(f"[Session] Loaded {len(self.todo)} animations from the todo cache.")
+        else:
+            self.todo = sorted(self.iter_animations_from_folder())
+            self._save_todo_cache(fingerprint, self.todo)
+        log.debug("Animations in input folder: %s", self.todo)
 
         if not self.todo:
             unreal.log_warning("No valid animation assets found in todo list. Input folder may be empty or misconfigured.")
 
+    def _folder_fingerprint(self) -> str:
+        """Hash of the input folder's package file names, sizes and mtimes on disk, None if it can't be resolved."""
+        folder = game_path_to_disk(self.input_folder)
+        if folder is None or not os.path.isdir(folder):
+            return None
+
+        entries = []
+        for root, _, files in os.walk(folder):
+            for name in files:
+                if name.endswith((".uasset", ".umap")):
+                    stat = os.stat(os.path.join(root, name))
+                    entries.append(f"{os.path.relpath(os.path.join(root, name), folder)}|{stat.st_size}|{stat.st_mtime_ns}")
+        entries.sort()
+        return hashlib.sha1("\n".join(entries).encode("utf-8")).hexdigest()
+
+    def _load_todo_cache(self, fingerprint):
+        if fingerprint is None or not os.path.exists(self.todo_cache_path):
+            return None
+        try:
+            with open(self.todo_cache_path, "r") as f:
+                entry = json.load(f).get(self.input_folder)
+        except (OSError, ValueError) as e:
+            unreal.log_warning(f"[Session] Ignoring unreadable todo cache {self.todo_cache_path}: {e}")
+            return None
+        if not entry or entry.get("fingerprint") != fingerprint:
+            return None
+        return list(entry["todo"])
+
+    def _save_todo_cache(self, fingerprint, todo):
+        if fingerprint is None:
+            return
+        cache = {}
+        if os.path.exists(self.todo_cache_path):
+            try:
+                with open(self.todo_cache_path, "r") as f:
+                    cache = json.load(f)
+            except (OSError, ValueError):
+                cache = {}
+        cache[self.input_folder] = {"fingerprint": fingerprint, "todo": todo}
+        tmp_path = f"{self.todo_cache_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(cache, f, indent=2)
+        os.replace(tmp_path, self.todo_cache_path)
+
     def load_next_from_todo(self, actor_name: str = "SkeletalMeshActor_6") -> SequencerControls:
         """Loads the next animation from the todo list (FIFO)."""
         if not self.todo:
@@ -73,6 +156,11 @@ class AnimationSessionManager:
 
     def load_animation(self, anim_name: str, actor_name: str = "SkeletalMeshActor_6") -> SequencerControls:
         """Load animation into the sequence and return a configured SequencerControls object."""
+        if self.warm_session and self._warm_controls is not None:
+            if self._warm_is_valid():
+                return self._load_warm(anim_name)
+            unreal.log_warning("[Session] Warm session is no longer valid, rebuilding the sequence setup.")
+            self._warm_controls = None
 
         # Load sequence
         sequence = unreal.EditorAssetLibrary.load_asset(self.sequence_path)
@@ -98,7 +186,7 @@ class AnimationSessionManager:
 
         # Load animation
         anim_path = f"{self.input_folder}/{anim_name}"
-        anim_asset = unreal.AnimSequence.cast(unreal.load_asset(anim_path))
+        anim_asset = unreal.AnimSequence.cast(self._load_anim_asset(anim_path))
         if not anim_asset:
             unreal.log_warning(f"Could not load animation: {anim_path}")
             return None
@@ -124,13 +212,48 @@ class AnimationSessionManager:
         # Success
         unreal.log(f"[Session] Loaded animation {anim_name} into sequence.")
         self.current_animation = anim_name # Store current animation name
+        if self.warm_session:
+            self._warm_controls = controls
+        return controls
+
+    def _warm_is_valid(self) -> bool:
+        binding = self._warm_controls.skeletal_mesh_binding_proxy
+        if not self._warm_controls.control_rig or not binding:
+            return False
+        return not hasattr(binding, "is_valid") or binding.is_valid()
+
+    def _load_anim_asset(self, anim_path: str):
+        if self.prefetcher is None:
+            return unreal.load_asset(anim_path)
+        asset = self.prefetcher.get(anim_path)
+
+        # Warm up the takes after this one while it is being edited
+        index = self.todo.index(anim_path) + 1 if anim_path in self.todo else 0
+        self.prefetcher.prefetch([path for path in self.todo[index:index + self.prefetch_count] if path != anim_path])
+        return asset
+
+    def _load_warm(self, anim_name: str) -> SequencerControls:
+        # Sequence, binding and rig stay resident, only the animation section and the rig keys change
+        controls = self._warm_controls
+        anim_path = f"{self.input_folder}/{anim_name}"
+        anim_asset = unreal.AnimSequence.cast(self._load_anim_asset(anim_path))
+        if not anim_asset:
+            unreal.log_warning(f"Could not load animation: {anim_path}")
+            return None
+
+        _, section = controls.swap_animation(anim_asset)
+        controls.time_controls.set_sequence_range(section.get_start_frame(), section.get_end_frame())
+        controls.clear_control_rig_keys()
+
+        unreal.log(f"[Session] Swapped animation {anim_name} into the warm sequence.")
+        self.current_animation = anim_name
         return controls
 
     def bake_and_export(self, file_name: str, controls: SequencerControls = None):
-        """Bake and export the current animation to the output folder as an AnimSequence."""
+        """Bake and export the current animation to the output folder as an AnimSequence. Returns True on success."""
         if controls is None:
             unreal.log_warning("[Session] No SequencerControls provided for export.")
-            return
+            return False
 
         # Convert to Unreal-friendly file path and name
         ue_package_path = self.output_folder
@@ -140,11 +263,15 @@ class AnimationSessionManager:
             unreal.log(f"[Session] Baking and exporting animation: {file_name}")
             controls.export_current_sequence(file_name=file_name, file_path=file_path, ue_package_path=ue_package_path)
             unreal.log(f"[Session] Successfully exported animation to: {ue_package_path}/{file_name}")
+            return True
         except Exception as e:
             unreal.log_error(f"[Session] Export failed: {e}")
+            return False
 
-    def cleanup_input(self, anim_name: str, delete_original: bool = False, move_folder: str = None):
-        # Move or delete original after export
+    def cleanup_input(self, anim_name: str, delete_original: bool = False, move_folder: str = None, original_name: str = None):
+        # Move or delete original after export. The moved asset is named original_name + "_original",
+        # pass the package name when anim_name is an object path ("take.take")
+        original_name = original_name or anim_name
         full_path = f"{self.input_folder}/{anim_name}"
         if not unreal.EditorAssetLibrary.does_asset_exist(full_path):
             unreal.log_warning(f"[Session] Cannot clean up: {full_path} does not exist.")
@@ -155,28 +282,132 @@ class AnimationSessionManager:
             unreal.log(f"[Session] Deleted original animation: {anim_name}")
         else:
             if move_folder:
-                new_path = f"{move_folder}/{anim_name}_original"
+                new_path = f"{move_folder}/{original_name}_original"
             else:
-                new_path = f"{self.output_folder}/{anim_name}_original"
+                new_path = f"{self.output_folder}/{original_name}_original"
             if unreal.EditorAssetLibrary.does_asset_exist(new_path):
                 unreal.log_warning(f"[Session] Target cleanup path already exists: {new_path}")
                 return
             unreal.EditorAssetLibrary.rename_asset(f"{self.input_folder}/{anim_name}", new_path)
             unreal.log(f"[Session] Moved original animation to: {new_path}")
 
-        # Remove from todo list
-        if anim_name in self.todo:
-            self.todo.remove(anim_name)
+        # Remove from todo list, which holds full asset paths
+        if anim_name in self.todo or full_path in self.todo:
+            self.todo.remove(anim_name if anim_name in self.todo else full_path)
             unreal.log(f"[Session] Removed {anim_name} from todo list.")
         else:
             unreal.log_warning(f"{anim_name} not found in todo list for cleanup.")
 
-# Example usage:
-session_manager = AnimationSessionManager("/Game/anims/Editing/EditingInput", "/Game/anims/Editing/EditingOutput", "/Game/anims/Editing/blank.blank", "/Game/Avatars/RPM/GlassesGuy/armHands_Rig.armHands_Rig")
-session_manager.initialize()
-control_sequence = session_manager.load_next_from_todo()
+    def run_batch(self, journal_path: str = None, actor_name: str = "SkeletalMeshActor_6", delete_original: bool = False, move_folder: str = None, max_attempts: int = 2, scheduler=None, on_done=None):
+        """
+        Process the whole todo list across editor ticks: load, bake and export, clean up, one stage per tick.
+
+        Params:
+        - journal_path (str): JSON file recording per asset progress. A rerun with the same journal skips finished
+          assets and resumes exported ones at cleanup.
+        - max_attempts (int): Exports started this many times without finishing (e.g. the editor crashed) are marked failed.
+        - scheduler (TickScheduler): Defaults to the shared scheduler.
+        - on_done (callable): Called with batch_report() when the todo list is drained.
+        """
+        scheduler = scheduler if scheduler is not None else get_scheduler()
+        batch = self._batch(journal_path, actor_name, delete_original, move_folder, max_attempts)
+        return scheduler.add_generator(batch, name="AnimationSessionBatch", on_done=on_done)
+
+    def batch_report(self) -> dict:
+        """Assets per minute and mean seconds per stage of the current batch."""
+        elapsed = time.perf_counter() - self._batch_started if self._batch_started is not None else 0.0
+        return {
+            "completed": self.batch_completed,
+            "failed": self.batch_failed,
+            "remaining": len(self.todo),
+            "assets_per_min": self.batch_completed / elapsed * 60.0 if elapsed > 0 else 0.0,
+            "stage_mean_s": {stage: sum(times) / len(times) if times else 0.0 for stage, times in self.batch_timings.items()},
+        }
+
+    def _batch(self, journal_path, actor_name, delete_original, move_folder, max_attempts):
+        journal = self._load_journal(journal_path)
+        self._batch_started = time.perf_counter()
+        unreal.log(f"[Session] Batch started with {len(self.todo)} animations.")
+
+        for asset_path in list(self.todo):
+            entry = journal["assets"].setdefault(asset_path, {"stage": "todo", "attempts": 0})
+            if entry["stage"] in ("done", "failed"):
+                self.todo.remove(asset_path)
+                continue
+            anim_name = asset_path.replace(f"{self.input_folder}/", "")
+
+            if entry["stage"] != "exported":
+                if entry["attempts"] >= max_attempts:
+                    self._fail_batch_asset(journal, journal_path, asset_path, f"export did not finish after {entry['attempts']} attempts")
+                    continue
+
+                controls = self._timed_stage("load", self.load_animation, anim_name, actor_name)
+                if not controls:
+                    self._fail_batch_asset(journal, journal_path, asset_path, "load failed")
+                    continue
+                yield
+
+                # Journal the attempt first, so an export that takes the editor down is not retried forever
+                entry["stage"] = "exporting"
+                entry["attempts"] += 1
+                self._save_journal(journal, journal_path)
+                if not self._timed_stage("export", self.bake_and_export, anim_name.split(".")[0], controls):
+                    self._fail_batch_asset(journal, journal_path, asset_path, "export failed")
+                    continue
+                entry["stage"] = "exported"
+                self._save_journal(journal, journal_path)
+                yield
+
+            self._timed_stage("cleanup", self.cleanup_input, anim_name, delete_original, move_folder, anim_name.split(".")[0])
+            entry["stage"] = "done"
+            self._save_journal(journal, journal_path)
+            if asset_path in self.todo:
+                self.todo.remove(asset_path)
+            self.batch_completed += 1
+            yield
+
+        report = self.batch_report()
+        unreal.log(f"[Session] Batch finished: {report['completed']} done, {report['failed']} failed, {report['assets_per_min']:.1f} assets/min, stage means {report['stage_mean_s']}")
+        return report
+
+    def _timed_stage(self, stage, func, *args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            self.batch_timings[stage].append(time.perf_counter() - start)
+
+    def _fail_batch_asset(self, journal, journal_path, asset_path, error):
+        unreal.log_error(f"[Session] Batch skipped {asset_path}: {error}")
+        entry = journal["assets"][asset_path]
+        entry["stage"] = "failed"
+        entry["error"] = error
+        self._save_journal(journal, journal_path)
+        if asset_path in self.todo:
+            self.todo.remove(asset_path)
+        self.batch_failed += 1
+
+    def _load_journal(self, journal_path):
+        if journal_path and os.path.exists(journal_path):
+            with open(journal_path, "r") as f:
+                journal = json.load(f)
+            if journal.get("input_folder") == self.input_folder:
+                unreal.log(f"[Session] Resuming batch from journal: {journal_path}")
+                return journal
+            unreal.log_warning(f"[Session] Journal {journal_path} belongs to {journal.get('input_folder')}, starting a new one.")
+        return {"input_folder": self.input_folder, "assets": {}}
+
+    def _save_journal(self, journal, journal_path):
+        if not journal_path:
+            return
+        # Write next to the journal and swap, so a crash never leaves a half written file
+        tmp_path = f"{journal_path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(journal, f, indent=2)
+        os.replace(tmp_path, journal_path)
 
-if control_sequence:
-    anim_name = session_manager.current_animation.replace(f"{session_manager.input_folder}/", "").split(".")[0]
-    session_manager.bake_and_export(anim_name, control_sequence)
-    session_manager.cleanup_input(anim_name, delete_original=False, move_folder="/Game/anims/Editing/OldOriginal")
\ No newline at end of file
+if __name__ == "__main__":
+    # Example usage, processes the whole input folder across editor ticks
+    session_manager = AnimationSessionManager("/Game/anims/Editing/EditingInput", "/Game/anims/Editing/EditingOutput", "/Game/anims/Editing/blank.blank", "/Game/Avatars/RPM/GlassesGuy/armHands_Rig.armHands_Rig", warm_session=True, todo_cache_path=os.path.join(unreal.Paths.project_saved_dir(), "AnimationSessionTodo.json"))
+    session_manager.initialize()
+    session_manager.run_batch(journal_path=os.path.join(unreal.Paths.project_saved_dir(), "AnimationSessionBatch.json"), delete_original=False, move_folder="/Game/anims/Editing/OldOriginal")
\ No newline at end of file
@@ -1,61 +1,268 @@
+import itertools
+import time
 import unreal
+from src.logger import get_logger
 
-class tickHooker:
-    def __init__(self):
+log = get_logger("tickHooker")
+
+class TickTask:
+    """A unit of work owned by a TickScheduler, returned by its add_* methods so it can be removed again."""
+    EVERY_TICK = "every_tick"
+    GENERATOR = "generator"
+    ONCE = "once"
+
+    def __init__(self, kind, func, priority=0, budget_ms=None, name=None, on_done=None):
+        self.kind = kind
+        self.func = func
+        self.priority = priority
+        self.budget_ms = budget_ms
+        self.name = name or getattr(func, "__name__", kind)
+        self.on_done = on_done
+        self.active = True
+        self.sequence = 0  # Insertion order, set by the scheduler
+
+        # ONCE tasks wait for both, EVERY_TICK tasks with ticks_left stop after that many runs
+        self.delay_ticks = 0
+        self.due_time = None
+        self.ticks_left = None
+
+        # Stats
+        self.runs = 0
+        self.total_ms = 0.0
+        self.overruns = 0
+        self.last_tick = 0
+
+    def __repr__(self):
+        return f"TickTask({self.name!r}, {self.kind}, priority={self.priority})"
+
+class TickScheduler:
+    """
+    Run many tasks from a single slate post tick callback.
+
+    Tasks run in priority order, highest first. EVERY_TICK tasks (e.g. the OSC loop)
+    run on every tick. Generator tasks and delayed jobs are deferrable: once the
+    global budget of the tick is spent they wait for the next tick, and generator
+    tasks are resumed until their own budget is spent (one step per tick without one).
+    The callback is registered with the first task and unregistered when the last one is removed.
+    """
+    def __init__(self, budget_ms=None):
+        self.budget_ms = budget_ms
+        self.profiler = None  # Opt-in TickProfiler, records task.<name> per task and the whole tick
+        self.ticks = 0
+        self.deferred = 0  # Deferrable task runs pushed to a later tick by the global budget
+        self._tasks = []
+        self._order = itertools.count()
         self._delegate_handle = None
-        self._bound_func = None
 
-    def hook(self, func):
+    def add(self, func, priority=0, budget_ms=None, name=None, ticks=None, on_done=None):
+        """
+        Call func(delta_seconds) on every tick.
+
+        Params:
+        - priority (int): Higher runs earlier in the tick.
+        - budget_ms (float): Log a warning when a single call takes longer.
+        - ticks (int): Remove the task after this many calls and call on_done(delta_seconds).
+        """
+        if not callable(func):
+            raise ValueError("Provided func must be callable")
+        if ticks is not None and (not isinstance(ticks, int) or ticks <= 0):
+            raise ValueError("ticks must be a positive integer")
+        task = TickTask(TickTask.EVERY_TICK, func, priority, budget_ms, name, on_done)
+        task.ticks_left = ticks
+        return self._add(task)
+
+    def add_generator(self, generator, priority=0, budget_ms=None, name=None, on_done=None):
+        """
+        Resume a generator across ticks, for work that yields between steps (export, key cleanup).
+
+        Params:
+        - budget_ms (float): Keep resuming within a tick until this is spent, None resumes once per tick.
+        - on_done (callable): Called with the generator's return value when it finishes.
+        """
+        if not hasattr(generator, "send"):
+            raise ValueError("Provided generator must be a generator")
+        return self._add(TickTask(TickTask.GENERATOR, generator, priority, budget_ms, name or getattr(generator, "__name__", None), on_done))
+
+    def call_later(self, func, ticks=1, seconds=None, priority=0, name=None):
+        """Call func(delta_seconds) once, after the given number of ticks and seconds have passed."""
+        if not callable(func):
+            raise ValueError("Provided func must be callable")
+        if not isinstance(ticks, int) or ticks < 0:
+            raise ValueError("ticks must be a non-negative integer")
+        task = TickTask(TickTask.ONCE, func, priority, None, name)
+        task.delay_ticks = ticks
+        task.due_time = time.perf_counter() + seconds if seconds is not None else None
+        return self._add(task)
+
+    def remove(self, task):
+        if not task.active:
+            return
+        task.active = False
+        self._tasks.remove(task)
+        if not self._tasks:
+            self._unregister()
+
+    def clear(self):
+        for task in list(self._tasks):
+            self.remove(task)
+
+    @property
+    def tasks(self):
+        return list(self._tasks)
+
+    def _add(self, task):
+        task.sequence = next(self._order)
+        self._tasks.append(task)
+        if self._delegate_handle is None:
+            self._delegate_handle = unreal.register_slate_post_tick_callback(self.tick)
+            log.info("Tick hooked.")
+        return task
+
+    def _unregister(self):
         if self._delegate_handle is not None:
-            print("Already hooked, unhooking first.")
+            unreal.unregister_slate_post_tick_callback(self._delegate_handle)
+            self._delegate_handle = None
+            log.info("Tick unhooked.")
+
+    def tick(self, delta_seconds):
+        start = time.perf_counter()
+        deadline = start + self.budget_ms / 1000.0 if self.budget_ms is not None else None
+        self.ticks += 1
+
+        # Least recently run first within a priority, so deferred work is not starved by its neighbours
+        for task in sorted(self._tasks, key=lambda t: (-t.priority, t.last_tick, t.sequence)):
+            if not task.active:
+                continue
+            if task.kind == TickTask.ONCE and not self._is_due(task):
+                continue
+            if task.kind != TickTask.EVERY_TICK and deadline is not None and time.perf_counter() >= deadline:
+                self.deferred += 1
+                continue
+            self._run(task, delta_seconds, deadline)
+
+        if self.profiler is not None:
+            self.profiler.record("tick", time.perf_counter() - start)
+            self.profiler.end_tick()
+
+    def _is_due(self, task):
+        if task.delay_ticks > 0:
+            task.delay_ticks -= 1
+            if task.delay_ticks > 0:
+                return False
+        return task.due_time is None or time.perf_counter() >= task.due_time
+
+    def _run(self, task, delta_seconds, deadline):
+        task.last_tick = self.ticks
+        task_start = time.perf_counter()
+        try:
+            if task.kind == TickTask.GENERATOR:
+                self._resume(task, task_start, deadline)
+            else:
+                task.func(delta_seconds)
+        except Exception as e:
+            log.error("Task %s failed: %s", task.name, e)
+            if task.kind != TickTask.EVERY_TICK:
+                self.remove(task)
+        elapsed_ms = (time.perf_counter() - task_start) * 1000.0
+        task.runs += 1
+        task.total_ms += elapsed_ms
+        if self.profiler is not None:
+            self.profiler.record(f"task.{task.name}", elapsed_ms / 1000.0)
+
+        if task.kind == TickTask.EVERY_TICK:
+            if task.budget_ms is not None and elapsed_ms > task.budget_ms:
+                task.overruns += 1
+                log.warning("Task %s took %.2f ms, budget is %.2f ms", task.name, elapsed_ms, task.budget_ms)
+            if task.ticks_left is not None:
+                task.ticks_left -= 1
+                if task.ticks_left <= 0:
+                    self._finish(task, delta_seconds)
+        elif task.kind == TickTask.ONCE and task.active:
+            self._finish(task, None)
+
+    def _resume(self, task, task_start, deadline):
+        task_deadline = task_start + task.budget_ms / 1000.0 if task.budget_ms is not None else None
+        while True:
+            try:
+                next(task.func)
+            except StopIteration as stop:
+                self._finish(task, stop.value)
+                return
+            if task_deadline is None:
+                return
+            now = time.perf_counter()
+            if now >= task_deadline or (deadline is not None and now >= deadline):
+                return
+
+    def _finish(self, task, result):
+        self.remove(task)
+        if task.on_done is not None:
+            task.on_done(result)
+
+_default_scheduler = None
+
+def get_scheduler():
+    """The scheduler shared by every tickHooker, so the project registers a single slate callback."""
+    global _default_scheduler
+    if _default_scheduler is None:
+        _default_scheduler = TickScheduler()
+    return _default_scheduler
+
+class tickHooker:
+    def __init__(self, scheduler=None):
+        self.scheduler = scheduler if scheduler is not None else get_scheduler()
+        self._task = None
+        self._on_unhook = None
+        self.profiler = None
+
+    def hook(self, func, on_unhook=None, profiler=None, priority=0, budget_ms=None):
+        if self._task is not None:
+            log.info("Already hooked, unhooking first.")
             self.unhook()
 
         if not callable(func):
             raise ValueError("Provided func must be callable")
+        if on_unhook is not None and not callable(on_unhook):
+            raise ValueError("Provided on_unhook must be callable")
 
         # Wrap to accept delta_seconds and call your function
-        def tick_wrapper(delta_seconds):
-            func(delta_seconds)
+        if profiler is None:
+            def tick_wrapper(delta_seconds):
+                func(delta_seconds)
+        else:
+            def tick_wrapper(delta_seconds):
+                # A scheduler with the same profiler records and closes the tick itself, one owner per tick
+                if self.scheduler.profiler is profiler:
+                    func(delta_seconds)
+                    return
+                start = time.perf_counter()
+                func(delta_seconds)
+                profiler.record("tick", time.perf_counter() - start)
+                profiler.end_tick()
 
-        self._bound_func = tick_wrapper
-        self._delegate_handle = unreal.register_slate_post_tick_callback(self._bound_func)
-        print("Tick hooked.")
+        self._on_unhook = on_unhook
+        self.profiler = profiler
+        self._task = self.scheduler.add(tick_wrapper, priority=priority, budget_ms=budget_ms, name=getattr(func, "__name__", None))
 
     def unhook(self):
-        if self._delegate_handle is not None:
-            unreal.unregister_slate_post_tick_callback(self._delegate_handle)
-            print("Tick unhooked.")
-            self._delegate_handle = None
-            self._bound_func = None
+        if self._task is not None:
+            self.scheduler.remove(self._task)
+            self._task = None
+            # Run the shutdown path that belonged to this hook (e.g. stopping a listener thread)
+            on_unhook, self._on_unhook = self._on_unhook, None
+            if on_unhook:
+                on_unhook()
         else:
-            print("No tick hook to unhook.")
+            log.info("No tick hook to unhook.")
 
     def hook_for_x_ticks(self, func, x, final_func=None):
+        """Call func() on the next x ticks, then final_func(delta_seconds). Runs next to the hooked function."""
         if not isinstance(x, int) or x <= 0:
             raise ValueError("x must be a positive integer")
-
-        def tick_wrapper(delta_seconds):
-            nonlocal x
-            if x > 0:
-                func()
-                x -= 1
-            if x == 0:
-                if final_func:
-                    final_func(delta_seconds)
-                self.unhook()
-
-        self.hook(tick_wrapper)
+        return self.scheduler.add(lambda delta_seconds: func(), ticks=x, on_done=final_func, name=getattr(func, "__name__", None))
 
     def wait_x_ticks_then_execute(self, func, x):
+        """Call func(delta_seconds) once on the x-th tick from now. Runs next to the hooked function."""
         if not isinstance(x, int) or x <= 0:
             raise ValueError("x must be a positive integer")
-
-        def tick_wrapper(delta_seconds):
-            nonlocal x
-            if x > 0:
-                x -= 1
-            if x == 0:
-                func(delta_seconds)
-                self.unhook()
-
-        self.hook(tick_wrapper)
\ No newline at end of file
+        return self.scheduler.call_later(func, ticks=x)